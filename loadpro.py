@@ -1,4 +1,4 @@
-# loadpro.py v2.2
+# loadpro.py v3.3
 # --------------------------------------------------
 # Entry point utama untuk menjalankan seluruh pipeline:
 # 1. Preprocessing data
@@ -7,46 +7,205 @@
 # 4. Prediksi historis (all)
 # 5. Prediksi next-day (all)
 # 6. Ringkasan hasil prediksi
+#
+# v3.0:
+# - Default: runner in-process. TensorFlow/pandas/sklearn di-import
+#   sekali, lalu fungsi tiap tahap dipanggil langsung (tanpa
+#   subprocess per tahap maupun per feeder).
+# - Waktu eksekusi dilaporkan per tahap.
+# - --subprocess: jalur lama (python3 scripts/*.py) sebagai fallback.
+# - --workers N: jumlah proses paralel untuk preprocessing.
+# - --format store: dataset ditulis ke feature store konsolidasi.
+#
+# v3.1:
+# - --model global: tahap training memakai train_global.py (1 model
+#   untuk semua penyulang), tahap compare dilewati, prediksi
+#   memakai models/global.
+# - --train-workers N: training per penyulang di N proses paralel.
+#
+# v3.2:
+# - Model .keras dimuat sekali lewat cache LRU bersama
+#   (scripts/utils/model_cache.py); statistik cache dicetak di akhir.
+#
+# v3.3:
+# - --profile [DIR]: run report per tahap & per feeder (tf_import,
+#   load_dataset, load_model, fit, predict, ...) dari
+#   scripts/utils/profiling.py, 1 JSON/CSV per proses (juga proses anak
+#   di mode --subprocess) + run_report.csv gabungan di logs/profile/.
+# - --profile-feeder feeder_kategori: dump cProfile untuk feeder tsb.
+# - --model-cache-mb MB: batas memori cache model in-process (default
+#   1024 MB ~ 200 model); set >= ~5 MB x jumlah model agar model dipakai
+#   ulang lintas tahap.
+# - --horizon N: tahap predict_next meramal H+1..H+N (rekursif).
 # --------------------------------------------------
+# python3 loadpro.py
+# python3 loadpro.py --workers 8
+# python3 loadpro.py --subprocess
+# python3 loadpro.py --model global
+# python3 loadpro.py --horizon 7
+# python3 loadpro.py --profile --profile-feeder penyulang_x_malam
 
-import subprocess
+import os
+import sys
 import time
+import argparse
+import subprocess
 from datetime import datetime
 
-start_time = time.time()
-now = datetime.now()
-timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-print("\n⚡ Memulai LOADPRO pipeline...")
-print("🕒 Start:", timestamp)
-print("--------------------------------------------------")
-
-# Langkah 1: Preprocessing
-print("\n[1/6] 🔍 Menjalankan preprocessing...")
-subprocess.run(["python3", "scripts/preprocess.py"], check=True)
-
-# Langkah 2: Training
-print("\n[2/6] 🤖 Menjalankan training semua penyulang...")
-subprocess.run(["python3", "scripts/train_all.py"], check=True)
-
-# Langkah 3: Compare model
-print("\n[3/6] ⚖️  Membandingkan model sementara dan final...")
-subprocess.run(["python3", "scripts/compare_all.py"], check=True)
-
-# Langkah 4: Prediksi historis
-print("\n[4/6] 📈 Menjalankan prediksi historis semua penyulang...")
-subprocess.run(["python3", "scripts/predict_all.py"], check=True)
-
-# Langkah 5: Prediksi next-day
-print("\n[5/6] 🔮 Menjalankan prediksi next-day semua penyulang...")
-subprocess.run(["python3", "scripts/predict_next_all.py"], check=True)
-
-# Langkah 6: Ringkasan hasil prediksi
-print("\n[6/6] 🧾 Menyusun ringkasan prediksi ke terminal & CSV...")
-subprocess.run(["python3", "scripts/summary.py"], check=True)
-
-# Total waktu eksekusi
-total_time = time.time() - start_time
-minutes = int(total_time // 60)
-seconds = int(total_time % 60)
-print("\n✅ LOADPRO selesai!")
-print(f"🕒 Total waktu eksekusi: {minutes} menit {seconds} detik\n")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts")
+
+# (label, pesan, script CLI)
+STAGES = [
+    ("preprocess", "🔍 Menjalankan preprocessing...", "scripts/preprocess.py"),
+    ("train", "🤖 Menjalankan training semua penyulang...", "scripts/train_all.py"),
+    ("compare", "⚖️  Membandingkan model sementara dan final...", "scripts/compare_all.py"),
+    ("predict", "📈 Menjalankan prediksi historis semua penyulang...", "scripts/predict_all.py"),
+    ("predict_next", "🔮 Menjalankan prediksi next-day semua penyulang...", "scripts/predict_next_all.py"),
+    ("summary", "🧾 Menyusun ringkasan prediksi ke terminal & CSV...", "scripts/summary.py"),
+]
+
+
+def positive_int(value):
+    """Tipe argparse: bilangan bulat >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"harus >= 1, bukan {value}")
+    return number
+
+
+def format_duration(seconds):
+    m, s = divmod(seconds, 60)
+    return f"{int(m)} menit {s:.1f} detik"
+
+
+def load_stage_functions(args):
+    """Import semua modul tahap sekali saja dan kembalikan callable per tahap."""
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+
+    import preprocess
+    import train            # memuat TensorFlow/Keras
+    import compare
+    import predict
+    import predict_next
+    import train_all
+    import train_global
+    import compare_all
+    import predict_all
+    import predict_next_all
+    import summary
+
+    return {
+        "preprocess": lambda: preprocess.main(workers=args.workers, fmt=args.format),
+        "train": (train_global.main if args.model == "global"
+                  else lambda: train_all.main(in_process=True, workers=args.train_workers)),
+        "compare": lambda: compare_all.main(in_process=True),
+        "predict": lambda: predict_all.main(in_process=True, model_type=args.model),
+        "predict_next": lambda: predict_next_all.main(in_process=True, model_type=args.model,
+                                                      horizon=args.horizon),
+        "summary": summary.main,
+    }
+
+
+def stage_cli_args(name, args):
+    """Argumen CLI tambahan per tahap untuk mode --subprocess."""
+    if name == "preprocess":
+        return ["--workers", str(args.workers), "--format", args.format]
+    if name == "train" and args.model == "single":
+        return ["--workers", str(args.train_workers)]
+    if name == "predict":
+        return ["--model", args.model]
+    if name == "predict_next":
+        return ["--model", args.model, "--horizon", str(args.horizon)]
+    return []
+
+
+def stage_script(name, script, args):
+    if name == "train" and args.model == "global":
+        return "scripts/train_global.py"
+    return script
+
+
+def main(args):
+    # Semua script memakai path relatif terhadap root project
+    os.chdir(BASE_DIR)
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    from utils import profiling
+    profile_dir = profiling.enable(args.profile, args.profile_feeder) if args.profile else None
+    if args.model_cache_mb is not None:
+        from utils import model_cache
+        model_cache.configure(max_mb=args.model_cache_mb)
+
+    start_time = time.time()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    use_subprocess = args.subprocess
+    mode = "subprocess" if use_subprocess else "in-process"
+    print("\n⚡ Memulai LOADPRO pipeline...")
+    print("🕒 Start:", timestamp)
+    print("⚙️  Mode:", mode)
+    print("--------------------------------------------------")
+
+    timings = []
+    if not use_subprocess:
+        t0 = time.time()
+        with profiling.stage("import"):
+            stage_funcs = load_stage_functions(args)
+        timings.append(("import", time.time() - t0))
+        print(f"📚 Import modul & TensorFlow: {timings[-1][1]:.1f} detik")
+
+    for i, (name, message, script) in enumerate(STAGES, start=1):
+        print(f"\n[{i}/{len(STAGES)}] {message}")
+        if name == "compare" and args.model == "global":
+            print("⏩ Dilewati (mode model global)")
+            continue
+        t0 = time.time()
+        with profiling.stage(name):
+            if use_subprocess:
+                subprocess.run(["python3", stage_script(name, script, args)] + stage_cli_args(name, args), check=True)
+            else:
+                stage_funcs[name]()
+        timings.append((name, time.time() - t0))
+
+    # Total waktu eksekusi
+    total_time = time.time() - start_time
+    print("\n✅ LOADPRO selesai!")
+    print("⏱️  Waktu per tahap:")
+    for name, dur in timings:
+        print(f"   - {name:<13}: {format_duration(dur)}")
+    if not use_subprocess:
+        from utils.model_cache import get_cache
+        print(get_cache().summary())
+    if profile_dir:
+        profiling.write_report()
+        print("🔬 Operasi terlama (semua proses):")
+        for (stage, op), seconds in profiling.top(profiling.merge_reports(profile_dir)):
+            print(f"   - {stage:<13} {op:<15}: {seconds:.2f} detik")
+        print(f"📄 Run report: {os.path.join(profile_dir, 'run_report.csv')}")
+    print(f"🕒 Total waktu eksekusi: {format_duration(total_time)}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⚡ LOADPRO pipeline end-to-end")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="Jalankan tiap tahap sebagai proses python3 terpisah (mode lama)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses paralel untuk preprocessing (default 1)")
+    parser.add_argument("--train-workers", type=int, default=1,
+                        help="Jumlah proses trainer paralel untuk model per penyulang (default 1)")
+    parser.add_argument("--format", choices=["npz", "store", "npy"], default="npz",
+                        help="Format dataset hasil preprocessing (default npz)")
+    parser.add_argument("--model", choices=["single", "global"], default="single",
+                        help="single: 1 model per penyulang/kategori; global: 1 model untuk semua")
+    parser.add_argument("--horizon", type=positive_int, default=1,
+                        help="Tahap predict_next meramal H+1..H+N (default 1)")
+    parser.add_argument("--profile", nargs="?", const="1", default=None, metavar="DIR",
+                        help="Tulis run report per tahap/feeder (default folder logs/profile/{timestamp})")
+    parser.add_argument("--profile-feeder", default=None, metavar="FEEDER_KATEGORI",
+                        help="Dump cProfile untuk 1 feeder (mis. penyulang_x_malam), butuh --profile")
+    parser.add_argument("--model-cache-mb", type=float, default=None, metavar="MB",
+                        help="Batas memori cache model in-process (default 1024 MB atau "
+                             "LOADPRO_MODEL_CACHE_MB; ~5 MB per model)")
+    main(parser.parse_args())
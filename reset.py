@@ -27,6 +27,8 @@ import shutil
 targets = [
     'data/metadata',
     'data/npz',
+    'data/store',
+    'data/npy',
     #'logs/compare',
     #'logs/predict',
     #'logs/predict_next',
@@ -0,0 +1,58 @@
+# ===================================================
+# ARCHIVE.PY v1.0
+# ---------------------------------------------------
+# LOADPRO | Arsip histori prediksi H+1
+# (results/archive/date=YYYY-MM-DD/, utils/forecast_archive.py)
+#
+# - backfill : isi Actual (A) dari data mentah yang sudah masuk
+# - query    : semua feeder 1 tanggal, atau 1 feeder N hari terakhir
+# - accuracy : MAE/RMSE/MAPE forecast vs actual per feeder (backtest)
+# ===================================================
+# python3 scripts/archive.py backfill
+# python3 scripts/archive.py query --date 2024-01-02
+# python3 scripts/archive.py query --feeder penyulang_x --days 90
+# python3 scripts/archive.py accuracy --days 90 --output results/archive_accuracy.csv
+
+import argparse
+from datetime import datetime, timedelta
+
+from utils.forecast_archive import accuracy, backfill_actuals, feeder_history, for_date, list_dates, query
+
+
+def main(args):
+    if args.command == "backfill":
+        print(f"🗄️  Actual terisi: {backfill_actuals(args.days)} baris")
+        return
+
+    if args.command == "query":
+        if args.date:
+            df = for_date(args.date)
+        elif args.feeder:
+            df = feeder_history(args.feeder, args.days, args.kategori)
+        else:
+            raise SystemExit("❌ Isi --date atau --feeder")
+    else:
+        dates = list_dates()
+        if not dates:
+            raise SystemExit("⚠️  Arsip masih kosong.")
+        start = (datetime.strptime(dates[-1], "%Y-%m-%d") - timedelta(days=args.days - 1)).strftime("%Y-%m-%d")
+        df = accuracy(query(start, dates[-1], feeder=args.feeder, kategori=args.kategori))
+
+    if df.empty:
+        print("⚠️  Tidak ada data.")
+        return
+    print(df.to_string(index=False))
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"📄 Disimpan di: {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🗄️ Arsip histori prediksi H+1")
+    parser.add_argument("command", choices=["backfill", "query", "accuracy"])
+    parser.add_argument("--date", help="Tanggal forecast YYYY-MM-DD (query semua feeder)")
+    parser.add_argument("--feeder", help="Nama penyulang")
+    parser.add_argument("--kategori", choices=["siang", "malam"])
+    parser.add_argument("--days", type=int, default=90, help="Rentang hari terakhir (default 90)")
+    parser.add_argument("--output", help="Simpan hasil ke CSV")
+    main(parser.parse_args())
@@ -0,0 +1,140 @@
+# bench_engine.py
+# --------------------------------------------------
+# Parity check + benchmark engine NumPy (utils/lstm_engine.py) vs Keras:
+# - Self-check tanpa data: model LSTM(U) + Dense(1) acak (beberapa U dan
+#   panjang window) disimpan ke folder sementara, di-pack (build_pack) lalu
+#   WeightPack.forward dibandingkan dengan model.predict. Selalu dijalankan
+#   dulu; --self-check: hanya ini (bisa di checkout baru)
+# - Parity: tiap model di models/single, seluruh window dataset-nya,
+#   |engine - model.predict| <= --atol (exit code 1 bila gagal)
+# - Batch H+1: window terakhir semua feeder sekaligus (forward 1x)
+# - Waktu: build/load weight pack, forward engine, model.predict Keras
+# Dijalankan dari root project (bagian parity & waktu butuh dataset +
+# models/single; tanpa model cukup self-check).
+# --------------------------------------------------
+# python3 scripts/bench_engine.py
+# python3 scripts/bench_engine.py --self-check
+# python3 scripts/bench_engine.py --atol 1e-5 --limit 100
+
+import os
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from utils.load_dataset import load_dataset
+from utils.lstm_engine import MODEL_DIR, build_pack, load_pack
+
+SELF_CHECK_MODELS = [(8, 5), (50, 5), (64, 5), (50, 7)]  # (units, window)
+
+
+def self_check(atol=1e-5, n_samples=256, seed=0):
+    """Parity engine vs model.predict atas model acak di folder sementara; return selisih maks."""
+    from tensorflow import keras
+    rng = np.random.default_rng(seed)
+    keras.utils.set_random_seed(seed)
+    worst = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, "single")
+        os.makedirs(model_dir)
+        refs = {}
+        for units, window in SELF_CHECK_MODELS:
+            keras.backend.clear_session()  # nama layer lstm/dense seperti model hasil train.py
+            model = keras.Sequential([keras.layers.LSTM(units, input_shape=(window, 1)), keras.layers.Dense(1)])
+            # Bobot acak (bias & gate forget tidak nol) agar semua jalur engine teruji
+            model.set_weights([rng.normal(0, 0.5, w.shape).astype(np.float32) for w in model.get_weights()])
+            key = f"acak_u{units}_w{window}"
+            model.save(os.path.join(model_dir, f"{key}.keras"))
+            X = rng.random((n_samples, window, 1), dtype=np.float32)
+            refs[key] = (X, model.predict(X, verbose=0).reshape(-1))
+
+        pack = build_pack(model_dir, os.path.join(tmp, "pack", "single.npz"))
+        missing = sorted(set(refs) - set(pack.keys))
+        if missing:
+            sys.exit(f"❌ Self-check: model tidak masuk weight pack: {', '.join(missing)}")
+        for key, (X, ref) in refs.items():
+            worst = max(worst, np.abs(pack.forward(pack.rows([key]), X[:1])[0, 0] - ref[0]),
+                        np.abs(pack.predict(key, X) - ref).max())
+        # Batch campuran: semua model window 5 dalam 1 forward (units berbeda -> padding)
+        keys5 = [k for k in refs if refs[k][0].shape[1] == 5]
+        batch = pack.forward(pack.rows(keys5), np.stack([refs[k][0][0] for k in keys5]))[:, 0]
+        worst = max(worst, np.abs(batch - np.array([refs[k][1][0] for k in keys5])).max())
+
+    if worst > atol:
+        sys.exit(f"❌ Self-check: selisih engine vs model.predict {worst:.2e} > {atol:.0e}")
+    print(f"✅ Self-check OK: {len(refs)} model acak (units {sorted({u for u, _ in SELF_CHECK_MODELS})}, "
+          f"window {sorted({w for _, w in SELF_CHECK_MODELS})}), selisih maks {worst:.2e}")
+    return worst
+
+
+def main(atol=1e-5, limit=None, self_check_only=False):
+    self_check(atol)
+    if self_check_only:
+        return
+
+    t0 = time.perf_counter()
+    pack = load_pack(log=print)
+    t_pack = time.perf_counter() - t0
+    keys = pack.keys[:limit] if limit else pack.keys
+    print(f"📦 Weight pack: {len(pack.keys)} model, U={pack.Wh.shape[1]}, load {t_pack * 1e3:.1f} ms")
+    if not keys:
+        print("⚠️  Tidak ada model di weight pack: parity data asli & benchmark dilewati.")
+        return
+
+    data = {k: load_dataset(*k.rsplit("_", 1)) for k in keys}
+
+    # Engine per model (semua window)
+    t0 = time.perf_counter()
+    y_engine = {k: pack.predict(k, X) for k, (X, _) in data.items()}
+    t_engine = time.perf_counter() - t0
+
+    # Engine batch H+1 (window terakhir semua feeder, 1x forward)
+    last = np.stack([np.asarray(X[-1]) for X, _ in data.values()])
+    t0 = time.perf_counter()
+    y_next = pack.forward(pack.rows(keys), last)[:, 0]
+    t_next = time.perf_counter() - t0
+
+    # Referensi Keras
+    t0 = time.perf_counter()
+    from tensorflow import keras
+    t_import = time.perf_counter() - t0
+    worst, failed, t_keras, t_load = 0.0, [], 0.0, 0.0
+    for i, k in enumerate(keys):
+        t0 = time.perf_counter()
+        model = keras.models.load_model(os.path.join(MODEL_DIR, f"{k}.keras"), compile=False)
+        t_load += time.perf_counter() - t0
+        X = data[k][0]
+        t0 = time.perf_counter()
+        ref = model.predict(X, verbose=0).reshape(-1)
+        t_keras += time.perf_counter() - t0
+        err = max(np.abs(ref - y_engine[k]).max(), abs(ref[-1] - y_next[i]))
+        worst = max(worst, err)
+        if err > atol:
+            failed.append((k, err))
+        keras.backend.clear_session()
+
+    print(f"{'':<28}{'waktu (ms)':>12}")
+    print(f"{'engine semua window':<28}{t_engine * 1e3:>12.1f}")
+    print(f"{'engine batch H+1':<28}{t_next * 1e3:>12.1f}")
+    print(f"{'keras import':<28}{t_import * 1e3:>12.1f}")
+    print(f"{'keras load_model':<28}{t_load * 1e3:>12.1f}")
+    print(f"{'keras model.predict':<28}{t_keras * 1e3:>12.1f}")
+    print(f"⚡ Predict {t_keras / t_engine:.1f}x lebih cepat (tanpa import & load TensorFlow)")
+
+    if failed:
+        for k, err in failed:
+            print(f"❌ {k}: selisih {err:.2e} > {atol:.0e}")
+        sys.exit(1)
+    print(f"✅ Parity OK: {len(keys)} model, selisih maks {worst:.2e} (atol {atol:.0e})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Parity & benchmark engine NumPy LSTM vs Keras")
+    parser.add_argument("--atol", type=float, default=1e-5, help="Toleransi selisih absolut (default 1e-5)")
+    parser.add_argument("--limit", type=int, default=None, help="Batasi jumlah model yang dicek")
+    parser.add_argument("--self-check", action="store_true",
+                        help="Hanya parity model acak di folder sementara (tanpa dataset/models)")
+    args = parser.parse_args()
+    main(args.atol, args.limit, args.self_check)
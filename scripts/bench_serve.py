@@ -0,0 +1,130 @@
+# bench_serve.py
+# --------------------------------------------------
+# Load test lokal service forecast (scripts/serve.py):
+# - --concurrency klien asyncio (koneksi keep-alive) mengirim total
+#   --requests GET /forecast, tiap request --series deret acak
+# - Laporan: latency p50 / p99 / maks, throughput (request/detik),
+#   rata-rata request per batch (GET /stats)
+# Tanpa --url: service dijalankan sebagai subprocess 2x (micro-batching
+# default vs --max-batch 1 tanpa penggabungan) agar efeknya terlihat.
+# Dijalankan dari root project (butuh dataset + model).
+# --------------------------------------------------
+# python3 scripts/bench_serve.py --requests 2000 --concurrency 32
+# python3 scripts/bench_serve.py --url http://127.0.0.1:8765 --series 1
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+import numpy as np
+
+
+async def http_get(reader, writer, path):
+    """1 request GET di koneksi keep-alive -> (status, json)."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: loadpro\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (header := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await http_get(reader, writer, path)
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, n_requests, concurrency, per_request, seed=0):
+    status, health = await fetch(host, port, "/health")
+    _, stats_before = await fetch(host, port, "/stats")
+    _, all_series = await fetch(host, port, "/forecast")
+    keys = [f"{r['Penyulang']}_{r['Kategori']}" for r in all_series["forecasts"]]
+    rng = random.Random(seed)
+    paths = [f"/forecast?series={','.join(rng.sample(keys, min(per_request, len(keys))))}"
+             for _ in range(n_requests)]
+
+    latencies, errors = [], 0
+    queue = iter(paths)
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for path in queue:
+                t0 = time.perf_counter()
+                status, _ = await http_get(reader, writer, path)
+                latencies.append(time.perf_counter() - t0)
+                errors += status != 200
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    _, stats = await fetch(host, port, "/stats")
+    batches = stats["batches"] - stats_before["batches"] - 1  # tanpa request /forecast semua deret
+    lat = np.array(latencies) * 1e3
+    return {
+        "series_total": health["series"],
+        "requests": len(lat),
+        "errors": errors,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+        "throughput_rps": len(lat) / wall,
+        "req_per_batch": (stats["requests"] - stats_before["requests"] - 1) / max(batches, 1),
+    }
+
+
+def start_server(port, extra_args):
+    proc = subprocess.Popen([sys.executable, "scripts/serve.py", "--port", str(port)] + extra_args,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    # Tunggu sampai service siap (baris "aktif di")
+    for line in proc.stdout:
+        if "aktif di" in line:
+            return proc
+    raise RuntimeError(f"service gagal start (exit code {proc.wait()})")
+
+
+def report(name, r):
+    print(f"{name:<22}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}"
+          f"{r['throughput_rps']:>11.0f}{r['req_per_batch']:>12.1f}{r['errors']:>8}")
+
+
+def main(url=None, n_requests=2000, concurrency=32, per_request=1, port=8799):
+    print(f"⏱️  {n_requests} request, {concurrency} klien, {per_request} deret/request")
+    print(f"{'':<22}{'p50 ms':>9}{'p99 ms':>9}{'maks ms':>9}{'request/s':>11}{'req/batch':>12}{'error':>8}")
+    if url:
+        target = urlsplit(url)
+        report(url, asyncio.run(load_test(target.hostname, target.port, n_requests, concurrency, per_request)))
+        return
+
+    for name, extra in [("micro-batching", []), ("tanpa batching", ["--max-batch", "1", "--max-wait-ms", "0"])]:
+        proc = start_server(port, extra)
+        try:
+            report(name, asyncio.run(load_test("127.0.0.1", port, n_requests, concurrency, per_request)))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Load test service forecast (p50/p99, throughput)")
+    parser.add_argument("--url", default=None, help="Service yang sudah jalan (default: start subprocess)")
+    parser.add_argument("--requests", type=int, default=2000, help="Jumlah request (default 2000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Jumlah klien paralel (default 32)")
+    parser.add_argument("--series", type=int, default=1, help="Deret per request (default 1)")
+    parser.add_argument("--port", type=int, default=8799, help="Port service subprocess (default 8799)")
+    args = parser.parse_args()
+    main(args.url, args.requests, args.concurrency, args.series, args.port)
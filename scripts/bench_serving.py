@@ -0,0 +1,81 @@
+# bench_serving.py
+# --------------------------------------------------
+# Latency per panggilan predict untuk batch 1 .. 10k:
+# - keras   : model.predict(X) (loop predict Keras)
+# - graph   : tf.function signature tetap (utils/serving.py)
+# - xla     : idem + jit_compile
+# Median dari --repeat panggilan setelah warm-up; biaya trace pertama
+# dicatat terpisah. Regression check: hasil graph/xla == model.predict.
+# Model: --model path .keras, default model pertama di models/single,
+# atau LSTM(50) + Dense(1) baru bila belum ada model.
+# --------------------------------------------------
+# python3 scripts/bench_serving.py
+# python3 scripts/bench_serving.py --model models/single/penyulang_x_siang.keras --repeat 20
+
+import os
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+import time
+import argparse
+import numpy as np
+
+from utils import serving
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def load_bench_model(path):
+    from tensorflow import keras
+    if path is None and os.path.isdir(os.path.join("models", "single")):
+        files = sorted(f for f in os.listdir(os.path.join("models", "single")) if f.endswith(".keras"))
+        path = os.path.join("models", "single", files[0]) if files else None
+    if path is not None:
+        return keras.models.load_model(path), path
+    model = keras.Sequential([keras.layers.LSTM(50, input_shape=(5, 1)), keras.layers.Dense(1)])
+    return model, "LSTM(50) + Dense(1) baru"
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def main(model_path=None, repeat=10):
+    model, name = load_bench_model(model_path)
+    rng = np.random.default_rng(0)
+    print(f"📦 Model: {name}, input {model.input_shape}")
+
+    modes = {
+        "keras": lambda X: model.predict(X, verbose=0),
+        "graph": lambda X: serving.predict(model, X, jit=False),
+        "xla": lambda X: serving.predict(model, X, jit=True),
+    }
+
+    # Biaya trace / warm-up pertama
+    X = rng.random((1,) + model.input_shape[1:], dtype=np.float32)
+    for mode, fn in modes.items():
+        t0 = time.perf_counter()
+        fn(X)
+        print(f"🔧 Panggilan pertama {mode:<6}: {(time.perf_counter() - t0) * 1e3:8.1f} ms")
+
+    print(f"\n{'batch':>7}" + "".join(f"{m + ' (ms)':>14}" for m in modes) + f"{'graph vs keras':>16}")
+    for n in BATCH_SIZES:
+        X = rng.random((n,) + model.input_shape[1:], dtype=np.float32)
+        ref = modes["keras"](X)
+        for mode in ("graph", "xla"):
+            diff = np.abs(modes[mode](X) - ref).max()
+            assert diff < 1e-4, f"{mode} batch {n}: selisih {diff:.2e}"
+        t = {mode: timed(lambda: fn(X), repeat) for mode, fn in modes.items()}
+        print(f"{n:>7}" + "".join(f"{t[m] * 1e3:>14.2f}" for m in modes) + f"{t['keras'] / t['graph']:>15.1f}x")
+    print("\n✅ Regression check OK: graph & xla == model.predict")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark model.predict vs tf.function serving")
+    parser.add_argument("--model", default=None, help="Path .keras (default: model pertama di models/single)")
+    parser.add_argument("--repeat", type=int, default=10, help="Panggilan per ukuran batch (default 10)")
+    args = parser.parse_args()
+    main(args.model, args.repeat)
@@ -0,0 +1,122 @@
+# bench_storage.py
+# --------------------------------------------------
+# Benchmark format penyimpanan dataset preprocessing:
+# - npz   : np.savez_compressed X & y per feeder (layout lama)
+# - npy   : deret 1-D uncompressed per feeder, mmap + view strided
+# - store : feature store konsolidasi (X.npy, y.npy, index.csv), mmap
+# Mengukur ukuran di disk dan latency load semua dataset
+# (open saja, dan open + baca penuh seperti saat training/predict).
+# Data sintetis ditulis ke folder sementara, data/ tidak disentuh.
+# --------------------------------------------------
+# python3 scripts/bench_storage.py
+# python3 scripts/bench_storage.py --feeders 1000 --years 3
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from utils.windowing import make_windows
+from utils.feature_store import FeatureStore, write_store
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(path) for f in files)
+
+
+def write_all(base, datasets, window):
+    npz_dir = os.path.join(base, 'npz')
+    npy_dir = os.path.join(base, 'npy')
+    store_dir = os.path.join(base, 'store')
+    os.makedirs(npz_dir)
+    os.makedirs(npy_dir)
+    entries = []
+    for name, series in datasets.items():
+        X, y = make_windows(series, window)
+        np.savez_compressed(os.path.join(npz_dir, f"{name}.npz"), X=X, y=y)
+        np.save(os.path.join(npy_dir, f"{name}.npy"), series)
+        feeder, kategori = name.rsplit('_', 1)
+        entries.append((feeder, kategori, X, y, 0.0, 1.0, len(series)))
+    write_store(entries, window, store_dir)
+    return npz_dir, npy_dir, store_dir
+
+
+def load_npz(npz_dir, names, window, touch):
+    total = 0.0
+    for name in names:
+        with np.load(os.path.join(npz_dir, f"{name}.npz")) as data:
+            X, y = data['X'], data['y']
+        if touch:
+            total += X.sum() + y.sum()
+    return total
+
+
+def load_npy(npy_dir, names, window, touch):
+    total = 0.0
+    for name in names:
+        series = np.load(os.path.join(npy_dir, f"{name}.npy"), mmap_mode='r')
+        X, y = make_windows(series, window)
+        if touch:
+            total += X.sum() + y.sum()
+    return total
+
+
+def load_store(store_dir, names, window, touch):
+    total = 0.0
+    store = FeatureStore(store_dir)
+    for name in names:
+        X, y = store.get(*name.rsplit('_', 1))
+        if touch:
+            total += X.sum() + y.sum()
+    return total
+
+
+def bench(fn, path, names, window, touch, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path, names, window, touch)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark format penyimpanan dataset")
+    parser.add_argument("--feeders", type=int, default=200)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.years * 365
+    datasets = {f"penyulang_{i}_{k}": rng.random(n)
+                for i in range(args.feeders) for k in ("siang", "malam")}
+    names = sorted(datasets)
+
+    base = tempfile.mkdtemp(prefix="loadpro_bench_")
+    try:
+        npz_dir, npy_dir, store_dir = write_all(base, datasets, args.window)
+        # Sanity check: ketiga format menghasilkan X & y yang sama
+        name = names[0]
+        with np.load(os.path.join(npz_dir, f"{name}.npz")) as data:
+            X_ref, y_ref = data['X'], data['y']
+        X_npy, y_npy = make_windows(np.load(os.path.join(npy_dir, f"{name}.npy"), mmap_mode='r'), args.window)
+        X_st, y_st = FeatureStore(store_dir).get(*name.rsplit('_', 1))
+        assert np.array_equal(X_ref, X_npy) and np.array_equal(y_ref, y_npy)
+        assert np.array_equal(X_ref, X_st) and np.array_equal(y_ref, y_st)
+
+        print(f"\n📦 {len(names)} dataset x {n} titik, window={args.window}")
+        print(f"{'Format':<8}{'Disk (MB)':>12}{'Open (ms)':>12}{'Open+baca (ms)':>17}")
+        for label, fn, path in [("npz", load_npz, npz_dir),
+                                ("npy", load_npy, npy_dir),
+                                ("store", load_store, store_dir)]:
+            size = dir_size(path) / 1e6
+            t_open = bench(fn, path, names, args.window, False, args.repeat)
+            t_read = bench(fn, path, names, args.window, True, args.repeat)
+            print(f"{label:<8}{size:>12.2f}{t_open * 1e3:>12.1f}{t_read * 1e3:>17.1f}")
+    finally:
+        shutil.rmtree(base)
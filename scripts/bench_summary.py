@@ -0,0 +1,94 @@
+# bench_summary.py
+# --------------------------------------------------
+# Benchmark ringkasan prediksi H+1:
+# - txt   : 1 file next_{feeder}_{kategori}.txt per penyulang, dibaca &
+#           di-parse baris per baris (summary.py <= v1.3)
+# - table : 1 tabel run_{run_id}.csv (utils/next_results.py), 1x baca
+# Regression check: isi ringkasan kedua cara harus sama.
+# Data sintetis ditulis ke folder sementara, results/ tidak disentuh.
+# --------------------------------------------------
+# python3 scripts/bench_summary.py
+# python3 scripts/bench_summary.py --forecasts 2000
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from utils.next_results import append_run, load_run, render_txt
+
+
+def parse_txt(result_dir):
+    """Cara lama summary.py: buka & split tiap file .txt."""
+    rows = []
+    for fname in sorted(os.listdir(result_dir)):
+        if fname.startswith("next_") and fname.endswith(".txt"):
+            with open(os.path.join(result_dir, fname)) as f:
+                lines = f.readlines()
+            rows.append({
+                "Penyulang": lines[1].split(":")[1].strip(),
+                "Waktu": lines[2].split(":")[1].strip(),
+                "Prediksi_Ampere": float(lines[4].split(":")[1].strip().split()[0]),
+            })
+    return pd.DataFrame(rows)
+
+
+def read_table(result_dir):
+    df = load_run(result_dir=result_dir)
+    return df.rename(columns={"Kategori": "Waktu", "Beban (A)": "Prediksi_Ampere"})
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main(n_forecasts=2000, repeat=3):
+    rng = np.random.default_rng(0)
+    n_feeders = (n_forecasts + 1) // 2
+    df = pd.DataFrame({
+        "Penyulang": np.repeat([f"penyulang_{i:04d}" for i in range(n_feeders)], 2)[:n_forecasts],
+        "Kategori": np.tile(["malam", "siang"], n_feeders)[:n_forecasts],
+        "Tanggal": "2024-01-02",
+        "Beban (A)": rng.uniform(20, 300, n_forecasts),
+        "Model": "single",
+    })
+
+    base = tempfile.mkdtemp(prefix="bench_summary_")
+    try:
+        txt_dir, table_dir = os.path.join(base, "txt"), os.path.join(base, "table")
+        t0 = time.perf_counter()
+        render_txt(df, txt_dir)
+        t_write_txt = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        append_run(df, "20240101_000000", table_dir)
+        t_write_table = time.perf_counter() - t0
+
+        t_txt = min(_timed(parse_txt, txt_dir) for _ in range(repeat))
+        t_table = min(_timed(read_table, table_dir) for _ in range(repeat))
+
+        # Regression check (txt dibulatkan 2 desimal)
+        a = parse_txt(txt_dir).sort_values(["Penyulang", "Waktu"]).reset_index(drop=True)
+        b = read_table(table_dir).sort_values(["Penyulang", "Waktu"]).reset_index(drop=True)
+        assert (a["Penyulang"] == b["Penyulang"]).all() and (a["Waktu"] == b["Waktu"]).all()
+        assert np.allclose(a["Prediksi_Ampere"], b["Prediksi_Ampere"], atol=0.005 + 1e-9)
+        print(f"✅ Regression check OK: {n_forecasts} prediksi identik")
+
+        print(f"{'format':<8}{'tulis (ms)':>12}{'ringkas (ms)':>14}")
+        print(f"{'txt':<8}{t_write_txt * 1e3:>12.1f}{t_txt * 1e3:>14.1f}")
+        print(f"{'table':<8}{t_write_table * 1e3:>12.1f}{t_table * 1e3:>14.1f}")
+        print(f"⚡ Ringkasan {t_txt / t_table:.1f}x lebih cepat")
+    finally:
+        shutil.rmtree(base)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark ringkasan prediksi H+1 (txt vs tabel run)")
+    parser.add_argument("--forecasts", type=int, default=2000, help="Jumlah prediksi (default 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Ulangan, diambil yang tercepat (default 3)")
+    args = parser.parse_args()
+    main(args.forecasts, args.repeat)
@@ -0,0 +1,67 @@
+# bench_window.py
+# --------------------------------------------------
+# Regression check + micro-benchmark windowing preprocessing.
+# - Membandingkan make_windows() (view strided) dengan loop lama
+#   (append scaled[i - window:i] per baris) -> harus identik
+#   (utils/windowing.check_parity, juga dijalankan validator.py --check).
+# - Mengukur waktu keduanya pada deret multi-tahun.
+# - SeriesWindows (tuning window_size): deret yang disusun ulang dari
+#   window 5 menghasilkan window ukuran lain yang identik dengan
+#   windowing langsung dari deret asli.
+# --------------------------------------------------
+# python3 scripts/bench_window.py
+# python3 scripts/bench_window.py --years 10 --repeat 20
+
+import time
+import argparse
+import numpy as np
+
+from utils.windowing import make_windows, SeriesWindows, legacy_windows, check_parity
+
+
+def check_series_windows():
+    series = np.random.default_rng(7).random(400)
+    X5, y5 = make_windows(series, 5)
+    rebuilt = np.concatenate([X5[0, :, 0], y5])  # seperti load_series() untuk npz/store
+    data = SeriesWindows(rebuilt)
+    for window in range(3, 11):
+        X_ref, y_ref = make_windows(series, window)
+        X, y = data.get(window)
+        assert X.shape == (len(series) - window, window, 1), (window, X.shape)
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref), window
+        assert data.get(window)[0] is X  # view di-cache per ukuran
+    print("✅ SeriesWindows: window 3-10 dari deret 1-D identik dengan windowing langsung")
+
+
+def bench(fn, scaled, window, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        X, y = fn(scaled, window)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark windowing preprocessing")
+    parser.add_argument("--years", type=int, default=5, help="Panjang deret (tahun, 1 titik/hari)")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    problems = check_parity()
+    assert not problems, "\n".join(problems)
+    print("✅ Parity: make_windows identik dengan loop lama (shape & nilai)")
+    check_series_windows()
+
+    n = args.years * 365
+    scaled = np.random.default_rng(0).random((n, 1))
+    t_old = bench(legacy_windows, scaled, args.window, args.repeat)
+    t_new = bench(make_windows, scaled, args.window, args.repeat)
+    t_mat = bench(lambda s, w: [np.ascontiguousarray(a) for a in make_windows(s, w)],
+                  scaled, args.window, args.repeat)
+
+    print(f"\n📐 Deret: {n} titik ({args.years} tahun), window={args.window}")
+    print(f"🐢 Loop lama            : {t_old * 1e3:8.3f} ms")
+    print(f"🚀 View strided         : {t_new * 1e3:8.3f} ms  ({t_old / t_new:,.0f}x)")
+    print(f"📦 View + materialisasi : {t_mat * 1e3:8.3f} ms  ({t_old / t_mat:,.0f}x)")
@@ -1,22 +1,39 @@
 ""# ===================================================
-# COMPARE.PY v1.1
+# COMPARE.PY v1.5
 # ---------------------------------------------------
 # Membandingkan model .keras dari folder temporary/ dengan
 # model lama di folder single/, berdasarkan nilai RMSE.
 # Jika model baru lebih baik, maka akan overwrite model lama.
 # Jika model lama lebih baik, maka model baru akan dihapus.
 # Semua hasil perbandingan dicatat ke dalam logs/compare/.
+# v1.2: model dimuat lewat cache bersama (utils/model_cache.py);
+#       model pemenang tetap ter-cache untuk tahap prediksi.
+# v1.3: model lama & baru dievaluasi atas data yang sama
+#       (1 batch penuh per model, RMSE keduanya dihitung sekaligus).
+#       compare_batch() + apply_decisions(): engine batch untuk
+#       compare_all.py (tabel perbandingan, keputusan diterapkan di akhir).
+#       Scaler tidak lagi dimuat (tidak dipakai).
+# v1.4: evaluasi hanya di holdout (ekor deret, utils/evaluation.py);
+#       RMSE/MAE/MAPE semua pasangan dihitung sekaligus dengan NumPy.
+# v1.5: instrumentasi utils/profiling.py (predict per feeder)
 # ===================================================
 # python3 scripts/compare.py --feeder penyulang_bancang --kategori siang
 
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-import joblib
 import numpy as np
+import pandas as pd
 import argparse
 from datetime import datetime
-from tensorflow.keras.models import load_model
-from sklearn.metrics import root_mean_squared_error
+
+from utils import profiling
+tf = profiling.tf_import()
+
+from utils.evaluation import load_holdout, metrics, stack
+from utils.model_cache import get_cache, get_model
+
+OLD_DIR = os.path.join("models", "single")
+NEW_DIR = os.path.join("models", "temporary")
 
 # --- Setup Logging ---
 def setup_logger(feeder, kategori):
@@ -33,47 +50,112 @@ def log_print(msg, logfile):
     print(line)
     logfile.write(line + "\n")
 
+# --- Prediksi model lama & baru pada data yang sama ---
+def predict_pair(model_old, model_new, X):
+    """(pred_old, pred_new) atas X yang sama.
+
+    Model dipanggil langsung (1 batch penuh, tanpa overhead model.predict).
+    """
+    with profiling.timer("predict"):
+        X = tf.convert_to_tensor(np.asarray(X, dtype=np.float32))
+        return (model_old(X, training=False).numpy().reshape(-1),
+                model_new(X, training=False).numpy().reshape(-1))
+
+# --- Engine batch (dipakai compare_all.py) ---
+COLUMNS = ["feeder", "kategori", "rmse_old", "rmse_new", "mae_old", "mae_new",
+           "mape_old", "mape_new", "n_holdout", "decision"]
+
+def compare_batch(pairs, log=print):
+    """Bandingkan semua pasangan di holdout tanpa memindah file -> DataFrame keputusan.
+
+    Prediksi hanya atas holdout tiap feeder; metrik seluruh pasangan dihitung
+    sekaligus dari array prediksi yang ditumpuk (utils/evaluation.py).
+    decision: 'replace' (baru lebih baik), 'discard' (lama lebih baik),
+    'install' (belum ada model lama), 'error' (gagal dievaluasi, file dibiarkan).
+    """
+    rows, scored, y_true, y_old, y_new = [], [], [], [], []
+    for feeder, kategori in pairs:
+        basename = f"{feeder}_{kategori}"
+        old_path = os.path.join(OLD_DIR, f"{basename}.keras")
+        new_path = os.path.join(NEW_DIR, f"{basename}.keras")
+        row = {"feeder": feeder, "kategori": kategori, "decision": "install"}
+        try:
+            with profiling.feeder(basename):
+                if os.path.exists(old_path):
+                    X, y = load_holdout(feeder, kategori)
+                    pred_old, pred_new = predict_pair(get_model(old_path), get_model(new_path), X)
+                    y_true.append(y)
+                    y_old.append(pred_old)
+                    y_new.append(pred_new)
+                    scored.append(len(rows))
+                    row["n_holdout"] = len(y)
+        except Exception as e:
+            row["decision"] = "error"
+            log(f"❌ Gagal membandingkan {basename}: {e}")
+        rows.append(row)
+
+    if scored:
+        Y = stack(y_true)
+        for suffix, pred in (("old", y_old), ("new", y_new)):
+            score = metrics(Y, stack(pred))
+            for j, i in enumerate(scored):
+                for name in ("rmse", "mae", "mape"):
+                    rows[i][f"{name}_{suffix}"] = float(score[name][j])
+        for i in scored:
+            rows[i]["decision"] = "replace" if rows[i]["rmse_new"] < rows[i]["rmse_old"] else "discard"
+
+    table = pd.DataFrame(rows, columns=COLUMNS)
+    for row in table.itertuples():
+        if row.decision != "error":
+            log(f"🔬 {row.feeder}_{row.kategori}: lama={row.rmse_old:.6f} baru={row.rmse_new:.6f} -> {row.decision}")
+    return table
+
+def apply_decisions(table):
+    """Terapkan keputusan setelah semua pasangan selesai dievaluasi (tiap file via os.replace)."""
+    cache = get_cache()
+    for feeder, kategori, decision in zip(table["feeder"], table["kategori"], table["decision"]):
+        new_path = os.path.join(NEW_DIR, f"{feeder}_{kategori}.keras")
+        if decision in ("replace", "install"):
+            cache.move(new_path, os.path.join(OLD_DIR, f"{feeder}_{kategori}.keras"))
+        elif decision == "discard":
+            cache.remove(new_path)
+
 # --- Bandingkan 2 model ---
+@profiling.feeder_scope
 def compare_models(feeder, kategori, verbose=True):
     basename = f"{feeder}_{kategori}"
     old_model_path = f"models/single/{basename}.keras"
     new_model_path = f"models/temporary/{basename}.keras"
-    scaler_path = f"data/metadata/{basename}_scaler.pkl"
-    npz_path = f"data/npz/{basename}.npz"
 
     logfile, log_path = setup_logger(feeder, kategori)
 
     if not os.path.exists(new_model_path):
         log_print(f"⛔ Model baru tidak ditemukan: {new_model_path}", logfile)
+        logfile.close()
         return
     if not os.path.exists(old_model_path):
         log_print(f"⚠️ Model lama tidak ditemukan, langsung gunakan model baru.", logfile)
-        os.replace(new_model_path, old_model_path)
+        get_cache().move(new_model_path, old_model_path)
         log_print(f"📄 Log tersimpan di: {log_path}", logfile)
         logfile.close()
         return
 
-    # Load model dan data
-    model_old = load_model(old_model_path)
-    model_new = load_model(new_model_path)
-    data = np.load(npz_path)
-    scaler = joblib.load(scaler_path)
-    X, y_true = data['X'], data['y']
-
-    y_old = model_old.predict(X).reshape(-1)
-    y_new = model_new.predict(X).reshape(-1)
+    # Load model dan data holdout
+    model_old = get_model(old_model_path)
+    model_new = get_model(new_model_path)
+    X, y_true = load_holdout(feeder, kategori)
 
-    rmse_old = root_mean_squared_error(y_true, y_old)
-    rmse_new = root_mean_squared_error(y_true, y_new)
+    pred_old, pred_new = predict_pair(model_old, model_new, X)
+    rmse_old, rmse_new = metrics(np.stack([y_true, y_true]), np.stack([pred_old, pred_new]))["rmse"]
 
     log_print(f"🆕 RMSE model baru : {rmse_new:.6f}", logfile)
     log_print(f"📦 RMSE model lama : {rmse_old:.6f}", logfile)
 
     if rmse_new < rmse_old:
-        os.replace(new_model_path, old_model_path)
+        get_cache().move(new_model_path, old_model_path)
         log_print(f"✅ Model baru LEBIH BAIK. Menimpa model lama.", logfile)
     else:
-        os.remove(new_model_path)
+        get_cache().remove(new_model_path)
         log_print(f"❌ Model lama lebih baik. Model baru dihapus.", logfile)
 
     log_print(f"📄 Log tersimpan di: {logfile.name}", logfile)
@@ -1,21 +1,31 @@
 # ===================================================
-# COMPARE_ALL.PY v1.2
+# COMPARE_ALL.PY v1.4
 # ---------------------------------------------------
 # Membandingkan seluruh model di models/temporary/
 # dengan model final di models/single/, lalu memilih
 # yang terbaik berdasarkan RMSE validasi.
-# Hanya memproses model yang memiliki data .npz & scaler.
+# Hanya memproses model yang memiliki dataset & scaler.
+# v1.3: --in-process memanggil compare.compare_models()
+#       langsung tanpa subprocess per model.
+# v1.4: --in-process = engine batch (compare.compare_batch):
+#       semua pasangan dievaluasi dulu, tabel perbandingan ditulis ke
+#       results/compare/compare_{timestamp}.csv, baru kemudian model
+#       dipindah/dihapus sekaligus di akhir.
 # ===================================================
 # python3 scripts/compare_all.py
+# python3 scripts/compare_all.py --in-process
 
 import os
+import argparse
 import subprocess
 import time
 from datetime import datetime
 
+from utils.load_dataset import has_dataset
+
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = '3'
 
-def main():
+def main(in_process=False):
     start = time.time()
     os.makedirs("logs/compare", exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -27,30 +37,49 @@ def main():
             print(f"{ts} {msg}")
             logfile.write(f"{ts} {msg}\n")
 
+        if in_process:
+            import compare
+
         temp_models = [f for f in os.listdir("models/temporary") if f.endswith(".keras")]
         log(f"🔍 Ditemukan {len(temp_models)} model di models/temporary/")
         log("-" * 60)
 
-        for filename in sorted(temp_models):
-            try:
-                parts = filename.replace(".keras", "").split("_")
-                feeder = "_".join(parts[:-1])
-                kategori = parts[-1]
+        if in_process:
+            pairs = []
+            for filename in sorted(temp_models):
+                feeder, kategori = filename[:-len(".keras")].rsplit("_", 1)
+                if not has_dataset(feeder, kategori):
+                    log(f"⚠️  Lewati {feeder}_{kategori} karena dataset atau scaler tidak ditemukan.")
+                    continue
+                pairs.append((feeder, kategori))
 
-                npz_path = f"data/npz/{feeder}_{kategori}.npz"
-                pkl_path = f"data/metadata/{feeder}_{kategori}_scaler.pkl"
+            table = compare.compare_batch(pairs, log)
+            os.makedirs("results/compare", exist_ok=True)
+            table_path = os.path.join("results", "compare", f"compare_{timestamp}.csv")
+            table.to_csv(table_path, index=False)
+            compare.apply_decisions(table)
+            counts = table["decision"].value_counts()
+            log("-" * 60)
+            log(f"📊 Keputusan: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+            log(f"📄 Tabel perbandingan: {table_path}")
+        else:
+            for filename in sorted(temp_models):
+                try:
+                    parts = filename.replace(".keras", "").split("_")
+                    feeder = "_".join(parts[:-1])
+                    kategori = parts[-1]
 
-                if not os.path.exists(npz_path) or not os.path.exists(pkl_path):
-                    log(f"⚠️  Lewati {feeder}_{kategori} karena data .npz atau scaler tidak ditemukan.")
-                    continue
+                    if not has_dataset(feeder, kategori):
+                        log(f"⚠️  Lewati {feeder}_{kategori} karena dataset atau scaler tidak ditemukan.")
+                        continue
 
-                log(f"🔬 Membandingkan: {feeder} ({kategori})")
-                cmd = ["python3", "scripts/compare.py", "--feeder", feeder, "--kategori", kategori]
-                subprocess.run(cmd, check=True)
-                log("-" * 60)
+                    log(f"🔬 Membandingkan: {feeder} ({kategori})")
+                    cmd = ["python3", "scripts/compare.py", "--feeder", feeder, "--kategori", kategori]
+                    subprocess.run(cmd, check=True)
+                    log("-" * 60)
 
-            except Exception as e:
-                log(f"❌ Gagal proses {filename}: {e}")
+                except Exception as e:
+                    log(f"❌ Gagal proses {filename}: {e}")
 
         dur = time.time() - start
         m, s = divmod(dur, 60)
@@ -59,4 +88,7 @@ def main():
         log(f"📄 Log tersimpan di: {log_path}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="⚖️ Membandingkan semua model sementara dengan model final.")
+    parser.add_argument('--in-process', action='store_true', help='Bandingkan di proses yang sama (tanpa subprocess)')
+    args = parser.parse_args()
+    main(args.in_process)
@@ -1,8 +1,17 @@
 # ===================================================
-# PREDICT.PY v1.2
+# PREDICT.PY v1.7
 # ---------------------------------------------------
 # Melakukan prediksi beban 1 penyulang untuk 1 kategori
 # (siang/malam) menggunakan model yang sudah dilatih.
+# v1.3: --model global -> pakai model global (train_global.py)
+# v1.4: model dimuat lewat cache bersama (utils/model_cache.py)
+# v1.5: model single dijalankan engine NumPy (utils/lstm_engine.py),
+#       TensorFlow hanya dimuat untuk model global / arsitektur lain
+# v1.6: jalur Keras lewat tf.function signature tetap (utils/serving.py),
+#       model global di-trace sekali untuk semua penyulang
+# v1.7: main() tercatat per feeder di utils/profiling.py
+# v1.8: main(pack=...) menerima weight pack yang sudah dimuat
+#       (predict_all.py memuatnya 1x per tahap, bukan per feeder)
 # Output:
 # - File CSV hasil prediksi
 # - Log evaluasi (MAE, RMSE, MAPE)
@@ -15,9 +24,13 @@ import argparse
 import numpy as np
 import pandas as pd
 from datetime import datetime
-from tensorflow.keras.models import load_model
 from sklearn.metrics import mean_absolute_error, root_mean_squared_error
-import joblib
+
+from utils.load_dataset import load_dataset, load_scaler
+from utils.model_cache import get_model
+from utils.lstm_engine import load_pack
+from utils import profiling, serving
+from utils.global_model import load_global, series_id, global_inputs
 
 
 def log_print(msg, logfile):
@@ -27,14 +40,13 @@ def log_print(msg, logfile):
     logfile.write(line + "\n")
 
 
-def main(feeder, kategori):
+@profiling.feeder_scope
+def main(feeder, kategori, model_type="single", pack=None):
     ts = datetime.now().strftime("%Y%m%d_%H%M")
     basename = f"{feeder}_{kategori}"
 
     # Path
     model_path = f"models/single/{basename}.keras"
-    npz_path = f"data/npz/{basename}.npz"
-    scaler_path = f"data/metadata/{basename}_scaler.pkl"
     output_path = f"results/predict/{basename}_pred.csv"
     log_dir = "logs/predict"
     os.makedirs("results/predict", exist_ok=True)
@@ -43,13 +55,19 @@ def main(feeder, kategori):
     logfile = open(log_path, "a")
 
     # Load
-    model = load_model(model_path)
-    data = np.load(npz_path)
-    scaler = joblib.load(scaler_path)
-    X, y_true = data['X'], data['y']
+    X, y_true = load_dataset(feeder, kategori)
+    scaler = load_scaler(feeder, kategori)
+    if pack is None and model_type == "single":
+        pack = load_pack()
 
     # Predict
-    y_pred = model.predict(X).reshape(-1)
+    if pack is not None and basename in pack.index:
+        y_pred = pack.predict(basename, X)
+    elif model_type == "global":
+        model, index = load_global()
+        y_pred = serving.predict(model, global_inputs(X, series_id(index, feeder, kategori))).reshape(-1)
+    else:
+        y_pred = serving.predict(get_model(model_path), X).reshape(-1)
 
     # Inverse scaling (FIX PATCH v1.2)
     y_true = scaler.inverse_transform(y_true.reshape(-1, 1)).reshape(-1)
@@ -92,5 +110,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="🔮 Melakukan prediksi beban penyulang (siang/malam)")
     parser.add_argument("--feeder", required=True, help="Nama file penyulang tanpa ekstensi")
     parser.add_argument("--kategori", required=True, choices=["siang", "malam"], help="Kategori waktu")
+    parser.add_argument("--model", choices=["single", "global"], default="single",
+                        help="Model per feeder (models/single) atau model global (models/global)")
     args = parser.parse_args()
-    main(args.feeder, args.kategori)
+    main(args.feeder, args.kategori, args.model)
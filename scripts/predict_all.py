@@ -1,9 +1,13 @@
 # ===================================================
-# PREDICT_ALL.PY v1.4
+# PREDICT_ALL.PY v1.7
 # ---------------------------------------------------
 # Melakukan prediksi seluruh data validasi (bukan H+1)
 # hanya untuk penyulang yang memiliki model .keras.
 # Menampilkan info jika model belum tersedia.
+# v1.5: --in-process memanggil predict.main() langsung.
+# v1.6: --model global -> pakai model global (models/global).
+# v1.7: in-process: weight pack dimuat 1x per tahap lalu diteruskan
+#       ke predict.main() (bukan listdir + stat semua .keras per feeder).
 # ---------------------------------------------------
 # Output disimpan ke: results/predict/
 # Log dicatat di: logs/predict/
@@ -11,10 +15,15 @@
 
 import os
 import time
+import argparse
 import subprocess
 from datetime import datetime
 
-def main():
+from utils.load_dataset import list_datasets
+from utils.global_model import global_available, load_index
+from utils.lstm_engine import load_pack
+
+def main(in_process=False, model_type="single"):
     start = time.time()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_dir = "logs/predict"
@@ -28,28 +37,47 @@ def main():
             print(line)
             logfile.write(line + "\n")
 
-        # Ambil semua file .npz sebagai acuan daftar penyulang
-        npz_dir = "data/npz"
-        npz_files = sorted([f for f in os.listdir(npz_dir) if f.endswith(".npz")])
-        log_print(f"📂 Ditemukan {len(npz_files)} file penyulang untuk diproses.")
+        pack = None
+        if in_process:
+            import predict
+            if model_type == "single":
+                pack = load_pack(log=log_print)
+
+        # Model global: cukup cek daftar deret di global_index.json
+        global_index = {}
+        if model_type == "global" and global_available():
+            global_index = load_index()
+
+        # Ambil semua dataset hasil preprocessing sebagai acuan daftar penyulang
+        datasets = list_datasets()
+        log_print(f"📂 Ditemukan {len(datasets)} dataset penyulang untuk diproses.")
         log_print("--------------------------------------------------------")
 
-        for file in npz_files:
-            basename = file.replace(".npz", "")
-            feeder = "_".join(basename.split("_")[:-1])
-            kategori = basename.split("_")[-1]
+        for feeder, kategori in datasets:
+            basename = f"{feeder}_{kategori}"
             model_path = f"models/single/{basename}.keras"
 
-            if not os.path.exists(model_path):
+            if model_type == "global":
+                model_ready = basename in global_index
+            else:
+                model_ready = os.path.exists(model_path)
+            if not model_ready:
                 log_print(f"⚠️  Lewati {basename} karena model belum tersedia.")
                 continue
 
             try:
                 log_print(f"🔁 Memproses: {feeder} ({kategori})")
+                if in_process:
+                    predict.main(feeder, kategori, model_type, pack=pack)
+                    log_print(f"✅ Sukses prediksi: {basename}")
+                    log_print("--------------------------------------------------------")
+                    continue
+
                 result = subprocess.run([
                     "python3", "scripts/predict.py",
                     "--feeder", feeder,
-                    "--kategori", kategori
+                    "--kategori", kategori,
+                    "--model", model_type
                 ], capture_output=True, text=True)
 
                 if result.returncode != 0:
@@ -71,4 +99,9 @@ def main():
         log_print(f"📄 Log tersimpan di: {log_path}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="📈 Prediksi historis semua penyulang yang memiliki model.")
+    parser.add_argument('--in-process', action='store_true', help='Prediksi di proses yang sama (tanpa subprocess)')
+    parser.add_argument('--model', choices=['single', 'global'], default='single',
+                        help='Model per feeder (models/single) atau model global (models/global)')
+    args = parser.parse_args()
+    main(args.in_process, args.model)
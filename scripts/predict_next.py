@@ -1,22 +1,46 @@
 # ===================================================
-# PREDICT_NEXT.PY v1.1
+# PREDICT_NEXT.PY v1.11
 # ---------------------------------------------------
 # Memprediksi beban H+1 berdasarkan window terakhir
-# dari hasil preprocessing (.npz dan scaler.pkl).
+# dari hasil preprocessing (dataset + scaler).
 # Tanggal H+1 diambil dari data raw CSV terakhir.
-# Hasil prediksi disimpan dalam bentuk deskriptif .txt
-# dan log proses di logs/predict/.
+# Hasil prediksi di-append ke tabel run (utils/next_results.py),
+# teks deskriptif .txt opsional (--txt); log proses di logs/predict_next/.
+# v1.2: --model global -> pakai model global (train_global.py)
+# v1.3: tanggal terakhir dari manifest preprocessing (fallback: CSV raw);
+#       forecast_batch() untuk H+1 semua penyulang sekaligus
+#       (dipakai predict_next_all.py --in-process)
+# v1.4: model dimuat lewat cache bersama (utils/model_cache.py)
+# v1.5: hasil ke tabel results/predict_next/run_{run_id}.csv (--run-id,
+#       default run baru), .txt hanya dengan --txt
+# v1.6: model single dijalankan engine NumPy (utils/lstm_engine.py):
+#       H+1 semua feeder = 1x forward atas weight pack, tanpa TensorFlow
+# v1.7: jalur Keras (model global) lewat tf.function signature tetap
+#       (utils/serving.py), bukan model.predict
+# v1.8: forecast_batch dipecah (last_windows, scaler_params,
+#       forecast_scaled) agar state bisa disimpan di memori oleh serve.py
+# v1.9: --horizon N -> H+1..H+N rekursif (rollout): prediksi tiap langkah
+#       digeser masuk ke window, 1 forward batch semua feeder per langkah;
+#       kolom Beban H+2 (A) .. Beban H+N (A) di tabel run yang sama
+# v1.10: main() tercatat per feeder di utils/profiling.py
+# v1.11: forecast_scaled(pack=...): weight pack dimuat 1x per
+#        forecast_batch / state serve.py, bukan per langkah horizon
 # ===================================================
 
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
 import argparse
-import joblib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from tensorflow.keras.models import load_model
+
+from utils.load_dataset import load_dataset, load_scaler, last_date
+from utils.model_cache import get_model
+from utils.lstm_engine import load_pack
+from utils import profiling, serving
+from utils.next_results import append_run, new_run_id, render_txt, horizon_column, horizon_arg
+from utils.global_model import MODEL_PATH as GLOBAL_MODEL_PATH, load_global, series_id, global_inputs
 
 # --- Logging Setup ---
 def setup_logger(feeder, kategori):
@@ -33,51 +57,149 @@ def log_print(msg, logfile):
     print(line)
     logfile.write(line + "\n")
 
+# --- Tanggal H+1 ---
+def next_date(feeder, kategori):
+    """Tanggal H+1: dari manifest preprocessing, fallback baca ulang CSV raw."""
+    last = last_date(feeder, kategori)
+    if last is None:
+        df_raw = pd.read_csv(f"data/raw/{feeder}.csv")
+        df_raw = df_raw[df_raw['Waktu'] == kategori]
+        last = pd.to_datetime(df_raw['Tanggal'], format='%m/%d/%Y').max()
+    return last + timedelta(days=1)
+
+# --- Batch H+1 (semua penyulang sekaligus) ---
+def last_windows(pairs):
+    """Window terakhir semua deret -> array (n, window, 1)."""
+    return np.stack([np.asarray(load_dataset(f, k)[0][-1]) for f, k in pairs])
+
+def scaler_params(pairs):
+    """(min_, scale_) MinMaxScaler semua deret untuk inverse tervektorisasi."""
+    scalers = [load_scaler(f, k) for f, k in pairs]
+    return np.array([s.min_[0] for s in scalers]), np.array([s.scale_[0] for s in scalers])
+
+def forecast_scaled(pairs, windows, model_type="single", pack=None):
+    """Prediksi ter-skala (n,) untuk windows milik pairs.
+
+    Model global: 1x predict untuk semua baris; model single: 1x forward
+    engine NumPy atas weight pack, model di luar pack dimuat lewat Keras.
+    Model yang gagal dimuat menghasilkan NaN. pack: weight pack yang sudah
+    dimuat (default load_pack()).
+    """
+    if model_type == "global":
+        model, index = load_global()
+        ids = np.array([series_id(index, f, k) for f, k in pairs], dtype=np.int32)
+        return serving.predict(model, [windows, ids]).reshape(-1)
+    y_scaled = np.full(len(pairs), np.nan)
+    if pack is None:
+        pack = load_pack()
+    keys = np.array([f"{f}_{k}" for f, k in pairs])
+    packed = np.array([key in pack.index for key in keys], dtype=bool)
+    if packed.any():
+        y_scaled[packed] = pack.forward(pack.rows(keys[packed]), windows[packed])[:, 0]
+    for i in np.flatnonzero(~packed):
+        f, k = pairs[i]
+        try:
+            model = get_model(f"models/single/{f}_{k}.keras")
+            y_scaled[i] = float(model(windows[i:i + 1], training=False)[0, 0])
+        except Exception:
+            y_scaled[i] = np.nan
+    return y_scaled
+
+# --- Horizon H+1..H+N ---
+def rollout(predict_fn, windows, horizon=1):
+    """Prediksi rekursif (n, horizon) dalam skala scaler.
+
+    predict_fn(windows) -> (n,) dipanggil 1x per langkah untuk semua baris;
+    hasil langkah h digeser masuk ke window untuk langkah h+1. Window harus
+    1 fitur (beban) agar prediksi bisa menjadi input berikutnya.
+    """
+    if horizon < 1:
+        raise ValueError(f"horizon harus >= 1, bukan {horizon}")
+    windows = np.asarray(windows, dtype=np.float32)
+    if horizon > 1 and windows.shape[2] != 1:
+        raise ValueError(f"horizon > 1 butuh window 1 fitur, bukan {windows.shape[2]}")
+    steps = np.empty((len(windows), horizon))
+    for h in range(horizon):
+        steps[:, h] = predict_fn(windows)
+        if h + 1 < horizon:
+            windows = np.concatenate([windows[:, 1:], steps[:, h, None, None].astype(np.float32)], axis=1)
+    return steps
+
+def forecast_batch(pairs, model_type="single", horizon=1):
+    """Prediksi H+1 (..H+horizon) untuk list (feeder, kategori) -> DataFrame.
+
+    Window terakhir semua deret dikumpulkan ke 1 array lalu diprediksi
+    sekaligus (forecast_scaled), 1x per langkah horizon; Beban (A) = NaN
+    bila model gagal dimuat.
+    """
+    pack = load_pack() if model_type == "single" else None
+    y_scaled = rollout(lambda w: forecast_scaled(pairs, w, model_type, pack), last_windows(pairs), horizon)
+
+    # Inverse MinMaxScaler tervektorisasi: x = (x_scaled - min_) / scale_
+    mins, scales = scaler_params(pairs)
+    y_pred = (y_scaled - mins[:, None]) / scales[:, None]
+
+    df = pd.DataFrame({
+        "Penyulang": [f for f, _ in pairs],
+        "Kategori": [k for _, k in pairs],
+        "Tanggal": [next_date(f, k).strftime('%Y-%m-%d') for f, k in pairs],
+        "Beban (A)": y_pred[:, 0],
+        "Model": model_type,
+    })
+    for h in range(2, horizon + 1):
+        df[horizon_column(h)] = y_pred[:, h - 1]
+    return df
+
 # --- Main Function ---
-def main(feeder, kategori):
+@profiling.feeder_scope
+def main(feeder, kategori, model_type="single", run_id=None, txt=False, horizon=1):
     basename = f"{feeder}_{kategori}"
-    model_path = f"models/single/{basename}.keras"
-    npz_path = f"data/npz/{basename}.npz"
-    scaler_path = f"data/metadata/{basename}_scaler.pkl"
-    csv_path = f"data/raw/{feeder}.csv"
+    model_path = GLOBAL_MODEL_PATH if model_type == "global" else f"models/single/{basename}.keras"
 
     logfile, log_path = setup_logger(feeder, kategori)
 
     try:
         log_print(f"📦 Memuat model: {model_path}", logfile)
-        model = load_model(model_path)
-
-        log_print(f"📊 Memuat data window terakhir dari: {npz_path}", logfile)
-        data = np.load(npz_path)
-        X = data['X']
+        log_print(f"📊 Memuat data window terakhir: {basename}", logfile)
+        X, _ = load_dataset(feeder, kategori)
         x_input = X[-1].reshape(1, X.shape[1], X.shape[2])
+        pack = load_pack() if model_type == "single" else None
+        if pack is not None and basename in pack.index:
+            predict_fn = lambda w: pack.predict(basename, w)
+        elif model_type == "global":
+            model, index = load_global()
+            sid = series_id(index, feeder, kategori)
+            predict_fn = lambda w: serving.predict(model, global_inputs(w, sid)).reshape(-1)
+        else:
+            model = get_model(model_path)
+            predict_fn = lambda w: serving.predict(model, w).reshape(-1)
+        if horizon > 1:
+            log_print(f"🔁 Rollout rekursif H+1..H+{horizon}...", logfile)
+        y_pred_scaled = rollout(predict_fn, x_input, horizon)[0]
 
         log_print(f"🔄 Inverse transform hasil prediksi...", logfile)
-        scaler = joblib.load(scaler_path)
-        y_pred_scaled = model.predict(x_input).reshape(-1)[0]
-        y_pred = scaler.inverse_transform([[y_pred_scaled]])[0][0]
-
-        log_print(f"📅 Membaca tanggal terakhir dari: {csv_path}", logfile)
-        df_raw = pd.read_csv(csv_path)
-        df_raw = df_raw[df_raw['Waktu'] == kategori]
-        df_raw['Tanggal'] = pd.to_datetime(df_raw['Tanggal'], format='%m/%d/%Y')
-        last_date = df_raw['Tanggal'].max()
-        next_date = last_date + timedelta(days=1)
-        next_date_str = next_date.strftime('%A, %d %B %Y')
-
-        output_dir = "results/predict_next"
-        os.makedirs(output_dir, exist_ok=True)
-        txt_path = os.path.join(output_dir, f"next_{basename}.txt")
-
-        with open(txt_path, "w") as f:
-            f.write(f"📈 Hasil Prediksi Beban H+1\n")
-            f.write(f"Penyulang : {feeder}\n")
-            f.write(f"Kategori : {kategori}\n")
-            f.write(f"Tanggal  : {next_date_str}\n")
-            f.write(f"Beban    : {y_pred:.2f} A\n")
+        scaler = load_scaler(feeder, kategori)
+        y_steps = scaler.inverse_transform(y_pred_scaled.reshape(-1, 1))[:, 0]
+        y_pred = y_steps[0]
+
+        log_print(f"📅 Menentukan tanggal H+1...", logfile)
+        row = pd.DataFrame({
+            "Penyulang": [feeder],
+            "Kategori": [kategori],
+            "Tanggal": [next_date(feeder, kategori).strftime('%Y-%m-%d')],
+            "Beban (A)": [y_pred],
+            "Model": [model_type],
+        })
+        for h in range(2, horizon + 1):
+            row[horizon_column(h)] = y_steps[h - 1]
+        result_path = append_run(row, run_id or new_run_id())
+        if txt:
+            render_txt(row)
 
         log_print(f"✅ Prediksi beban H+1 = {y_pred:.2f} A", logfile)
-        log_print(f"📄 Hasil disimpan di: {txt_path}", logfile)
+        for h in range(2, horizon + 1):
+            log_print(f"   H+{h} = {y_steps[h - 1]:.2f} A", logfile)
+        log_print(f"📄 Hasil disimpan di: {result_path}", logfile)
         log_print(f"📝 Log tersimpan di: {log_path}", logfile)
         log_print(f"🎉 Prediksi selesai untuk {feeder} ({kategori}).", logfile)
     except Exception as e:
@@ -90,6 +212,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="🔮 Prediksi beban H+1 dari window terakhir.")
     parser.add_argument('--feeder', required=True, help='Nama penyulang tanpa ekstensi')
     parser.add_argument('--kategori', required=True, choices=['siang', 'malam'], help='Kategori waktu')
+    parser.add_argument('--model', choices=['single', 'global'], default='single',
+                        help='Model per feeder (models/single) atau model global (models/global)')
+    parser.add_argument('--run-id', default=None, help='Tambahkan ke tabel run ini (default: run baru)')
+    parser.add_argument('--txt', action='store_true', help='Tulis juga next_{feeder}_{kategori}.txt')
+    parser.add_argument('--horizon', type=horizon_arg, default=1, help='Prediksi H+1..H+N rekursif (default 1)')
     args = parser.parse_args()
 
-    main(args.feeder, args.kategori)
+    main(args.feeder, args.kategori, args.model, args.run_id, args.txt, args.horizon)
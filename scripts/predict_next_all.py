@@ -1,19 +1,42 @@
 # ===================================================
-# PREDICT_NEXT_ALL.PY v1.1
+# PREDICT_NEXT_ALL.PY v1.7
 # ---------------------------------------------------
 # Melakukan prediksi next day (H+1) hanya untuk feeder
 # yang memiliki model .keras final di models/single/.
+# v1.2: --in-process memanggil predict_next.main() langsung.
+# v1.3: --model global -> pakai model global (models/global).
+# v1.4: --in-process = forecaster batch: model dimuat sekali, window
+#       terakhir semua penyulang dalam 1 array, tanggal dari manifest,
+#       hasil ditulis ke 1 CSV (results/predict_next/predict_next.csv).
+# v1.5: 1 tabel per run results/predict_next/run_{run_id}.csv
+#       (utils/next_results.py), juga di mode subprocess (--run-id);
+#       next_{feeder}_{kategori}.txt hanya dengan --txt.
+# v1.6: tabel run diarsipkan ke results/archive/date=YYYY-MM-DD/
+#       (utils/forecast_archive.py) beserta versi model.
+# v1.7: --horizon N -> H+1..H+N rekursif, 1 forward batch per langkah
+#       (mode --in-process); kolom Beban H+2 (A).. di tabel run. Arsip
+#       tetap hanya H+1.
 # ---------------------------------------------------
 # Output disimpan ke: results/predict_next/
+#   - run_{run_id}.csv (semua penyulang) [+ next_{feeder}_{kategori}.txt]
+#   - arsip histori: results/archive/date=YYYY-MM-DD/forecasts.csv
 # Log dicatat di: logs/predict_next/
 # ===================================================
 
 import os
 import time
+import argparse
 import subprocess
 from datetime import datetime
 
-def main():
+from utils.load_dataset import list_datasets
+from utils.global_model import MODEL_PATH as GLOBAL_MODEL_PATH, global_available, load_index
+from utils.next_results import append_run, list_runs, load_run, render_txt, run_path, horizon_arg
+from utils.forecast_archive import archive_run, model_version
+
+def main(in_process=False, model_type="single", txt=False, horizon=1):
+    if horizon < 1:
+        raise ValueError(f"horizon harus >= 1, bukan {horizon}")
     start = time.time()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_dir = "logs/predict_next"
@@ -27,47 +50,90 @@ def main():
             print(line)
             logfile.write(line + "\n")
 
-        # Cari semua file .npz
-        data_dir = "data/npz"
-        npz_files = sorted([f for f in os.listdir(data_dir) if f.endswith(".npz")])
-        log(f"📂 Ditemukan {len(npz_files)} file penyulang untuk diproses.")
+        if in_process:
+            import predict_next
+
+        # Model global: cukup cek daftar deret di global_index.json
+        global_index = {}
+        if model_type == "global" and global_available():
+            global_index = load_index()
+
+        # Cari semua dataset hasil preprocessing
+        datasets = list_datasets()
+        log(f"📂 Ditemukan {len(datasets)} dataset penyulang untuk diproses.")
         log("--------------------------------------------------------")
 
-        for file in npz_files:
-            try:
-                nama = file.replace(".npz", "")
-                feeder = "_".join(nama.split("_")[:-1])
-                kategori = nama.split("_")[-1]
-                model_path = f"models/single/{feeder}_{kategori}.keras"
+        ready = []
+        for feeder, kategori in datasets:
+            model_path = f"models/single/{feeder}_{kategori}.keras"
+            if model_type == "global":
+                model_ready = f"{feeder}_{kategori}" in global_index
+            else:
+                model_ready = os.path.exists(model_path)
+            if not model_ready:
+                log(f"⚠️  Lewati {feeder}_{kategori} karena model belum tersedia.")
+                continue
+            ready.append((feeder, kategori))
 
-                if not os.path.exists(model_path):
-                    log(f"⚠️  Lewati {feeder}_{kategori} karena model belum tersedia.")
-                    continue
+        if in_process and ready:
+            log(f"🚀 Forecast batch {len(ready)} penyulang (model: {model_type}, horizon H+{horizon})...")
+            df = predict_next.forecast_batch(ready, model_type, horizon)
+            failed = df[df["Beban (A)"].isna()]
+            for row in failed.itertuples(index=False):
+                log(f"❌ Gagal prediksi: {row.Penyulang}_{row.Kategori}")
+            df = df.dropna(subset=["Beban (A)"])
+            csv_path = append_run(df, timestamp)
+            if txt:
+                render_txt(df)
+            log(f"✅ Sukses prediksi: {len(df)} dari {len(ready)} penyulang")
+            log(f"📄 Hasil disimpan di: {csv_path}")
 
-                log(f"🔁 Memproses: {feeder} ({kategori})")
+        elif not in_process:
+            for feeder, kategori in ready:
+                try:
+                    log(f"🔁 Memproses: {feeder} ({kategori})")
 
-                result = subprocess.run([
-                    "python3", "scripts/predict_next.py",
-                    "--feeder", feeder,
-                    "--kategori", kategori
-                ], capture_output=True, text=True)
+                    result = subprocess.run([
+                        "python3", "scripts/predict_next.py",
+                        "--feeder", feeder,
+                        "--kategori", kategori,
+                        "--model", model_type,
+                        "--run-id", timestamp,
+                        "--horizon", str(horizon),
+                    ] + (["--txt"] if txt else []), capture_output=True, text=True)
 
-                if result.returncode != 0:
-                    log(f"❌ Gagal prediksi: {feeder}_{kategori}")
-                    log(f"    Pesan error: {result.stderr.strip()}")
-                else:
-                    log(f"✅ Sukses prediksi: {feeder}_{kategori}")
+                    if result.returncode != 0:
+                        log(f"❌ Gagal prediksi: {feeder}_{kategori}")
+                        log(f"    Pesan error: {result.stderr.strip()}")
+                    else:
+                        log(f"✅ Sukses prediksi: {feeder}_{kategori}")
 
-                log("--------------------------------------------------------")
-            except Exception as e:
-                log(f"❌ Error tak terduga saat memproses {file}: {e}")
-                continue
+                    log("--------------------------------------------------------")
+                except Exception as e:
+                    log(f"❌ Error tak terduga saat memproses {feeder}_{kategori}: {e}")
+                    continue
 
         dur = time.time() - start
         m, s = divmod(dur, 60)
+        if not in_process and ready:
+            log(f"📄 Hasil disimpan di: {run_path(timestamp)}")
+
+        if timestamp in list_runs():
+            run = load_run(timestamp)
+            run["Model_Version"] = [
+                model_version(GLOBAL_MODEL_PATH if m == "global" else f"models/single/{f}_{k}.keras")
+                for f, k, m in zip(run["Penyulang"], run["Kategori"], run["Model"])]
+            log(f"🗄️  Diarsipkan: {archive_run(run)} prediksi ke results/archive/")
         log(f"🎉 Prediksi next day selesai.")
         log(f"🕒 Durasi total: {int(m)} menit {int(s)} detik")
         log(f"📄 Log disimpan di: {log_path}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="🔮 Prediksi H+1 semua penyulang yang memiliki model.")
+    parser.add_argument('--in-process', action='store_true', help='Prediksi di proses yang sama (tanpa subprocess)')
+    parser.add_argument('--model', choices=['single', 'global'], default='single',
+                        help='Model per feeder (models/single) atau model global (models/global)')
+    parser.add_argument('--txt', action='store_true', help='Tulis juga next_{feeder}_{kategori}.txt per penyulang')
+    parser.add_argument('--horizon', type=horizon_arg, default=1, help='Prediksi H+1..H+N rekursif (default 1)')
+    args = parser.parse_args()
+    main(args.in_process, args.model, args.txt, args.horizon)
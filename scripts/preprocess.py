@@ -1,5 +1,5 @@
 # ===================================================
-# PREPROCESS.PY v1.6.1
+# PREPROCESS.PY v2.5
 # ---------------------------------------------------
 # LOADPRO Project | Preprocessing 1000+ Feeder Skala Besar
 #
@@ -12,33 +12,105 @@
 # - Fix: Kolom 'Waktu' berisi label 'siang/malam', bukan jam
 # - Mapping otomatis: 'siang' → '10:00:00', 'malam' → '19:00:00'
 # - Logging distribusi jam unik untuk debug
+#
+# Patch v1.6.2:
+# - main() aman dipanggil in-process dari loadpro.py
+#   (stderr dikembalikan, env CUDA hanya di-set saat CLI)
+#
+# v1.7:
+# - --workers N: file dibagi ke process pool (1 file = 1 task)
+# - Tiap worker menulis log sendiri, digabung ke log utama di akhir
+# - Ringkasan gabungan (sukses/gagal/sampel) di akhir run
+#
+# v1.8:
+# - Windowing memakai view strided (utils/windowing.py), bukan loop
+# - Ukuran window bisa diatur: --window N (default 5)
+#
+# v1.9 (incremental):
+# - Manifest data/metadata/manifest.json: size, mtime, sha256, jumlah
+#   baris & sampel per feeder
+# - CSV tidak berubah -> dilewati
+# - CSV hanya bertambah baris -> window baru di-append ke dataset
+# - Refit scaler dipaksa (rebuild penuh) bila nilai baru di luar
+#   [data_min_, data_max_] scaler lama, kategori baru muncul, atau
+#   window berubah. --full memaksa rebuild semua file.
+#
+# v2.0:
+# - --format store: semua dataset ditulis ke 1 feature store
+#   konsolidasi (data/store/X.npy, y.npy, index.csv) menggantikan
+#   ribuan .npz + .pkl. Dibaca lewat utils/load_dataset.py.
+#
+# v2.1:
+# - --format npy: hanya deret 1-D hasil scaling per feeder, uncompressed
+#   (data/npy/*.npy). Dibaca dengan mmap; X dibentuk ulang sebagai view
+#   strided saat load (5x lebih kecil dari X yang dimaterialisasi).
+#
+# v2.2:
+# - Tanggal terakhir per kategori (kolom Tanggal CSV mentah) dicatat di
+#   manifest sebagai last_date, dipakai prediksi H+1 tanpa membaca ulang CSV.
+#
+# v2.3:
+# - Ukuran holdout evaluasi (ekor deret, utils/evaluation.py) dicatat di
+#   manifest sebagai holdout; ditetapkan saat rebuild, tetap saat append.
+#
+# v2.4:
+# - Instrumentasi utils/profiling.py: read_csv, save_dataset, total per feeder
+#
+# v2.5:
+# - CSV tidak berubah hanya dilewati bila output yang tercatat di manifest
+#   (npz/npy + scaler .pkl, atau entri feature store) masih ada; output
+#   yang hilang/terhapus -> rebuild penuh feeder tsb
+# - --format store: hanya dataset feeder yang di-rebuild / di-append yang
+#   ditulis (utils/feature_store.update_store, append-only + index baru);
+#   run tanpa perubahan tidak menyentuh store sama sekali
 # ===================================================
 
 import os
-os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = '3'
+import io
 import sys
+import json
 import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from sklearn.preprocessing import MinMaxScaler
 import joblib
 
+from utils import profiling
+from utils.windowing import DEFAULT_WINDOW, make_windows
+from utils.evaluation import holdout_size
+from utils.feature_store import FeatureStore, open_store, update_store
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs', 'preprocess'))
+STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'store'))
+NPY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'npy'))
+FORMATS = ["npz", "store", "npy"]
+
+# Worker pool menulis detail hanya ke log worker (tidak ke terminal)
+_echo = True
+_worker_log = None
+
 # --- Setup Logging ---
 def setup_logger():
-    log_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs', 'preprocess'))
-    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(LOG_DIR, exist_ok=True)
     ts = datetime.now().strftime('%Y%m%d_%H%M')
-    stdout_log = os.path.join(log_dir, f"{ts}_preprocess.log")
-    stderr_log = os.path.join(log_dir, f"{ts}_preprocess_error.log")
+    stdout_log = os.path.join(LOG_DIR, f"{ts}_preprocess.log")
+    stderr_log = os.path.join(LOG_DIR, f"{ts}_preprocess_error.log")
     sys.stderr = open(stderr_log, "a")  # redirect internal error
     return open(stdout_log, "a"), stderr_log
 
 def log_print(msg, logfile):
     timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
     line = f"{timestamp} {msg}"
-    print(line)
+    if _echo:
+        print(line)
     logfile.write(line + "\n")
 
 # --- Simpan .npz dan scaler ---
@@ -48,97 +120,450 @@ def save_npz_and_scaler(feeder, kategori, X, y, scaler, npz_dir, meta_dir):
     np.savez_compressed(os.path.join(npz_dir, npz_name), X=X, y=y)
     joblib.dump(scaler, os.path.join(meta_dir, scaler_name))
 
+# --- Simpan / baca dataset sesuai format output ---
+def save_dataset(fmt, feeder, kategori, X, y, scaler, npz_dir, meta_dir, result):
+    with profiling.timer("save_dataset"):
+        if fmt == "store":
+            # Store ditulis sekaligus oleh main() setelah semua file selesai
+            result["arrays"][kategori] = (np.ascontiguousarray(X), y, float(scaler.data_min_[0]),
+                                          float(scaler.data_max_[0]), int(scaler.n_samples_seen_))
+        elif fmt == "npy":
+            # Cukup deret 1-D: X[0] + seluruh y
+            series = np.concatenate([X[0, :, 0], y])
+            np.save(os.path.join(NPY_DIR, f"{feeder}_{kategori}.npy"), series)
+            joblib.dump(scaler, os.path.join(meta_dir, f"{feeder}_{kategori}_scaler.pkl"))
+        else:
+            save_npz_and_scaler(feeder, kategori, X, y, scaler, npz_dir, meta_dir)
+
+def load_existing(fmt, feeder, kategori, npz_dir, meta_dir, window=DEFAULT_WINDOW):
+    """(X, y, scaler) dataset hasil run sebelumnya, atau None bila tidak ada."""
+    if fmt == "store":
+        if not FeatureStore.exists(STORE_DIR):
+            return None
+        store = open_store(STORE_DIR)
+        if (feeder, kategori) not in store:
+            return None
+        X, y = store.get(feeder, kategori)
+        return np.array(X), np.array(y), store.scaler(feeder, kategori)
+
+    scaler_path = os.path.join(meta_dir, f"{feeder}_{kategori}_scaler.pkl")
+    if fmt == "npy":
+        npy_path = os.path.join(NPY_DIR, f"{feeder}_{kategori}.npy")
+        if not os.path.exists(npy_path) or not os.path.exists(scaler_path):
+            return None
+        X, y = make_windows(np.load(npy_path), window)
+        return X, y, joblib.load(scaler_path)
+
+    npz_path = os.path.join(npz_dir, f"{feeder}_{kategori}.npz")
+    if not os.path.exists(npz_path) or not os.path.exists(scaler_path):
+        return None
+    with np.load(npz_path) as data:
+        return data['X'], data['y'], joblib.load(scaler_path)
+
+def outputs_exist(fmt, feeder, kategoris, npz_dir, meta_dir):
+    """True bila dataset semua kategori yang tercatat di manifest masih ada di disk."""
+    for kategori in kategoris:
+        if fmt == "store":
+            try:
+                ok = FeatureStore.exists(STORE_DIR) and (feeder, kategori) in open_store(STORE_DIR)
+            except (OSError, ValueError):
+                ok = False
+        else:
+            data_path = (os.path.join(NPY_DIR, f"{feeder}_{kategori}.npy") if fmt == "npy"
+                         else os.path.join(npz_dir, f"{feeder}_{kategori}.npz"))
+            scaler_path = os.path.join(meta_dir, f"{feeder}_{kategori}_scaler.pkl")
+            ok = os.path.exists(data_path) and os.path.exists(scaler_path)
+        if not ok:
+            return False
+    return True
+
+# --- Manifest sumber (preprocessing incremental) ---
+def load_manifest(meta_dir):
+    path = os.path.join(meta_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "window": None, "feeders": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest, meta_dir):
+    path = os.path.join(meta_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def hash_file(path, prefix_size=None):
+    """sha256 seluruh file; bila prefix_size diisi, juga sha256 + byte terakhir prefix."""
+    digest = hashlib.sha256()
+    prefix_digest, prefix_last = None, b""
+    with open(path, "rb") as f:
+        if prefix_size:
+            remaining = prefix_size
+            while remaining > 0:
+                chunk = f.read(min(1 << 20, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                prefix_last = chunk[-1:]
+                remaining -= len(chunk)
+            prefix_digest = digest.copy().hexdigest()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), prefix_digest, prefix_last
+
+def plan_update(file_path, stat, entry):
+    """Tentukan aksi untuk 1 CSV: 'unchanged', 'append', atau 'full'.
+
+    - unchanged: size & mtime sama, atau isi (sha256) sama
+    - append   : file bertambah dan prefix lama identik byte-per-byte
+    - full     : selain itu (file baru, diedit di tengah, terpotong)
+    """
+    if entry is None:
+        return "full", hash_file(file_path)[0]
+    if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+        return "unchanged", entry["sha256"]
+    grown = stat.st_size > entry["size"]
+    digest, prefix_digest, prefix_last = hash_file(file_path, entry["size"] if grown else None)
+    if digest == entry["sha256"]:
+        return "unchanged", digest
+    if grown and prefix_digest == entry["sha256"] and prefix_last == b"\n":
+        return "append", digest
+    return "full", digest
+
+# --- Pembersihan + pemisahan kategori ---
+def clean_and_split(df, feeder, logfile):
+    """Bersihkan baris 'fail'/0/NaN lalu kembalikan {kategori: array beban}."""
+    awal = len(df)
+
+    # Hapus 'fail', 0, dan NaN
+    fail_count = (df['Beban'] == 'fail').sum()
+    df = df[df['Beban'] != 'fail']
+    df['Beban'] = pd.to_numeric(df['Beban'], errors='coerce')
+    zero_count = (df['Beban'] == 0).sum()
+    nan_count = df['Beban'].isna().sum()
+    df = df[(df['Beban'] != 0) & (~df['Beban'].isna())]
+    akhir = len(df)
+
+    log_print(f"🧹 Pembersihan data:", logfile)
+    log_print(f"   - 'fail' dihapus: {fail_count}", logfile)
+    log_print(f"   - 0 dihapus: {zero_count}", logfile)
+    log_print(f"   - NaN dihapus: {nan_count}", logfile)
+    log_print(f"   - Sisa baris: {akhir} dari {awal}", logfile)
+
+    # --- PATCH: Mapping 'siang/malam' ke waktu jam ---
+    df['Waktu'] = df['Waktu'].map({'siang': '10:00:00', 'malam': '19:00:00'})
+    df['Timestamp'] = pd.to_datetime(df['Tanggal'] + ' ' + df['Waktu'], errors='coerce')
+    df = df.dropna(subset=['Timestamp'])
+
+    # Ambil jam dari timestamp
+    df['Jam'] = df['Timestamp'].dt.hour
+    log_print(f"   - Distribusi jam unik: {sorted(df['Jam'].unique())}", logfile)
+    df['Kategori'] = df['Jam'].apply(lambda x: 'siang' if x == 10 else ('malam' if x == 19 else 'ignore'))
+
+    return {k: df.loc[df['Kategori'] == k, 'Beban'].values.astype(float) for k in ['siang', 'malam']}
+
+def last_dates(df):
+    """{kategori: 'YYYY-MM-DD'} tanggal terakhir per kategori di CSV mentah (sebelum dibersihkan)."""
+    tanggal = pd.to_datetime(df['Tanggal'], format='%m/%d/%Y', errors='coerce')
+    last = tanggal.groupby(df['Waktu']).max().dropna()
+    return {k: d.strftime('%Y-%m-%d') for k, d in last.items() if k in ('siang', 'malam')}
+
+# --- Rebuild penuh 1 feeder ---
+def rebuild_full(file_path, feeder, npz_dir, meta_dir, logfile, window, result, fmt="npz"):
+    with profiling.timer("read_csv"):
+        df = pd.read_csv(file_path)
+    dates = last_dates(df)
+    series = clean_and_split(df, feeder, logfile)
+    kategori_info = {}
+
+    for kategori in ['siang', 'malam']:
+        values = series[kategori]
+        log_print(f"   - Jumlah data kategori '{kategori}': {len(values)}", logfile)
+        if len(values) < 10:
+            log_print(f"⚠️  {feeder} kategori {kategori} kurang dari 10 baris, dilewati.", logfile)
+            result["skipped"].append(kategori)
+            continue
+
+        values = values.reshape(-1, 1)
+        scaler = MinMaxScaler()
+        scaled = scaler.fit_transform(values)
+
+        X, y = make_windows(scaled, window)
+        if len(X) == 0:
+            log_print(f"⚠️  {feeder} kategori {kategori} lebih pendek dari window {window}, dilewati.", logfile)
+            result["skipped"].append(kategori)
+            continue
+
+        save_dataset(fmt, feeder, kategori, X, y, scaler, npz_dir, meta_dir, result)
+        log_print(f"💾 Disimpan: {feeder}_{kategori} ({len(X)} sampel)", logfile)
+        result["saved"][kategori] = len(X)
+        kategori_info[kategori] = {"samples": len(X), "last_date": dates.get(kategori),
+                                   "holdout": holdout_size(len(X))}
+
+    return len(df), kategori_info
+
+# --- Append baris baru ke dataset yang sudah ada ---
+def append_rows(file_path, feeder, npz_dir, meta_dir, logfile, window, entry, result, fmt="npz"):
+    """Tambahkan window baru dari baris yang di-append ke CSV.
+
+    Return (rows, kategori_info), atau None bila harus rebuild penuh:
+    - kategori baru muncul / sebelumnya dilewati / npz tidak konsisten
+    - aturan refit: nilai baru di luar [data_min_, data_max_] scaler lama
+    """
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        f.seek(entry["size"])
+        tail = f.read()
+    with profiling.timer("read_csv"):
+        df_new = pd.read_csv(io.BytesIO(header + tail))
+    log_print(f"➕ {len(df_new)} baris baru sejak run sebelumnya", logfile)
+    series = clean_and_split(df_new, feeder, logfile)
+
+    updates = {}
+    for kategori, values in series.items():
+        if len(values) == 0:
+            continue
+        info = entry["kategori"].get(kategori)
+        existing = load_existing(fmt, feeder, kategori, npz_dir, meta_dir, window) if info else None
+        if existing is None:
+            log_print(f"🔁 Kategori '{kategori}' belum punya dataset, rebuild penuh.", logfile)
+            return None
+
+        X_old, y_old, scaler = existing
+        lo, hi = float(scaler.data_min_[0]), float(scaler.data_max_[0])
+        if values.min() < lo or values.max() > hi:
+            log_print(f"🔁 Refit scaler '{kategori}': nilai baru [{values.min()}, {values.max()}] "
+                      f"di luar [{lo}, {hi}], rebuild penuh.", logfile)
+            return None
+
+        if len(X_old) != info["samples"] or X_old.shape[1] != window:
+            log_print(f"🔁 Dataset {feeder}_{kategori} tidak sesuai manifest, rebuild penuh.", logfile)
+            return None
+        updates[kategori] = (X_old, y_old, scaler, values)
+
+    kategori_info = {k: dict(v) for k, v in entry["kategori"].items()}
+    for kategori, date in last_dates(df_new).items():
+        if kategori in kategori_info:
+            kategori_info[kategori]["last_date"] = max(date, kategori_info[kategori].get("last_date") or date)
+    for kategori, (X_old, y_old, scaler, values) in updates.items():
+        # Ekor deret lama (window nilai terakhir) + nilai baru hasil scaler lama
+        last = np.append(X_old[-1, 1:, 0], y_old[-1])
+        scaled_new = scaler.transform(values.reshape(-1, 1)).reshape(-1)
+        X_add, y_add = make_windows(np.concatenate([last, scaled_new]), window)
+        X = np.concatenate([X_old, X_add])
+        y = np.concatenate([y_old, y_add])
+
+        save_dataset(fmt, feeder, kategori, X, y, scaler, npz_dir, meta_dir, result)
+        log_print(f"💾 Append: {feeder}_{kategori} (+{len(X_add)} → {len(X)} sampel)", logfile)
+        result["saved"][kategori] = len(X)
+        kategori_info[kategori]["samples"] = len(X)
+        kategori_info[kategori].setdefault("holdout", holdout_size(len(X)))
+
+    return entry["rows"] + len(df_new), kategori_info
+
 # --- Proses 1 file feeder ---
-def preprocess_file(file_path, npz_dir, meta_dir, logfile):
+def preprocess_file(file_path, npz_dir, meta_dir, logfile, window=DEFAULT_WINDOW, entry=None, fmt="npz"):
     feeder = os.path.splitext(os.path.basename(file_path))[0]
+    result = {"feeder": feeder, "status": "ok", "mode": "full", "saved": {}, "skipped": [],
+              "error": None, "manifest": None, "arrays": {}}
     log_print(f"🚀 Mulai: {feeder}", logfile)
 
-    try:
-        df = pd.read_csv(file_path)
-        awal = len(df)
-
-        # Hapus 'fail', 0, dan NaN
-        fail_count = (df['Beban'] == 'fail').sum()
-        df = df[df['Beban'] != 'fail']
-        df['Beban'] = pd.to_numeric(df['Beban'], errors='coerce')
-        zero_count = (df['Beban'] == 0).sum()
-        nan_count = df['Beban'].isna().sum()
-        df = df[(df['Beban'] != 0) & (~df['Beban'].isna())]
-        akhir = len(df)
-
-        log_print(f"🧹 Pembersihan data:", logfile)
-        log_print(f"   - 'fail' dihapus: {fail_count}", logfile)
-        log_print(f"   - 0 dihapus: {zero_count}", logfile)
-        log_print(f"   - NaN dihapus: {nan_count}", logfile)
-        log_print(f"   - Sisa baris: {akhir} dari {awal}", logfile)
-
-        # --- PATCH: Mapping 'siang/malam' ke waktu jam ---
-        df['Waktu'] = df['Waktu'].map({'siang': '10:00:00', 'malam': '19:00:00'})
-        df['Timestamp'] = pd.to_datetime(df['Tanggal'] + ' ' + df['Waktu'], errors='coerce')
-        df = df.dropna(subset=['Timestamp'])
-
-        # Ambil jam dari timestamp
-        df['Jam'] = df['Timestamp'].dt.hour
-        log_print(f"   - Distribusi jam unik: {sorted(df['Jam'].unique())}", logfile)
-        df['Kategori'] = df['Jam'].apply(lambda x: 'siang' if x == 10 else ('malam' if x == 19 else 'ignore'))
+    with profiling.feeder(feeder):
+        try:
+            stat = os.stat(file_path)
+            mode, digest = plan_update(file_path, stat, entry)
 
-        for kategori in ['siang', 'malam']:
-            subset = df[df['Kategori'] == kategori]
-            log_print(f"   - Jumlah data kategori '{kategori}': {len(subset)}", logfile)
-            if len(subset) < 10:
-                log_print(f"⚠️  {feeder} kategori {kategori} kurang dari 10 baris, dilewati.", logfile)
-                continue
-
-            values = subset['Beban'].values.reshape(-1, 1)
-            scaler = MinMaxScaler()
-            scaled = scaler.fit_transform(values)
-
-            window = 5
-            X, y = [], []
-            for i in range(window, len(scaled)):
-                X.append(scaled[i - window:i])
-                y.append(scaled[i][0])
-            X = np.array(X)
-            y = np.array(y)
+            if mode == "unchanged":
+                if outputs_exist(fmt, feeder, entry["kategori"], npz_dir, meta_dir):
+                    log_print(f"⏩ Tidak berubah sejak run sebelumnya, dilewati.", logfile)
+                    result["mode"] = "unchanged"
+                    result["manifest"] = dict(entry, mtime_ns=stat.st_mtime_ns)
+                    return result
+                log_print(f"🔁 CSV tidak berubah tetapi output dataset hilang, rebuild penuh.", logfile)
+                mode = "full"
 
-            save_npz_and_scaler(feeder, kategori, X, y, scaler, npz_dir, meta_dir)
-            log_print(f"💾 Disimpan: {feeder}_{kategori}.npz ({len(X)} sampel)", logfile)
+            updated = None
+            if mode == "append":
+                updated = append_rows(file_path, feeder, npz_dir, meta_dir, logfile, window, entry, result, fmt)
+                if updated is not None:
+                    result["mode"] = "append"
+            if updated is None:
+                result["saved"], result["arrays"] = {}, {}
+                updated = rebuild_full(file_path, feeder, npz_dir, meta_dir, logfile, window, result, fmt)
 
-        log_print(f"✅ Selesai: {feeder}", logfile)
-        log_print("-" * 60, logfile)
+            rows, kategori_info = updated
+            result["manifest"] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest,
+                "rows": rows,
+                "kategori": kategori_info,
+            }
 
-    except Exception as e:
-        log_print(f"❌ ERROR saat proses {feeder}: {str(e)}", logfile)
-        log_print("-" * 60, logfile)
+            log_print(f"✅ Selesai: {feeder}", logfile)
+
+        except Exception as e:
+            log_print(f"❌ ERROR saat proses {feeder}: {str(e)}", logfile)
+            result["status"] = "error"
+            result["error"] = str(e)
+        finally:
+            log_print("-" * 60, logfile)
+
+    return result
+
+# --- Worker pool ---
+def _init_worker(ts):
+    global _echo, _worker_log
+    _echo = False
+    path = os.path.join(LOG_DIR, f"{ts}_preprocess_w{os.getpid()}.log")
+    _worker_log = open(path, "a", buffering=1)  # line-buffered: aman walau worker di-terminate
+
+def _preprocess_worker(task):
+    file_path, npz_dir, meta_dir, window, entry, fmt = task
+    return preprocess_file(file_path, npz_dir, meta_dir, _worker_log, window, entry, fmt)
+
+def run_parallel(paths, npz_dir, meta_dir, workers, logfile, window=DEFAULT_WINDOW, entries=None, fmt="npz"):
+    """Proses file secara paralel; log tiap worker digabung ke logfile di akhir."""
+    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+    entries = entries or {}
+    tasks = [(p, npz_dir, meta_dir, window, entries.get(p), fmt) for p in paths]
+    chunksize = max(1, len(tasks) // (workers * 8))
+    results = []
+    # spawn: aman walau parent sudah memuat TensorFlow (mode in-process loadpro.py)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(ts,)) as pool:
+        for i, res in enumerate(pool.map(_preprocess_worker, tasks, chunksize=chunksize), start=1):
+            icon = "✅" if res["status"] == "ok" else "❌"
+            log_print(f"{icon} [{i}/{len(tasks)}] {res['feeder']} ({res['mode']})", logfile)
+            results.append(res)
+
+    # Gabungkan log worker ke log utama
+    worker_logs = sorted(f for f in os.listdir(LOG_DIR) if f.startswith(f"{ts}_preprocess_w"))
+    for name in worker_logs:
+        path = os.path.join(LOG_DIR, name)
+        with open(path) as wf:
+            logfile.write(f"===== {name} =====\n")
+            logfile.write(wf.read())
+        os.remove(path)
+    return results
+
+def build_store(results, window, logfile):
+    """Tulis dataset hasil run ini ke store; dataset lama yang tidak diproses ulang tidak disalin."""
+    old = open_store(STORE_DIR) if FeatureStore.exists(STORE_DIR) else None
+    changed, keep = [], []
+    for r in sorted(results, key=lambda r: r["feeder"]):
+        rebuilt = r["status"] == "ok" and r["mode"] == "full"
+        for kategori in ['siang', 'malam']:
+            if kategori in r["arrays"]:
+                changed.append((r["feeder"], kategori) + r["arrays"][kategori])
+            elif not rebuilt and old is not None and (r["feeder"], kategori) in old:
+                # unchanged / append tanpa baris baru / gagal -> pakai data lama
+                keep.append((r["feeder"], kategori))
+
+    if old is not None and not changed and old.window == window and set(keep) == set(old.keys()):
+        log_print(f"🗄️  Feature store tidak berubah: {STORE_DIR} ({len(keep)} dataset)", logfile)
+        return
+    old = None
+    total, compacted = update_store(changed, keep, window, STORE_DIR)
+    action = "ditulis ulang penuh" if compacted else f"diperbarui ({len(changed)} dataset di-append)"
+    log_print(f"🗄️  Feature store {action}: {STORE_DIR} ({len(changed) + len(keep)} dataset, {total} sampel)",
+              logfile)
+
+def log_summary(results, logfile):
+    ok = [r for r in results if r["status"] == "ok"]
+    failed = [r for r in results if r["status"] == "error"]
+    n_pairs = sum(len(r["saved"]) for r in ok)
+    n_samples = sum(sum(r["saved"].values()) for r in ok)
+    n_skipped = sum(len(r["skipped"]) for r in ok)
+    log_print("📊 Ringkasan preprocessing:", logfile)
+    log_print(f"   - File sukses : {len(ok)}", logfile)
+    log_print(f"   - File gagal  : {len(failed)}", logfile)
+    for mode in ["full", "append", "unchanged"]:
+        log_print(f"   - Mode {mode:<9}: {sum(r['mode'] == mode for r in ok)}", logfile)
+    log_print(f"   - Dataset disimpan : {n_pairs} ({n_samples} sampel)", logfile)
+    log_print(f"   - Kategori dilewati (<10 baris): {n_skipped}", logfile)
+    for r in failed:
+        log_print(f"   ❌ {r['feeder']}: {r['error']}", logfile)
 
 # --- Proses semua file ---
-def main():
+def main(workers=1, window=DEFAULT_WINDOW, full=False, fmt="npz"):
     start = time.time()
+    orig_stderr = sys.stderr
     logfile, stderr_path = setup_logger()
 
-    raw_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'raw'))
-    npz_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'npz'))
-    meta_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'metadata'))
-    os.makedirs(npz_dir, exist_ok=True)
-    os.makedirs(meta_dir, exist_ok=True)
-
-    log_print(f"📁 Membaca folder: {raw_dir}", logfile)
-    files = [f for f in os.listdir(raw_dir) if f.endswith(".csv")]
-    log_print(f"🔍 {len(files)} file ditemukan.", logfile)
-    log_print("-" * 60, logfile)
-
-    for f in files:
-        path = os.path.join(raw_dir, f)
-        preprocess_file(path, npz_dir, meta_dir, logfile)
-
-    dur = time.time() - start
-    m, s = divmod(dur, 60)
-    log_print(f"🎉 Selesai memproses semua {len(files)} file.", logfile)
-    log_print(f"🕒 Total waktu: {int(m)} menit {int(s)} detik", logfile)
-    log_print(f"📝 Log aktivitas: {logfile.name}", logfile)
-    log_print(f"🪵 Error internal dicatat di: {stderr_path}", logfile)
-    logfile.close()
+    try:
+        raw_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'raw'))
+        npz_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'npz'))
+        meta_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'metadata'))
+        os.makedirs(npz_dir, exist_ok=True)
+        if fmt == "npy":
+            os.makedirs(NPY_DIR, exist_ok=True)
+        os.makedirs(meta_dir, exist_ok=True)
+
+        log_print(f"📁 Membaca folder: {raw_dir}", logfile)
+        files = [f for f in os.listdir(raw_dir) if f.endswith(".csv")]
+        log_print(f"🔍 {len(files)} file ditemukan.", logfile)
+        log_print("-" * 60, logfile)
+
+        manifest = load_manifest(meta_dir)
+        if full:
+            log_print("🔁 --full: manifest diabaikan, semua file diproses ulang.", logfile)
+            manifest["feeders"] = {}
+        elif manifest["window"] not in (None, window):
+            log_print(f"🔁 Window berubah ({manifest['window']} → {window}), semua file diproses ulang.", logfile)
+            manifest["feeders"] = {}
+        elif manifest.get("format", "npz") != fmt and manifest["feeders"]:
+            log_print(f"🔁 Format berubah ({manifest.get('format', 'npz')} → {fmt}), semua file diproses ulang.", logfile)
+            manifest["feeders"] = {}
+
+        paths = [os.path.join(raw_dir, f) for f in files]
+        entries = {p: manifest["feeders"].get(os.path.splitext(os.path.basename(p))[0]) for p in paths}
+        if workers > 1 and len(paths) > 1:
+            log_print(f"⚙️  Mode paralel: {workers} worker", logfile)
+            results = run_parallel(paths, npz_dir, meta_dir, workers, logfile, window, entries, fmt)
+        else:
+            results = [preprocess_file(path, npz_dir, meta_dir, logfile, window, entries[path], fmt) for path in paths]
+
+        if fmt == "store":
+            build_store(results, window, logfile)
+
+        # Feeder yang gagal tidak dicatat -> diproses penuh pada run berikutnya
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "format": fmt,
+            "window": window,
+            "feeders": {r["feeder"]: r["manifest"] for r in results if r["manifest"] is not None},
+        }
+        save_manifest(manifest, meta_dir)
+
+        log_summary(results, logfile)
+        dur = time.time() - start
+        m, s = divmod(dur, 60)
+        log_print(f"🎉 Selesai memproses semua {len(files)} file.", logfile)
+        log_print(f"🕒 Total waktu: {int(m)} menit {int(s)} detik", logfile)
+        log_print(f"📝 Log aktivitas: {logfile.name}", logfile)
+        log_print(f"🪵 Error internal dicatat di: {stderr_path}", logfile)
+    finally:
+        logfile.close()
+        # Kembalikan stderr walau terjadi error (penting saat dipanggil
+        # in-process dari loadpro.py)
+        sys.stderr.close()
+        sys.stderr = orig_stderr
 
 # --- Entry point ---
 if __name__ == "__main__":
-    main()
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = '3'
+    parser = argparse.ArgumentParser(description="🔍 Preprocessing semua CSV di data/raw")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Jumlah proses paralel (default 1 = berurutan)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help=f'Panjang window input (default {DEFAULT_WINDOW})')
+    parser.add_argument('--full', action='store_true',
+                        help='Abaikan manifest dan proses ulang semua file')
+    parser.add_argument('--format', choices=FORMATS, default="npz",
+                        help='Format output: npz per feeder (default), store konsolidasi, '
+                             'atau npy (deret 1-D uncompressed per feeder)')
+    args = parser.parse_args()
+    main(args.workers, args.window, args.full, args.format)
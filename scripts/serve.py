@@ -0,0 +1,282 @@
+# ===================================================
+# SERVE.PY v1.1
+# ---------------------------------------------------
+# Service forecast H+1 lokal yang berjalan terus (asyncio, HTTP/1.1
+# stdlib, tanpa cold start per panggilan seperti predict_next.py).
+# - Saat start: window terakhir, parameter scaler, tanggal H+1 semua
+#   penyulang yang punya model dimuat ke memori (predict_next.last_windows,
+#   scaler_params, next_date) + model/weight pack di-warm-up 1x
+# - Micro-batching: request yang datang dalam --max-wait-ms (maks
+#   --max-batch deret) digabung ke 1 forward (predict_next.forecast_scaled);
+#   deret yang diminta beberapa request dihitung 1x
+# - POST /reload: muat ulang state dari disk setelah preprocess/train
+# v1.1: weight pack dimuat 1x per state (start / reload), bukan
+#       listdir + stat folder model di setiap batch
+#
+# Endpoint:
+#   GET  /health
+#   GET  /forecast                                  -> semua penyulang
+#   GET  /forecast?feeder=penyulang_x&kategori=malam
+#   GET  /forecast?series=penyulang_x_malam,penyulang_y_siang
+#   GET  /stats                                     -> jumlah request/batch
+#   POST /reload
+# Log dicatat di: logs/serve/
+# ---------------------------------------------------
+# python3 scripts/serve.py --port 8765
+# curl "http://127.0.0.1:8765/forecast?feeder=penyulang_x&kategori=malam"
+# ===================================================
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+
+from predict_next import last_windows, scaler_params, forecast_scaled, next_date
+from utils.load_dataset import list_datasets
+from utils.lstm_engine import MODEL_DIR, load_pack
+from utils.global_model import global_available, load_index, series_key
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+# --- State di memori ---
+class ForecastState:
+    """Window terakhir + scaler + tanggal H+1 semua deret yang punya model."""
+
+    def __init__(self, model_type="single"):
+        self.model_type = model_type
+        global_index = load_index() if model_type == "global" and global_available() else {}
+        self.pairs = [(f, k) for f, k in list_datasets()
+                      if (series_key(f, k) in global_index if model_type == "global"
+                          else os.path.exists(os.path.join(MODEL_DIR, f"{f}_{k}.keras")))]
+        self.index = {series_key(f, k): i for i, (f, k) in enumerate(self.pairs)}
+        self.windows = last_windows(self.pairs) if self.pairs else np.zeros((0, 1, 1), np.float32)
+        self.mins, self.scales = scaler_params(self.pairs) if self.pairs else (np.zeros(0), np.ones(0))
+        self.dates = [next_date(f, k).strftime('%Y-%m-%d') for f, k in self.pairs]
+        # Weight pack dimuat 1x per state (POST /reload), bukan cek folder model per batch
+        self.pack = load_pack() if model_type == "single" and self.pairs else None
+        self.loaded = datetime.now().isoformat(timespec="seconds")
+
+    def predict_rows(self, rows):
+        """Beban (A) untuk indeks deret rows (1 forward)."""
+        pairs = [self.pairs[i] for i in rows]
+        y_scaled = forecast_scaled(pairs, self.windows[rows], self.model_type, self.pack)
+        return (y_scaled - self.mins[rows]) / self.scales[rows]
+
+    def records(self, rows, values):
+        return [{"Penyulang": self.pairs[i][0], "Kategori": self.pairs[i][1], "Tanggal": self.dates[i],
+                 "Beban (A)": None if np.isnan(v) else round(float(v), 4), "Model": self.model_type}
+                for i, v in zip(rows, values)]
+
+
+# --- Micro-batching ---
+class MicroBatcher:
+    """Antrian request -> 1 forward per batch (dijalankan di thread executor)."""
+
+    def __init__(self, state, max_batch=4096, max_wait=0.002):
+        self.state = state
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.stats = {"requests": 0, "batches": 0, "series": 0, "forward_ms": 0.0}
+
+    async def submit(self, keys):
+        """Beban (A) per key (urutan sama), menunggu batch berikutnya."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((keys, future))
+        return await future
+
+    def _take(self, batch, n):
+        while n < self.max_batch and not self.queue.empty():
+            item = self.queue.get_nowait()
+            batch.append(item)
+            n += len(item[0])
+        return n
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            n = self._take(batch, len(batch[0][0]))
+            if n < self.max_batch and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+                self._take(batch, n)
+
+            state = self.state  # snapshot: /reload tidak mengubah batch yang sedang jalan
+            requests = []
+            for keys, future in batch:
+                missing = [k for k in keys if k not in state.index]
+                if future.cancelled():
+                    continue
+                if missing:
+                    future.set_exception(KeyError(f"tidak ada model/dataset: {', '.join(missing)}"))
+                else:
+                    requests.append((np.array([state.index[k] for k in keys], dtype=np.int64), future))
+            if not requests:
+                continue
+
+            rows = np.unique(np.concatenate([r for r, _ in requests]))
+            t0 = time.perf_counter()
+            try:
+                values = await loop.run_in_executor(None, state.predict_rows, rows)
+            except Exception as e:
+                for _, future in requests:
+                    if not future.cancelled():
+                        future.set_exception(e)
+                continue
+            self.stats["forward_ms"] += (time.perf_counter() - t0) * 1e3
+            self.stats["requests"] += len(requests)
+            self.stats["batches"] += 1
+            self.stats["series"] += len(rows)
+            for r, future in requests:
+                if not future.cancelled():
+                    future.set_result((state, r, values[np.searchsorted(rows, r)]))
+
+
+# --- HTTP ---
+class ForecastService:
+    def __init__(self, model_type, max_batch, max_wait, log):
+        self.model_type = model_type
+        self.log = log
+        self.batcher = MicroBatcher(ForecastState(model_type), max_batch, max_wait)
+        self.started = time.time()
+
+    def warm_up(self):
+        """1 forward semua deret: weight pack / tf.function siap sebelum request pertama."""
+        state = self.batcher.state
+        if state.pairs:
+            state.predict_rows(np.arange(len(state.pairs)))
+
+    def requested_keys(self, query):
+        state = self.batcher.state
+        if "series" in query:
+            return [k for v in query["series"] for k in v.split(",") if k]
+        if "feeder" in query:
+            kategori = query.get("kategori", ["siang", "malam"])
+            keys = [series_key(f, k) for f in query["feeder"] for k in kategori]
+            # tanpa kategori: hanya kategori yang tersedia
+            return keys if "kategori" in query else [k for k in keys if k in state.index]
+        return list(state.index)
+
+    async def route(self, method, target):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            state = self.batcher.state
+            return 200, {"status": "ok", "model": self.model_type, "series": len(state.pairs),
+                         "loaded": state.loaded, "uptime_s": round(time.time() - self.started, 1)}
+        if url.path == "/stats":
+            return 200, self.batcher.stats
+        if url.path == "/reload":
+            if method != "POST":
+                return 405, {"error": "gunakan POST"}
+            state = await asyncio.get_running_loop().run_in_executor(None, ForecastState, self.model_type)
+            self.batcher.state = state
+            self.log(f"🔄 State dimuat ulang: {len(state.pairs)} deret")
+            return 200, {"status": "reloaded", "series": len(state.pairs)}
+        if url.path == "/forecast":
+            if method != "GET":
+                return 405, {"error": "gunakan GET"}
+            keys = self.requested_keys(query)
+            if not keys:
+                return 404, {"error": "tidak ada deret yang cocok"}
+            try:
+                state, rows, values = await self.batcher.submit(keys)
+            except KeyError as e:
+                return 404, {"error": e.args[0]}
+            return 200, {"model": self.model_type, "forecasts": state.records(rows, values)}
+        return 404, {"error": f"path tidak dikenal: {url.path}"}
+
+    async def handle(self, reader, writer):
+        """1 koneksi HTTP/1.1 (keep-alive kecuali Connection: close)."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                try:
+                    status, payload = await self.route(method, target)
+                except Exception as e:
+                    self.log(f"❌ {method} {target}: {e}")
+                    status, payload = 500, {"error": str(e)}
+                body = json.dumps(payload).encode()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"{version} {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, model_type, max_batch, max_wait, log):
+    t0 = time.perf_counter()
+    service = ForecastService(model_type, max_batch, max_wait, log)
+    service.warm_up()
+    log(f"📦 State dimuat: {len(service.batcher.state.pairs)} deret (model: {model_type}) "
+        f"dalam {time.perf_counter() - t0:.2f} detik")
+    batcher = asyncio.create_task(service.batcher.run())
+    server = await asyncio.start_server(service.handle, host, port)
+    log(f"🚀 Service forecast aktif di http://{host}:{port} "
+        f"(max batch {max_batch}, max wait {max_wait * 1e3:.1f} ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+        stats = service.batcher.stats
+        if stats["batches"]:
+            log(f"📊 {stats['requests']} request dalam {stats['batches']} batch "
+                f"(rata-rata {stats['requests'] / stats['batches']:.1f} request/batch)")
+
+
+def main(host="127.0.0.1", port=8765, model_type="single", max_batch=4096, max_wait_ms=2.0):
+    log_dir = os.path.join("logs", "serve")
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_serve.log")
+
+    with open(log_path, "w") as logfile:
+        def log(msg):
+            ts = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+            line = f"{ts} {msg}"
+            print(line, flush=True)
+            logfile.write(line + "\n")
+            logfile.flush()
+
+        try:
+            asyncio.run(serve(host, port, model_type, max_batch, max_wait_ms / 1e3, log))
+        except KeyboardInterrupt:
+            pass
+        log("🛑 Service dihentikan.")
+        log(f"📄 Log disimpan di: {log_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🛰️ Service forecast H+1 lokal dengan micro-batching")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--model', choices=['single', 'global'], default='single',
+                        help='Model per feeder (models/single) atau model global (models/global)')
+    parser.add_argument('--max-batch', type=int, default=4096, help='Maks deret per forward (default 4096)')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='Waktu tunggu mengumpulkan request per batch (default 2 ms)')
+    args = parser.parse_args()
+    main(args.host, args.port, args.model, args.max_batch, args.max_wait_ms)
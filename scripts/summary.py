@@ -1,77 +1,68 @@
-# summary.py v1.2
+# summary.py v1.5
 # --------------------------------------------------
 # Menyusun ringkasan prediksi next-day dari hasil predict_next
-# Format input: results/predict_next/next_*.txt
+# Format input: results/predict_next/run_{run_id}.csv (run terbaru)
 # Output: logs/summary/summary_YYYYMMDD_HHMM.log dan results/summary/*.csv
+# v1.3: dibungkus dalam main() agar bisa dipanggil dari loadpro.py
+# v1.4: 1x baca tabel run (utils/next_results.py), bukan parsing next_*.txt
+# v1.5: Actual (A) arsip prediksi diisi dari data terbaru (backfill_actuals)
 # --------------------------------------------------
 
 import os
 import time
-import pandas as pd
 from datetime import datetime
 
-start_time = time.time()
-now = datetime.now()
-timestamp = now.strftime("%Y%m%d_%H%M")
-today = now.strftime("%Y-%m-%d")
+from utils.next_results import load_run
+from utils.forecast_archive import backfill_actuals
 
-result_dir = "results/predict_next"
-log_dir = "logs/summary"
-csv_dir = "results/summary"
-os.makedirs(log_dir, exist_ok=True)
-os.makedirs(csv_dir, exist_ok=True)
 
-summary_rows = []
-summary_log_lines = []
+def main():
+    start_time = time.time()
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M")
+    today = now.strftime("%Y-%m-%d")
 
-print("\n================== RINGKASAN HASIL PREDIKSI ==================\n")
+    log_dir = "logs/summary"
+    csv_dir = "results/summary"
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(csv_dir, exist_ok=True)
 
-for fname in sorted(os.listdir(result_dir)):
-    if fname.startswith("next_") and fname.endswith(".txt"):
-        path = os.path.join(result_dir, fname)
-        try:
-            with open(path, "r") as f:
-                lines = f.readlines()
-                if len(lines) < 5:
-                    raise ValueError("File tidak memiliki 5 baris sesuai format.")
+    print("\n================== RINGKASAN HASIL PREDIKSI ==================\n")
 
-                feeder = lines[1].split(":")[1].strip()
-                waktu = lines[2].split(":")[1].strip()
-                tanggal = lines[3].split(":")[1].strip()
-                beban_str = lines[4].split(":")[1].strip().split()[0]  # Ambil nilai sebelum 'A'
-                ampere = float(beban_str)
+    # 1x baca tabel run terbaru (utils/next_results.py), tanpa parsing .txt
+    df = load_run()
+    if len(df):
+        print(f"📦 Run: {df['Run'].iloc[0]} ({len(df)} prediksi)\n")
+        df = (df.rename(columns={"Kategori": "Waktu", "Beban (A)": "Prediksi_Ampere"})
+                [["Tanggal", "Penyulang", "Waktu", "Prediksi_Ampere"]]
+                .sort_values(by=["Tanggal", "Penyulang", "Waktu"]))
 
-                summary_rows.append({
-                    "Tanggal": tanggal,
-                    "Penyulang": feeder,
-                    "Waktu": waktu,
-                    "Prediksi_Ampere": ampere
-                })
+        # Tampilkan ke terminal
+        print(df.to_string(index=False))
 
-        except Exception as e:
-            print(f"⚠️  Gagal membaca {fname}: {e}")
+        # Simpan ke log file dan CSV
+        log_path = os.path.join(log_dir, f"summary_{timestamp}.log")
+        with open(log_path, "w") as f:
+            f.write(df.to_string(index=False))
 
-if summary_rows:
-    df = pd.DataFrame(summary_rows)
-    df.sort_values(by=["Tanggal", "Penyulang", "Waktu"], inplace=True)
+        csv_path = os.path.join(csv_dir, f"summary_{timestamp}.csv")
+        df.to_csv(csv_path, index=False)
+    else:
+        print("⚠️  Tidak ada data rekap ditemukan.")
 
-    # Tampilkan ke terminal
-    print(df.to_string(index=False))
+    # Arsip histori: isi nilai aktual forecast yang datanya sudah masuk
+    filled = backfill_actuals()
+    if filled:
+        print(f"\n🗄️  Arsip: {filled} nilai aktual diisi (scripts/archive.py accuracy)")
 
-    # Simpan ke log file dan CSV
-    log_path = os.path.join(log_dir, f"summary_{timestamp}.log")
-    with open(log_path, "w") as f:
-        f.write(df.to_string(index=False))
+    # Total waktu
+    total_time = time.time() - start_time
+    minutes = int(total_time // 60)
+    seconds = int(total_time % 60)
+    print(f"\n🕒 Total waktu eksekusi: {minutes} menit {seconds} detik")
+    print(f"📄 Ringkasan log: {log_path if len(df) else '-'}")
+    print(f"📊 Ringkasan CSV: {csv_path if len(df) else '-'}\n")
 
-    csv_path = os.path.join(csv_dir, f"summary_{timestamp}.csv")
-    df.to_csv(csv_path, index=False)
-else:
-    print("⚠️  Tidak ada data rekap ditemukan.")
 
-# Total waktu
-total_time = time.time() - start_time
-minutes = int(total_time // 60)
-seconds = int(total_time % 60)
-print(f"\n🕒 Total waktu eksekusi: {minutes} menit {seconds} detik")
-print(f"📄 Ringkasan log: {log_path if summary_rows else '-'}")
-print(f"📊 Ringkasan CSV: {csv_path if summary_rows else '-'}\n")
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 # ===================================================
-# TRAIN.PY v1.2
+# TRAIN.PY v1.6
 # ---------------------------------------------------
 # LOADPRO Project | Training model RNN-LSTM per feeder per kategori
 # Default output: models/temporary/
 # Dapat diubah dengan argumen --output
+# v1.3: fungsi run() agar bisa dipanggil langsung (in-process)
+# v1.4: ekor deret (holdout, utils/evaluation.py) tidak ikut dilatih;
+#       MAE/RMSE/MAPE dihitung di holdout, bukan di data training
+# v1.5: instrumentasi utils/profiling.py (tf_import, fit, predict, save_model per feeder)
+# v1.6: setelah evaluasi holdout, model di-refit pada seluruh deret (termasuk
+#       holdout) dengan jumlah epoch yang sama sebelum disimpan, agar model
+#       produksi belajar dari data terbaru. --no-refit / LOADPRO_REFIT_FULL=0:
+#       simpan model tanpa holdout (evaluasi compare murni out-of-sample).
 # ---------------------------------------------------
 # Usage (default output):
 # python3 scripts/train.py --feeder penyulang_bancang --kategori siang
@@ -26,11 +34,13 @@ import sys
 import time
 import argparse
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
 from datetime import datetime
-from sklearn.metrics import mean_absolute_error, mean_squared_error, mean_absolute_percentage_error
-import joblib
+
+from utils import profiling
+tf = profiling.tf_import()
+from tensorflow import keras
+
+from utils.evaluation import REFIT_FULL, load_split, metrics
 
 # --------------------
 # Setup Logging
@@ -52,14 +62,14 @@ def log(logfile, msg):
 # Load Data
 # --------------------
 def load_data(feeder, kategori):
-    npz_path = os.path.join('data', 'npz', f'{feeder}_{kategori}.npz')
-    with np.load(npz_path) as data:
-        return data['X'], data['y']
+    """(X_train, y_train, X_holdout, y_holdout)."""
+    return load_split(feeder, kategori)
 
 # --------------------
 # Train Model
 # --------------------
-def train_lstm(X, y, logf):
+def train_lstm(X, y, logf, epochs=50, early_stopping=True):
+    """(model, epoch terbaik); early_stopping=False: latih tepat `epochs` epoch."""
     input_shape = X.shape[1:]
     log(logf, f"📐 Shape input: {X.shape}, target: {y.shape}")
     
@@ -71,38 +81,72 @@ def train_lstm(X, y, logf):
     model.compile(optimizer='adam', loss='mse')
     log(logf, "🧠 Model compiled. Mulai training...")
 
-    early_stop = keras.callbacks.EarlyStopping(monitor='loss', patience=5, restore_best_weights=True)
-    history = model.fit(X, y, epochs=50, batch_size=32, verbose=0, callbacks=[early_stop])
+    callbacks = [keras.callbacks.EarlyStopping(monitor='loss', patience=5, restore_best_weights=True)
+                 ] if early_stopping else []
+    with profiling.timer("fit"):
+        history = model.fit(X, y, epochs=epochs, batch_size=32, verbose=0, callbacks=callbacks)
 
     log(logf, f"📉 Final Loss: {history.history['loss'][-1]:.4f}")
-    log(logf, f"🛑 Early stopped after {len(history.history['loss'])} epochs")
-    return model
+    loss = history.history['loss']
+    if early_stopping:
+        log(logf, f"🛑 Early stopped after {len(loss)} epochs")
+    return model, int(np.argmin(loss)) + 1
 
 # --------------------
 # Evaluate and Save
 # --------------------
-def evaluate_and_save(model, X, y, feeder, kategori, logf, output_dir):
-    pred = model.predict(X, verbose=0).flatten()
-
-    mae = mean_absolute_error(y, pred)
-    rmse = mean_squared_error(y, pred, squared=False)
-
-    log(logf, f"✅ Evaluation:")
-    log(logf, f"   MAE  = {mae:.4f}")
-    log(logf, f"   RMSE = {rmse:.4f}")
+def evaluate(model, X, y, logf):
+    """Metrik model di holdout (X, y)."""
+    with profiling.timer("predict"):
+        pred = model(np.asarray(X, dtype=np.float32), training=False).numpy().reshape(-1)
+    score = metrics(y, pred)
+
+    log(logf, f"✅ Evaluation (holdout {len(y)} sampel terakhir):")
+    log(logf, f"   MAE  = {score['mae'][0]:.4f}")
+    log(logf, f"   RMSE = {score['rmse'][0]:.4f}")
     log(logf, f"   Min y = {np.min(y):.4f}, Max y = {np.max(y):.4f}")
 
-    if np.any(y == 0):
-        log(logf, f"⚠️  MAPE tidak dihitung karena ada nilai y == 0")
+    if np.isnan(score['mape'][0]):
+        log(logf, f"⚠️  MAPE tidak dihitung karena semua nilai y == 0")
     else:
-        mape = mean_absolute_percentage_error(y, pred)
-        log(logf, f"   MAPE = {mape:.4f}")
+        log(logf, f"   MAPE = {score['mape'][0]:.4f} (tanpa y == 0)")
+    return score
 
+def save(model, feeder, kategori, logf, output_dir):
     os.makedirs(output_dir, exist_ok=True)
     out_path = os.path.join(output_dir, f'{feeder}_{kategori}.keras')
-    model.save(out_path)
+    with profiling.timer("save_model"):
+        model.save(out_path)
     log(logf, f"💾 Model disimpan di: {out_path}")
 
+# --------------------
+# Run 1 feeder/kategori
+# --------------------
+@profiling.feeder_scope
+def run(feeder, kategori, output_dir=os.path.join('models', 'temporary'), refit=REFIT_FULL):
+    """Latih dan simpan model 1 feeder/kategori. Dipakai CLI & runner in-process.
+
+    refit: setelah evaluasi holdout, latih ulang di seluruh deret (epoch sama)
+    sebelum disimpan; False = simpan model yang dilatih tanpa holdout.
+    """
+    logf = setup_logger(feeder, kategori)
+    try:
+        X, y, X_holdout, y_holdout = load_data(feeder, kategori)
+        model, epochs = train_lstm(X, y, logf)
+        evaluate(model, X_holdout, y_holdout, logf)
+        if refit:
+            X_full, y_full = np.concatenate([X, X_holdout]), np.concatenate([y, y_holdout])
+            log(logf, f"🔁 Refit seluruh deret ({len(X_full)} sampel, {epochs} epoch)...")
+            model, _ = train_lstm(X_full, y_full, logf, epochs=epochs, early_stopping=False)
+        save(model, feeder, kategori, logf, output_dir)
+        log(logf, "🎉 Training selesai tanpa error.")
+        return True
+    except Exception as e:
+        log(logf, f"❌ ERROR: {str(e)}")
+        return False
+    finally:
+        logf.close()
+
 # --------------------
 # Main Entry
 # --------------------
@@ -112,19 +156,8 @@ if __name__ == '__main__':
     parser.add_argument('--kategori', choices=['siang', 'malam'], required=True)
     parser.add_argument('--output', default=os.path.join('models', 'temporary'),
                         help='Folder output untuk menyimpan model .keras')
+    parser.add_argument('--no-refit', action='store_true',
+                        help='Simpan model yang dilatih tanpa holdout (default: refit di seluruh deret)')
     args = parser.parse_args()
 
-    feeder = args.feeder
-    kategori = args.kategori
-    output_dir = args.output
-    logf = setup_logger(feeder, kategori)
-
-    try:
-        X, y = load_data(feeder, kategori)
-        model = train_lstm(X, y, logf)
-        evaluate_and_save(model, X, y, feeder, kategori, logf, output_dir)
-        log(logf, "🎉 Training selesai tanpa error.")
-    except Exception as e:
-        log(logf, f"❌ ERROR: {str(e)}")
-    finally:
-        logf.close()
+    run(args.feeder, args.kategori, args.output, refit=REFIT_FULL and not args.no_refit)
@@ -1,61 +1,139 @@
 # ===================================================
-# TRAIN_ALL.PY v1.1
+# TRAIN_ALL.PY v1.3
 # ---------------------------------------------------
 # LOADPRO Project | Batch training semua penyulang
 #
 # Fitur:
-# - Jalankan train.py untuk semua .npz di data/npz
+# - Jalankan train.py untuk semua dataset hasil preprocessing
+#   (data/npz atau feature store data/store)
 # - Lewati model yang sudah ada (default)
 # - Gunakan --overwrite untuk latih ulang
 # - Gunakan --output untuk simpan model ke folder lain
+# - Gunakan --in-process untuk memanggil train.run() langsung
+#   (TensorFlow cukup di-import sekali, tanpa subprocess per feeder)
+# - Gunakan --workers N untuk melatih N model sekaligus di pool proses;
+#   tiap worker memakai --threads T thread TensorFlow (intra_op=T,
+#   inter_op=1) agar N x T tidak melebihi jumlah core
 #
 # Contoh:
 # $ python3 scripts/train_all.py
 # $ python3 scripts/train_all.py --overwrite
 # $ python3 scripts/train_all.py --output models/temporary/
+# $ python3 scripts/train_all.py --in-process
+# $ python3 scripts/train_all.py --workers 8 --threads 2
 # ===================================================
 
 import os
 import argparse
 import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-# --- Argument parser ---
-parser = argparse.ArgumentParser()
-parser.add_argument('--overwrite', action='store_true', help='Force retrain all even if model exists')
-parser.add_argument('--output', default='models/temporary', help='Output folder untuk model .keras')
-args = parser.parse_args()
-
-# --- Lokasi folder ---
-data_dir = 'data/npz'
-model_dir = args.output
-os.makedirs(model_dir, exist_ok=True)
-
-# --- Cari semua file .npz ---
-npz_files = sorted([f for f in os.listdir(data_dir) if f.endswith('.npz')])
-print(f"\n📦 Menemukan {len(npz_files)} file .npz")
-print("-" * 42)
-
-# --- Loop semua file ---
-for filename in npz_files:
-    feeder_kat = filename.replace('.npz', '')
-    feeder, kategori = feeder_kat.rsplit('_', 1)
-    model_path = os.path.join(model_dir, f"{feeder}_{kategori}.keras")
-
-    if not args.overwrite and os.path.exists(model_path):
-        print(f"⏩ Melewati: {feeder}_{kategori} (model sudah ada)")
-        continue
-
-    print(f"🚀 Training {feeder}_{kategori}...")
+from utils.load_dataset import list_datasets
+
+
+def default_threads(workers):
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+# --- Worker pool (--workers) ---
+def _init_worker(threads):
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+    global train
+    import train
+    import tensorflow as tf
+    # Harus diset sebelum operasi TF pertama di proses ini
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _train_worker(task):
+    feeder, kategori, model_dir = task
     try:
-        cmd = [
-            'python3', 'scripts/train.py',
-            '--feeder', feeder,
-            '--kategori', kategori,
-            '--output', model_dir
-        ]
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"❌ GAGAL training {feeder}_{kategori}: {e}")
+        return feeder, kategori, train.run(feeder, kategori, model_dir)
+    finally:
+        train.keras.backend.clear_session()
+
+
+def run_parallel(pending, model_dir, workers, threads):
+    """Latih dataset pending di pool proses; kembalikan list (feeder, kategori) yang gagal."""
+    failed = []
+    tasks = [(feeder, kategori, model_dir) for feeder, kategori in pending]
+    # spawn: aman walau parent sudah memuat TensorFlow (mode in-process loadpro.py)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        for i, (feeder, kategori, ok) in enumerate(pool.map(_train_worker, tasks), start=1):
+            icon = "✅" if ok else "❌"
+            print(f"{icon} [{i}/{len(tasks)}] {feeder}_{kategori}")
+            if not ok:
+                failed.append((feeder, kategori))
+    return failed
+
+
+def main(overwrite=False, output='models/temporary', in_process=False, workers=1, threads=None):
+    # --- Lokasi folder ---
+    model_dir = output
+    os.makedirs(model_dir, exist_ok=True)
+
+    if in_process:
+        import train
+
+    # --- Cari semua dataset ---
+    datasets = list_datasets()
+    print(f"\n📦 Menemukan {len(datasets)} dataset")
     print("-" * 42)
 
-print("\n🎉 Selesai training semua penyulang.")
+    pending = []
+    for feeder, kategori in datasets:
+        model_path = os.path.join(model_dir, f"{feeder}_{kategori}.keras")
+        if not overwrite and os.path.exists(model_path):
+            print(f"⏩ Melewati: {feeder}_{kategori} (model sudah ada)")
+            continue
+        pending.append((feeder, kategori))
+
+    if workers > 1 and pending:
+        threads = threads or default_threads(workers)
+        print(f"⚙️  {workers} worker x {threads} thread TensorFlow, {len(pending)} model")
+        failed = run_parallel(pending, model_dir, workers, threads)
+        for feeder, kategori in failed:
+            print(f"❌ GAGAL training {feeder}_{kategori}")
+        print("\n🎉 Selesai training semua penyulang.")
+        return
+
+    # --- Loop semua dataset ---
+    for feeder, kategori in pending:
+        print(f"🚀 Training {feeder}_{kategori}...")
+        if in_process:
+            if not train.run(feeder, kategori, model_dir):
+                print(f"❌ GAGAL training {feeder}_{kategori}")
+            # Bersihkan state global Keras agar memori tidak menumpuk
+            train.keras.backend.clear_session()
+        else:
+            try:
+                cmd = [
+                    'python3', 'scripts/train.py',
+                    '--feeder', feeder,
+                    '--kategori', kategori,
+                    '--output', model_dir
+                ]
+                subprocess.run(cmd, check=True)
+            except subprocess.CalledProcessError as e:
+                print(f"❌ GAGAL training {feeder}_{kategori}: {e}")
+        print("-" * 42)
+
+    print("\n🎉 Selesai training semua penyulang.")
+
+
+if __name__ == '__main__':
+    # --- Argument parser ---
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--overwrite', action='store_true', help='Force retrain all even if model exists')
+    parser.add_argument('--output', default='models/temporary', help='Output folder untuk model .keras')
+    parser.add_argument('--in-process', action='store_true', help='Latih di proses yang sama (tanpa subprocess)')
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah proses trainer paralel (default 1)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Thread TensorFlow per worker (default: jumlah core / workers)')
+    args = parser.parse_args()
+
+    main(args.overwrite, args.output, args.in_process, args.workers, args.threads)
@@ -0,0 +1,123 @@
+# ===================================================
+# TRAIN_GLOBAL.PY v1.1
+# ---------------------------------------------------
+# LOADPRO Project | Training 1 model LSTM global untuk
+# semua penyulang & kategori (alternatif train_all.py)
+#
+# - Window semua dataset ditumpuk jadi 1 array training
+# - Identitas feeder/kategori masuk lewat input `series_id`
+#   -> Embedding, digabung ke setiap langkah window
+# - 1x compile + 1x fit dengan batch besar (memakai semua core CPU),
+#   bukan ~2000 model kecil dengan overhead masing-masing
+# - Output: models/global/global.keras + global_index.json
+#   (dipakai predict.py / predict_next.py dengan --model global)
+# v1.1: instrumentasi utils/profiling.py (tf_import, fit, predict, save_model)
+# ---------------------------------------------------
+# python3 scripts/train_global.py
+# python3 scripts/train_global.py --epochs 100 --batch-size 512
+# ===================================================
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+import warnings
+warnings.filterwarnings("ignore", category=FutureWarning)
+import argparse
+import numpy as np
+from datetime import datetime
+
+from utils import profiling
+profiling.tf_import()
+from tensorflow import keras
+
+from utils.load_dataset import list_datasets, load_dataset
+from utils.global_model import GLOBAL_DIR, MODEL_PATH, series_key, save_index
+
+
+def setup_logger():
+    log_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs', 'train'))
+    os.makedirs(log_dir, exist_ok=True)
+    ts = datetime.now().strftime('%Y%m%d_%H%M')
+    return open(os.path.join(log_dir, f"{ts}_train_global.log"), 'w')
+
+
+def log(logfile, msg):
+    timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+    line = f"{timestamp} {msg}"
+    print(line)
+    logfile.write(line + "\n")
+
+
+def stack_datasets(datasets):
+    """Tumpuk window semua dataset -> (X, ids, y, keys)."""
+    keys, Xs, ys, ids = [], [], [], []
+    for feeder, kategori in datasets:
+        X, y = load_dataset(feeder, kategori)
+        if len(X) == 0:
+            continue
+        ids.append(np.full(len(X), len(keys), dtype=np.int32))
+        keys.append(series_key(feeder, kategori))
+        Xs.append(X)
+        ys.append(y)
+    return np.concatenate(Xs), np.concatenate(ids), np.concatenate(ys), keys
+
+
+def build_model(n_series, window, units=50, embedding_dim=8):
+    seq_in = keras.Input(shape=(window, 1), name="window")
+    id_in = keras.Input(shape=(), dtype="int32", name="series_id")
+    emb = keras.layers.Embedding(n_series, embedding_dim, name="series_embedding")(id_in)
+    emb = keras.layers.RepeatVector(window)(emb)
+    x = keras.layers.Concatenate()([seq_in, emb])
+    x = keras.layers.LSTM(units)(x)
+    out = keras.layers.Dense(1)(x)
+    model = keras.Model([seq_in, id_in], out)
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+
+def main(epochs=50, batch_size=256, units=50, embedding_dim=8):
+    logf = setup_logger()
+    try:
+        datasets = list_datasets()
+        X, ids, y, keys = stack_datasets(datasets)
+        window = X.shape[1]
+        log(logf, f"📦 {len(keys)} dataset ditumpuk: X {X.shape}, y {y.shape}")
+
+        model = build_model(len(keys), window, units, embedding_dim)
+        log(logf, "🧠 Model global compiled. Mulai training...")
+        early_stop = keras.callbacks.EarlyStopping(monitor='loss', patience=5, restore_best_weights=True)
+        with profiling.timer("fit"):
+            history = model.fit([X, ids], y, epochs=epochs, batch_size=batch_size,
+                                shuffle=True, verbose=0, callbacks=[early_stop])
+        log(logf, f"📉 Final Loss: {history.history['loss'][-1]:.4f}")
+        log(logf, f"🛑 Early stopped after {len(history.history['loss'])} epochs")
+
+        with profiling.timer("predict"):
+            pred = model.predict([X, ids], batch_size=4096, verbose=0).reshape(-1)
+        err = pred - y
+        log(logf, "✅ Evaluation (skala 0-1, semua dataset):")
+        log(logf, f"   MAE  = {np.mean(np.abs(err)):.4f}")
+        log(logf, f"   RMSE = {np.sqrt(np.mean(err ** 2)):.4f}")
+
+        os.makedirs(GLOBAL_DIR, exist_ok=True)
+        with profiling.timer("save_model"):
+            model.save(MODEL_PATH)
+        save_index(keys, window)
+        log(logf, f"💾 Model global disimpan di: {MODEL_PATH}")
+        log(logf, "🎉 Training global selesai tanpa error.")
+        return True
+    except Exception as e:
+        log(logf, f"❌ ERROR: {str(e)}")
+        return False
+    finally:
+        logf.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="🌐 Training 1 model LSTM global untuk semua penyulang")
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--units', type=int, default=50, help='Jumlah unit LSTM')
+    parser.add_argument('--embedding-dim', type=int, default=8, help='Dimensi embedding feeder/kategori')
+    args = parser.parse_args()
+
+    main(args.epochs, args.batch_size, args.units, args.embedding_dim)
@@ -1,5 +1,5 @@
 # ===================================================
-# tuning.py v1.1
+# tuning.py v1.3
 # ---------------------------------------------------
 # LOADPRO | Hyperparameter Tuning Entry Point
 #
@@ -8,43 +8,65 @@
 # - Mendukung modularisasi metode tuning (grid, random, bayesopt, dll)
 # - Menyimpan hasil tuning (.pkl + .keras) ke folder results/tuning/
 # - Menyimpan log stdout ke folder logs/tuning/
+#
+# v1.2:
+# - Fix import (run_bayesopt dari tuning/bayesopt_search.py)
+# - --workers / --batch / --n-calls: Bayesian optimization paralel
+#
+# v1.3:
+# - --method hyperband: successive halving, trial buruk dihentikan
+#   setelah beberapa epoch (--max-epochs, --eta)
 # ===================================================
+# python3 scripts/tuning.py --feeder penyulang_x --kategori siang --workers 4
+# python3 scripts/tuning.py --feeder penyulang_x --kategori siang --method hyperband
 
 import os
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
 import sys
 import argparse
 from datetime import datetime
 
 # Import fungsi tuning dari metode yang tersedia
 from tuning.bayesopt_search import run_bayesopt
+from tuning.hyperband_search import run_hyperband
 
 # Import utilitas umum
-from utils.load_dataset import load_dataset
-from utils.lstm_train_predict import train_and_evaluate_model
+from tuning.common import load_tuning_data
 
-# Pastikan semua folder output tersedia
-os.makedirs("logs/tuning", exist_ok=True)
-os.makedirs("results/tuning", exist_ok=True)
+if __name__ == "__main__":
+    # Pastikan semua folder output tersedia
+    os.makedirs("logs/tuning", exist_ok=True)
+    os.makedirs("results/tuning", exist_ok=True)
 
-# Argument parsing
-parser = argparse.ArgumentParser()
-parser.add_argument("--feeder", type=str, required=True, help="Nama file penyulang (tanpa ekstensi)")
-parser.add_argument("--kategori", type=str, required=True, choices=["siang", "malam"])
-parser.add_argument("--method", type=str, default="bayesopt", choices=["bayesopt"], help="Metode tuning")
-args = parser.parse_args()
+    # Argument parsing
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeder", type=str, required=True, help="Nama file penyulang (tanpa ekstensi)")
+    parser.add_argument("--kategori", type=str, required=True, choices=["siang", "malam"])
+    parser.add_argument("--method", type=str, default="bayesopt", choices=["bayesopt", "hyperband"], help="Metode tuning")
+    parser.add_argument("--n-calls", type=int, default=20, help="Jumlah trial (default 20)")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses evaluasi paralel (default 1)")
+    parser.add_argument("--batch", type=int, default=None, help="Kandidat per iterasi (default = workers)")
+    parser.add_argument("--no-cache", action="store_true", help="Bayesopt: jangan pakai / isi cache trial")
+    parser.add_argument("--max-epochs", type=int, default=50, help="Hyperband: epoch maksimum per trial")
+    parser.add_argument("--eta", type=int, default=3, help="Hyperband: faktor reduksi tiap rung")
+    args = parser.parse_args()
 
-# Logging ke file
-timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-logfile = f"logs/tuning/{timestamp}_tuning_{args.method}.log"
-sys.stdout = open(logfile, "w")
+    # Logging ke file
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    logfile = f"logs/tuning/{timestamp}_tuning_{args.method}.log"
+    sys.stdout = open(logfile, "w", buffering=1)
 
-print(f"📌 Tuning dimulai untuk penyulang: {args.feeder} [{args.kategori}] menggunakan metode {args.method}")
+    print(f"📌 Tuning dimulai untuk penyulang: {args.feeder} [{args.kategori}] menggunakan metode {args.method}")
 
-# Load data
-X, y = load_dataset(args.feeder, args.kategori)
+    # Load data: deret 1-D, window dibentuk sesuai window_size tiap trial
+    data = load_tuning_data(args.feeder, args.kategori)
 
-# Jalankan metode tuning yang dipilih
-if args.method == "bayesopt":
-    run_bayesopt(X, y, args.feeder, args.kategori)
+    # Jalankan metode tuning yang dipilih
+    if args.method == "bayesopt":
+        run_bayesopt(data, args.feeder, args.kategori, n_calls=args.n_calls,
+                     workers=args.workers, batch=args.batch, log_file=sys.stdout, cache=not args.no_cache)
+    elif args.method == "hyperband":
+        run_hyperband(data, args.feeder, args.kategori, max_epochs=args.max_epochs,
+                      eta=args.eta, log_file=sys.stdout)
 
-print("✅ Tuning selesai.")
+    print("✅ Tuning selesai.")
@@ -1,131 +1,194 @@
-# bayesopt_search.py v1.1
+# bayesopt_search.py v1.2
 # --------------------------------------------------
 # Melakukan tuning hyperparameter dengan Bayesian Optimization
 # untuk 1 penyulang dan 1 kategori (siang/malam)
 # Output: model .keras, hasil tuning .pkl, dan log .log
+#
+# v1.2:
+# - run_bayesopt() bisa dipanggil dari tuning.py
+# - Dataset dibaca lewat utils/load_dataset.py (npz / store / npy)
+# - --workers N: loop ask/tell skopt.Optimizer, q kandidat per iterasi
+#   (constant liar cl_min) dievaluasi paralel di pool proses.
+#   Dataset dimuat sekali per worker, bukan sekali per trial.
+# - learning_rate benar-benar dipakai optimizer Adam
+# - EarlyStopping memantau val_loss dari split validasi (sebelumnya
+#   val_loss tidak tersedia sehingga early stopping tidak pernah aktif)
+# - search(x0=...): warm start dari params yang sudah diketahui bagus
+# - window_size 3-10 dibentuk dari deret 1-D (SeriesWindows, view per
+#   ukuran di-cache), bukan X[:, -w:] dari window 5 hasil preprocessing
+# - Cache trial persisten (trial_cache di results/tuning/tuning.sqlite):
+#   kunci hash data + hyperparameter + OBJECTIVE_VERSION, dicek sebelum
+#   fit. Run ulang dengan random_state sama memutar ulang trial lama dari
+#   cache, sehingga pencarian yang terputus lanjut dari titik terakhir.
+#   --no-cache untuk menonaktifkan. Trial gagal (RMSE inf) tidak
+#   di-cache, jadi dicoba lagi saat pencarian dilanjutkan.
 # --------------------------------------------------
+# python3 scripts/tuning/bayesopt_search.py --feeder penyulang_x --kategori siang
+# python3 scripts/tuning/bayesopt_search.py --feeder penyulang_x --kategori siang --workers 4
 
 import os
+import sys
 import time
 import argparse
-import numpy as np
-import pickle
-import pandas as pd
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from keras.models import Sequential
-from keras.layers import LSTM, Dense
-from keras.callbacks import EarlyStopping
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error
-from skopt import gp_minimize
-from skopt.space import Integer, Real
+import numpy as np
+from skopt import Optimizer
 
-# -----------------------------------------------
-def load_data(npz_path):
-    data = np.load(npz_path)
-    return data['X'], data['y']
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tuning.common import SPACE, to_params, build_model, split_validation, save_best, load_tuning_data, data_hash
+from tuning.results_db import DB_PATH, connect, cached_trial, save_trial
 
-# -----------------------------------------------
-def build_model(input_shape, hidden_units, learning_rate):
-    model = Sequential()
-    model.add(LSTM(hidden_units, input_shape=input_shape))
-    model.add(Dense(1))
-    model.compile(optimizer='adam', loss='mse')
-    return model
+METHOD_NAME = "bayesopt"
+# Naikkan bila objective / arsitektur / split berubah -> cache trial lama tidak dipakai
+OBJECTIVE_VERSION = "lstm-adam-es5-val20-v1"
 
 # -----------------------------------------------
 def evaluate_model(model, X_val, y_val):
-    y_pred = model.predict(X_val)
-    rmse = np.sqrt(mean_squared_error(y_val, y_pred))
-    return rmse
+    y_pred = model.predict(X_val, verbose=0).reshape(-1)
+    return float(np.sqrt(np.mean((y_val - y_pred) ** 2)))
 
 # -----------------------------------------------
-def objective(params):
-    hidden_units = params[0]
-    window_size = params[1]
-    learning_rate = params[2]
+def objective(data, params):
+    """RMSE validasi (20% terakhir) untuk 1 set hyperparameter."""
+    hidden_units, window_size, learning_rate = to_params(params)
+    from keras.callbacks import EarlyStopping
 
     try:
-        X, y = load_data(npz_path)
-        X = X[:, -window_size:, :]
-        split = int(0.8 * len(X))
-        X_train, y_train = X[:split], y[:split]
-        X_val, y_val = X[split:], y[split:]
+        X_train, y_train, X_val, y_val = split_validation(data, window_size)
 
-        model = build_model((window_size, 1), hidden_units, learning_rate)
+        model = build_model((X_train.shape[1], 1), hidden_units, learning_rate)
         callback = EarlyStopping(patience=5, restore_best_weights=True)
-        model.fit(X_train, y_train, epochs=50, batch_size=32, verbose=0, callbacks=[callback])
+        model.fit(X_train, y_train, epochs=50, batch_size=32, verbose=0, callbacks=[callback],
+                  validation_data=(X_val, y_val))
 
-        rmse = evaluate_model(model, X_val, y_val)
-        return rmse
+        return evaluate_model(model, X_val, y_val)
 
     except Exception as e:
         print(f"⚠️  Error in objective: {e}")
         return np.inf
 
+# -----------------------------------------------
+# Worker pool: dataset dimuat sekali per proses
+_worker_data = None
+
+def _init_worker(feeder, kategori, threads):
+    global _worker_data
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _worker_data = load_tuning_data(feeder, kategori)
+
+def timed_objective(data, params):
+    start = time.perf_counter()
+    return objective(data, params), time.perf_counter() - start
+
+def _objective_worker(params):
+    from tensorflow import keras
+    try:
+        return timed_objective(_worker_data, params)
+    finally:
+        keras.backend.clear_session()
+
+# -----------------------------------------------
+def search(data, feeder, kategori, n_calls=20, workers=1, batch=None, threads=None, log_file=None, x0=None,
+           cache=True, db_path=DB_PATH):
+    """Loop ask/tell; return (best_params, best_score, trials).
+
+    x0: titik awal (warm start, mis. params terbaik cluster) yang dievaluasi
+    lebih dulu; GP langsung dipakai setelahnya tanpa titik acak tambahan.
+    cache: pakai & isi trial_cache (hanya proses ini yang menulis) di db_path.
+    """
+    batch = batch or workers
+    x0 = [list(to_params(p)) for p in (x0 or [])][:n_calls]
+    opt = Optimizer(SPACE, base_estimator="GP", n_initial_points=len(x0) or 10, random_state=42)
+    trials = []
+    conn = connect(db_path) if cache else None
+    key = data_hash(data) if cache else None
+    hits = 0
+
+    pool = None
+    try:
+        while len(trials) < n_calls:
+            q = min(batch, n_calls - len(trials))
+            start = time.perf_counter()
+            if x0:
+                points, x0 = x0[:q], x0[q:]
+            elif workers > 1:
+                # Ukuran batch tidak bergantung pada pool: pool dibuat di ronde
+                # pertama yang punya > 1 titik baru (di bawah)
+                points = opt.ask(n_points=q, strategy="cl_min")
+            else:
+                points = [opt.ask()]
+            # Cek cache dulu; hanya trial baru yang dilatih
+            scores = [cached_trial(conn, key, OBJECTIVE_VERSION, to_params(p)) if cache else None
+                      for p in points]
+            todo = [i for i, s in enumerate(scores) if s is None]
+            if len(todo) > 1 and workers > 1 and pool is None:
+                threads = threads or max(1, (os.cpu_count() or 1) // workers)
+                ctx = multiprocessing.get_context("spawn")
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                           initargs=(feeder, kategori, threads))
+            if pool is None or len(todo) <= 1:
+                evaluated = [timed_objective(data, points[i]) for i in todo]
+            else:
+                evaluated = list(pool.map(_objective_worker, [points[i] for i in todo]))
+            for i, (score, seconds) in zip(todo, evaluated):
+                scores[i] = score
+                if cache:
+                    save_trial(conn, key, OBJECTIVE_VERSION, to_params(points[i]), score, seconds, feeder, kategori)
+            hits += len(points) - len(todo)
+
+            opt.tell(points, scores)
+            elapsed = time.perf_counter() - start
+            for i, (p, s) in enumerate(zip(points, scores)):
+                trials.append((p, s))
+                src = " (cache)" if i not in todo else "" if np.isfinite(s) else " (gagal, tidak di-cache)"
+                print(f"[🔁] Trial {len(trials)}/{n_calls}: hidden_units={p[0]}, window_size={p[1]}, "
+                      f"lr={p[2]:.5f} -> RMSE={s:.6f}{src}", file=log_file)
+            print(f"[⏱] {len(points)} trial dalam {elapsed:.1f} detik", file=log_file)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if conn is not None:
+            conn.close()
+    if cache:
+        print(f"[💾] Cache trial: {hits} dari {len(trials)} trial tanpa training ulang", file=log_file)
+
+    best = int(np.argmin([s for _, s in trials]))
+    return trials[best][0], trials[best][1], trials
+
+# -----------------------------------------------
+def run_bayesopt(data, feeder, kategori, n_calls=20, workers=1, batch=None, threads=None, log_file=None,
+                 cache=True):
+    """Tuning + latih ulang model terbaik + simpan .keras dan .pkl."""
+    print(f"[🧪] Mulai tuning {feeder} - {kategori} ({n_calls} trial, {workers} worker)...", file=log_file)
+    start = time.perf_counter()
+    best_params, best_score, trials = search(data, feeder, kategori, n_calls, workers, batch, threads, log_file,
+                                             cache=cache)
+    print(f"[✅] Tuning selesai dalam {time.perf_counter() - start:.1f} detik.", file=log_file)
+    return save_best(data, feeder, kategori, METHOD_NAME, best_params, best_score, trials, log_file)
+
 # -----------------------------------------------
 if __name__ == "__main__":
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
     parser = argparse.ArgumentParser()
     parser.add_argument("--feeder", required=True, help="Nama penyulang")
     parser.add_argument("--kategori", required=True, choices=["siang", "malam"], help="Kategori waktu")
+    parser.add_argument("--n-calls", type=int, default=20, help="Jumlah trial (default 20)")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses evaluasi paralel (default 1)")
+    parser.add_argument("--batch", type=int, default=None, help="Kandidat per iterasi ask/tell (default = workers)")
+    parser.add_argument("--threads", type=int, default=None, help="Thread TensorFlow per worker")
+    parser.add_argument("--no-cache", action="store_true", help="Jangan pakai / isi cache trial")
     args = parser.parse_args()
 
-    feeder = args.feeder
-    kategori = args.kategori
-    method_name = "bayesopt"
-
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    npz_path = f"data/npz/{feeder}_{kategori}.npz"
     os.makedirs("logs/tuning", exist_ok=True)
-    os.makedirs("models/tuning", exist_ok=True)
-    os.makedirs("results/tuning", exist_ok=True)
-
-    log_path = f"logs/tuning/{timestamp}_tuning_{feeder}_{kategori}_{method_name}.log"
-    model_path = f"models/tuning/{feeder}_{kategori}_{method_name}.keras"
-    result_path = f"results/tuning/{feeder}_{kategori}_{method_name}_result.pkl"
-
-    with open(log_path, "w") as log_file:
-        print(f"[🧪] Mulai tuning {feeder} - {kategori}...", file=log_file)
-        print(f"[🗂] File NPZ: {npz_path}", file=log_file)
-
-        space = [
-            Integer(16, 128, name='hidden_units'),
-            Integer(3, 10, name='window_size'),
-            Real(1e-4, 1e-2, prior='log-uniform', name='learning_rate')
-        ]
-
-        def wrapped(params):
-            return objective(params)
-
-        result = gp_minimize(
-            wrapped,
-            space,
-            n_calls=20,
-            random_state=42
-        )
-
-        best_params = result.x
-        print(f"[✅] Tuning selesai.", file=log_file)
-        print(f"[🏆] Best params: hidden_units={best_params[0]}, window_size={best_params[1]}, lr={best_params[2]:.5f}", file=log_file)
-
-        # Train ulang model terbaik
-        X, y = load_data(npz_path)
-        X = X[:, -best_params[1]:, :]
-        model = build_model((best_params[1], 1), best_params[0], best_params[2])
-        model.fit(X, y, epochs=50, batch_size=32, verbose=0)
-        model.save(model_path)
-        print(f"[💾] Model terbaik disimpan di: {model_path}", file=log_file)
-
-        with open(result_path, "wb") as f:
-            pickle.dump({
-                "feeder": feeder,
-                "kategori": kategori,
-                "method": method_name,
-                "best_params": {
-                    "hidden_units": best_params[0],
-                    "window_size": best_params[1],
-                    "learning_rate": best_params[2],
-                },
-                "score": result.fun
-            }, f)
-        print(f"[📊] Hasil tuning disimpan di: {result_path}", file=log_file)
+    log_path = f"logs/tuning/{timestamp}_tuning_{args.feeder}_{args.kategori}_{METHOD_NAME}.log"
+
+    data = load_tuning_data(args.feeder, args.kategori)
+    with open(log_path, "w", buffering=1) as log_file:
+        run_bayesopt(data, args.feeder, args.kategori,
+                     args.n_calls, args.workers, args.batch, args.threads, log_file, cache=not args.no_cache)
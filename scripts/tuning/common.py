@@ -0,0 +1,91 @@
+# common.py
+# --------------------------------------------------
+# Bagian bersama metode tuning (bayesopt, hyperband):
+# ruang hyperparameter, arsitektur model, split validasi,
+# dan penyimpanan model terbaik + hasil .pkl.
+# Data tuning = SeriesWindows (utils/windowing.py): window_size berapa pun
+# dibentuk dari deret 1-D hasil scaling, bukan dipotong dari window 5.
+# --------------------------------------------------
+
+import os
+import pickle
+import hashlib
+import numpy as np
+from skopt.space import Integer, Real
+
+from utils.load_dataset import load_series
+from utils.windowing import SeriesWindows
+
+SPACE = [
+    Integer(16, 128, name='hidden_units'),
+    Integer(3, 10, name='window_size'),
+    Real(1e-4, 1e-2, prior='log-uniform', name='learning_rate')
+]
+
+
+def to_params(point):
+    """Titik skopt -> (hidden_units, window_size, learning_rate) bertipe Python."""
+    return int(point[0]), int(point[1]), float(point[2])
+
+
+def load_tuning_data(feeder, kategori):
+    """Deret 1-D feeder/kategori dalam memori, siap di-window ukuran apa pun."""
+    return SeriesWindows(load_series(feeder, kategori))
+
+
+def data_hash(data):
+    """Versi data tuning: sha256 deret 1-D hasil scaling."""
+    return hashlib.sha256(np.ascontiguousarray(data.series, dtype=np.float64).tobytes()).hexdigest()
+
+
+def build_model(input_shape, hidden_units, learning_rate):
+    from keras.models import Sequential
+    from keras.layers import LSTM, Dense
+    from keras.optimizers import Adam
+
+    model = Sequential()
+    model.add(LSTM(hidden_units, input_shape=input_shape))
+    model.add(Dense(1))
+    model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse')
+    return model
+
+
+def split_validation(data, window_size):
+    """Window ukuran window_size, 80% awal untuk training, 20% akhir untuk validasi."""
+    X, y = data.get(window_size)
+    split = int(0.8 * len(X))
+    return X[:split], y[:split], X[split:], y[split:]
+
+
+def save_best(data, feeder, kategori, method, best_params, score, trials, log_file=None, epochs=50):
+    """Latih ulang konfigurasi terbaik di seluruh data, simpan .keras dan .pkl."""
+    os.makedirs("models/tuning", exist_ok=True)
+    os.makedirs("results/tuning", exist_ok=True)
+    model_path = f"models/tuning/{feeder}_{kategori}_{method}.keras"
+    result_path = f"results/tuning/{feeder}_{kategori}_{method}_result.pkl"
+
+    hidden_units, window_size, learning_rate = to_params(best_params)
+    print(f"[🏆] Best params: hidden_units={hidden_units}, window_size={window_size}, lr={learning_rate:.5f}", file=log_file)
+
+    X_best, y = data.get(window_size)
+    model = build_model((window_size, 1), hidden_units, learning_rate)
+    model.fit(X_best, y, epochs=epochs, batch_size=32, verbose=0)
+    model.save(model_path)
+    print(f"[💾] Model terbaik disimpan di: {model_path}", file=log_file)
+
+    result = {
+        "feeder": feeder,
+        "kategori": kategori,
+        "method": method,
+        "best_params": {
+            "hidden_units": hidden_units,
+            "window_size": window_size,
+            "learning_rate": learning_rate,
+        },
+        "score": float(score),
+        "trials": [(list(to_params(p)), float(s)) for p, s in trials],
+    }
+    with open(result_path, "wb") as f:
+        pickle.dump(result, f)
+    print(f"[📊] Hasil tuning disimpan di: {result_path}", file=log_file)
+    return result
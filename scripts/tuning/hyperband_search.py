@@ -0,0 +1,127 @@
+# hyperband_search.py v1.0
+# --------------------------------------------------
+# Tuning hyperparameter dengan Hyperband (successive halving)
+# untuk 1 penyulang dan 1 kategori (siang/malam)
+# Output: model .keras, hasil tuning .pkl, dan log .log
+#
+# - Tiap trial melaporkan val_loss per epoch
+# - Tiap bracket: n konfigurasi acak dilatih r epoch, 1/eta terbaik
+#   dilanjutkan (bobot tidak diulang dari awal) sampai max_epochs,
+#   sisanya dihentikan (pruned)
+# - Ruang hyperparameter & arsitektur sama dengan bayesopt
+#   (tuning/common.py)
+# --------------------------------------------------
+# python3 scripts/tuning/hyperband_search.py --feeder penyulang_x --kategori siang
+# python3 scripts/tuning/hyperband_search.py --feeder penyulang_x --kategori siang --max-epochs 27 --eta 3
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+import numpy as np
+from skopt.space import Space
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tuning.common import SPACE, to_params, build_model, split_validation, save_best, load_tuning_data
+
+METHOD_NAME = "hyperband"
+
+# -----------------------------------------------
+def new_trial(point):
+    return {"params": to_params(point), "model": None, "data": None, "epochs": 0, "val_loss": []}
+
+def train_to(trial, data, epochs):
+    """Lanjutkan training trial sampai total `epochs`; return jumlah epoch yang dijalankan."""
+    hidden_units, window_size, learning_rate = trial["params"]
+    if trial["model"] is None:
+        trial["data"] = split_validation(data, window_size)
+        trial["model"] = build_model((trial["data"][0].shape[1], 1), hidden_units, learning_rate)
+    run = epochs - trial["epochs"]
+    if run <= 0:
+        return 0
+    X_train, y_train, X_val, y_val = trial["data"]
+    history = trial["model"].fit(X_train, y_train, initial_epoch=trial["epochs"], epochs=epochs,
+                                 batch_size=32, verbose=0, validation_data=(X_val, y_val))
+    trial["val_loss"].extend(history.history["val_loss"])
+    trial["epochs"] = epochs
+    return run
+
+def score(trial):
+    """RMSE validasi terbaik sejauh ini (inf bila gagal / belum dilatih)."""
+    losses = [v for v in trial["val_loss"] if np.isfinite(v)]
+    return float(np.sqrt(min(losses))) if losses else np.inf
+
+def release(trial):
+    trial["model"] = None
+    trial["data"] = None
+
+# -----------------------------------------------
+def hyperband(data, max_epochs=50, eta=3, random_state=42, log_file=None):
+    """Return (best_params, best_score, trials, total_epochs)."""
+    space = Space(SPACE)
+    rng = np.random.RandomState(random_state)
+    s_max = int(np.log(max_epochs) / np.log(eta) + 1e-9)
+    trials = []
+    total_epochs = 0
+
+    for s in range(s_max, -1, -1):
+        n = int(np.ceil((s_max + 1) / (s + 1) * eta ** s))
+        r = max_epochs * eta ** (-s)
+        bracket = [new_trial(p) for p in space.rvs(n, random_state=rng)]
+        trials.extend(bracket)
+        print(f"[🧺] Bracket s={s}: {n} konfigurasi, mulai {max(1, round(r))} epoch", file=log_file)
+
+        for i in range(s + 1):
+            epochs = max_epochs if i == s else max(1, int(round(r * eta ** i)))
+            for trial in bracket:
+                try:
+                    total_epochs += train_to(trial, data, epochs)
+                except Exception as e:
+                    print(f"⚠️  Error in trial {trial['params']}: {e}", file=log_file)
+                    trial["val_loss"].append(np.inf)
+            bracket.sort(key=score)
+            keep = len(bracket) if i == s else max(1, int(n * eta ** (-i - 1)))
+            print(f"[🪜] Rung {i}: {len(bracket)} trial @ {epochs} epoch, terbaik RMSE={score(bracket[0]):.6f}, "
+                  f"lanjut {keep if i < s else 0}", file=log_file)
+            for trial in bracket[keep:]:
+                release(trial)
+            bracket = bracket[:keep]
+        for trial in bracket:
+            release(trial)
+
+    best = min(trials, key=score)
+    return best["params"], score(best), trials, total_epochs
+
+# -----------------------------------------------
+def run_hyperband(data, feeder, kategori, max_epochs=50, eta=3, log_file=None):
+    """Tuning + latih ulang model terbaik + simpan .keras dan .pkl."""
+    print(f"[🧪] Mulai tuning {feeder} - {kategori} (hyperband, max_epochs={max_epochs}, eta={eta})...", file=log_file)
+    start = time.perf_counter()
+    best_params, best_score, trials, total_epochs = hyperband(data, max_epochs, eta, log_file=log_file)
+    full = len(trials) * max_epochs
+    print(f"[✅] Tuning selesai dalam {time.perf_counter() - start:.1f} detik: {len(trials)} trial, "
+          f"{total_epochs} epoch dijalankan (tanpa pruning: {full}, hemat {1 - total_epochs / full:.0%}).",
+          file=log_file)
+    result = save_best(data, feeder, kategori, METHOD_NAME, best_params, best_score,
+                       [(t["params"], score(t)) for t in trials], log_file, epochs=max_epochs)
+    return result
+
+# -----------------------------------------------
+if __name__ == "__main__":
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeder", required=True, help="Nama penyulang")
+    parser.add_argument("--kategori", required=True, choices=["siang", "malam"], help="Kategori waktu")
+    parser.add_argument("--max-epochs", type=int, default=50, help="Epoch maksimum per trial (default 50)")
+    parser.add_argument("--eta", type=int, default=3, help="Faktor reduksi tiap rung (default 3)")
+    args = parser.parse_args()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    os.makedirs("logs/tuning", exist_ok=True)
+    log_path = f"logs/tuning/{timestamp}_tuning_{args.feeder}_{args.kategori}_{METHOD_NAME}.log"
+
+    data = load_tuning_data(args.feeder, args.kategori)
+    with open(log_path, "w", buffering=1) as log_file:
+        run_hyperband(data, args.feeder, args.kategori,
+                      args.max_epochs, args.eta, log_file)
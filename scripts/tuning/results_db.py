@@ -0,0 +1,121 @@
+# results_db.py
+# --------------------------------------------------
+# Tabel hasil tuning seluruh armada penyulang (SQLite),
+# menggantikan 1 file .pkl per feeder di results/tuning/.
+#
+# results/tuning/tuning.sqlite
+#   tuning_results: 1 baris per (feeder, kategori, method) -> hasil terbaru
+#   trial_cache   : RMSE validasi tiap trial yang pernah dievaluasi, kunci
+#                   hash data + hyperparameter + versi kode objective.
+#                   Dicek sebelum fit -> run ulang / lanjutan tidak melatih
+#                   ulang konfigurasi yang sama. Trial gagal (score
+#                   inf/NaN: OOM, interrupt, error lain) tidak disimpan
+#                   dan dicoba lagi pada run berikutnya.
+#
+# Contoh query:
+#   sqlite3 results/tuning/tuning.sqlite \
+#     "SELECT cluster, AVG(score) FROM tuning_results GROUP BY cluster"
+# --------------------------------------------------
+
+import os
+import math
+import sqlite3
+from datetime import datetime
+
+DB_PATH = os.path.join('results', 'tuning', 'tuning.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tuning_results (
+    feeder        TEXT NOT NULL,
+    kategori      TEXT NOT NULL,
+    method        TEXT NOT NULL,
+    cluster       INTEGER,
+    role          TEXT,
+    hidden_units  INTEGER,
+    window_size   INTEGER,
+    learning_rate REAL,
+    score         REAL,
+    n_trials      INTEGER,
+    seconds       REAL,
+    updated_at    TEXT,
+    PRIMARY KEY (feeder, kategori, method)
+)
+"""
+
+TRIAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trial_cache (
+    data_hash     TEXT NOT NULL,
+    code_version  TEXT NOT NULL,
+    hidden_units  INTEGER NOT NULL,
+    window_size   INTEGER NOT NULL,
+    learning_rate REAL NOT NULL,
+    feeder        TEXT,
+    kategori      TEXT,
+    score         REAL,
+    seconds       REAL,
+    created_at    TEXT,
+    PRIMARY KEY (data_hash, code_version, hidden_units, window_size, learning_rate)
+)
+"""
+
+COLUMNS = ["feeder", "kategori", "method", "cluster", "role", "hidden_units", "window_size",
+           "learning_rate", "score", "n_trials", "seconds", "updated_at"]
+
+
+def connect(db_path=DB_PATH):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # timeout: beberapa proses tuning (tuning_fleet --workers) menulis ke db yang sama
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute(SCHEMA)
+    conn.execute(TRIAL_SCHEMA)
+    return conn
+
+
+def save_result(conn, feeder, kategori, method, params, score, n_trials, seconds, cluster=None, role=None):
+    hidden_units, window_size, learning_rate = params
+    conn.execute(
+        f"INSERT OR REPLACE INTO tuning_results ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(COLUMNS))})",
+        (feeder, kategori, method, cluster, role, int(hidden_units), int(window_size),
+         float(learning_rate), float(score), int(n_trials), float(seconds),
+         datetime.now().isoformat(timespec='seconds')))
+    conn.commit()
+
+
+def best_params(conn, feeder, kategori, method=None):
+    """(hidden_units, window_size, learning_rate) dengan score terbaik, atau None."""
+    query = "SELECT hidden_units, window_size, learning_rate FROM tuning_results WHERE feeder = ? AND kategori = ?"
+    args = [feeder, kategori]
+    if method is not None:
+        query += " AND method = ?"
+        args.append(method)
+    row = conn.execute(query + " ORDER BY score LIMIT 1", args).fetchone()
+    return tuple(row) if row else None
+
+
+def load_results(conn):
+    """Seluruh tabel sebagai DataFrame."""
+    import pandas as pd
+    return pd.read_sql_query("SELECT * FROM tuning_results ORDER BY feeder, kategori, method", conn)
+
+
+def cached_trial(conn, data_hash, code_version, params):
+    """Score trial yang sudah pernah dievaluasi, atau None (juga untuk trial gagal lama)."""
+    hidden_units, window_size, learning_rate = params
+    row = conn.execute(
+        "SELECT score FROM trial_cache WHERE data_hash = ? AND code_version = ? "
+        "AND hidden_units = ? AND window_size = ? AND learning_rate = ?",
+        (data_hash, code_version, int(hidden_units), int(window_size), float(learning_rate))).fetchone()
+    return None if row is None or not math.isfinite(row[0]) else float(row[0])
+
+
+def save_trial(conn, data_hash, code_version, params, score, seconds, feeder=None, kategori=None):
+    """Simpan score trial; trial gagal (score tidak finite) tidak disimpan."""
+    if not math.isfinite(score):
+        return
+    hidden_units, window_size, learning_rate = params
+    conn.execute(
+        "INSERT OR REPLACE INTO trial_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (data_hash, code_version, int(hidden_units), int(window_size), float(learning_rate),
+         feeder, kategori, float(score), float(seconds), datetime.now().isoformat(timespec='seconds')))
+    conn.commit()
@@ -0,0 +1,180 @@
+# ===================================================
+# tuning_fleet.py v1.1
+# ---------------------------------------------------
+# LOADPRO | Tuning hyperparameter seluruh armada penyulang
+#
+# Alur:
+# 1. Statistik tiap deret (level, variasi, autokorelasi) dihitung
+#    dari dataset hasil preprocessing, lalu di-cluster (KMeans)
+# 2. Per cluster, deret terdekat ke centroid = representatif ->
+#    Bayesian optimization penuh (--n-calls, paralel --workers)
+# 3. Deret lain: warm start dari params terbaik cluster-nya dengan
+#    budget kecil (--warm-calls), dijalankan paralel per deret
+# 4. Semua hasil ke 1 tabel SQLite results/tuning/tuning.sqlite
+#    (tuning/results_db.py), bukan 1 .pkl per feeder
+#
+# v1.1:
+# - --db juga dipakai untuk trial_cache (representatif & warm start)
+# - Trial gagal (RMSE inf) tidak dipakai sebagai titik warm start
+# ===================================================
+# python3 scripts/tuning_fleet.py
+# python3 scripts/tuning_fleet.py --clusters 20 --n-calls 30 --warm-calls 5 --workers 8
+
+import os
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from tuning.bayesopt_search import search
+from tuning.common import load_tuning_data
+from tuning.results_db import DB_PATH, connect, save_result
+from utils.load_dataset import list_datasets, load_dataset, load_scaler
+
+METHOD_NAME = "fleet_bayesopt"
+
+
+def log_print(msg, logfile):
+    timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+    line = f"{timestamp} {msg}"
+    print(line)
+    logfile.write(line + "\n")
+
+
+def autocorr(y, lag):
+    if len(y) <= lag + 1:
+        return 0.0
+    a, b = y[:-lag] - y[:-lag].mean(), y[lag:] - y[lag:].mean()
+    denom = np.sqrt((a * a).sum() * (b * b).sum())
+    return float((a * b).sum() / denom) if denom > 0 else 0.0
+
+
+def series_features(feeder, kategori):
+    """Statistik deret: level & rentang beban (A), mean/std skala 0-1, autokorelasi lag 1 & 7."""
+    _, y = load_dataset(feeder, kategori)
+    y = np.asarray(y, dtype=float)
+    scaler = load_scaler(feeder, kategori)
+    lo, hi = float(scaler.data_min_[0]), float(scaler.data_max_[0])
+    return [np.log1p(max(lo, 0.0)), np.log1p(max(hi - lo, 0.0)), y.mean(), y.std(),
+            autocorr(y, 1), autocorr(y, 7)]
+
+
+def cluster_series(pairs, n_clusters):
+    """Return (labels, representatives) dengan representatives[c] = indeks deret terdekat centroid c."""
+    features = StandardScaler().fit_transform(np.array([series_features(f, k) for f, k in pairs]))
+    n_clusters = min(n_clusters, len(pairs))
+    km = KMeans(n_clusters=n_clusters, n_init=10, random_state=0).fit(features)
+    dist = km.transform(features)
+    representatives = {}
+    for c in range(n_clusters):
+        members = np.flatnonzero(km.labels_ == c)
+        representatives[c] = int(members[np.argmin(dist[members, c])])
+    return km.labels_, representatives
+
+
+# --- Worker warm start (1 task = 1 deret, search serial di dalamnya) ---
+def _init_worker(threads):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _warm_worker(task):
+    from tensorflow import keras
+    feeder, kategori, x0, n_calls, db_path = task
+    start = time.perf_counter()
+    try:
+        data = load_tuning_data(feeder, kategori)
+        with open(os.devnull, "w") as quiet:
+            params, score, trials = search(data, feeder, kategori,
+                                           n_calls=n_calls, x0=x0, log_file=quiet, db_path=db_path)
+        return feeder, kategori, params, score, len(trials), time.perf_counter() - start, None
+    except Exception as e:
+        return feeder, kategori, None, None, 0, time.perf_counter() - start, str(e)
+    finally:
+        keras.backend.clear_session()
+
+
+def main(n_clusters=None, n_calls=20, warm_calls=5, workers=1, db_path=DB_PATH):
+    start = time.time()
+    ts = datetime.now().strftime("%Y%m%d_%H%M")
+    os.makedirs("logs/tuning", exist_ok=True)
+    log_path = f"logs/tuning/{ts}_tuning_fleet.log"
+    logfile = open(log_path, "w", buffering=1)
+    conn = connect(db_path)
+
+    pairs = list_datasets()
+    n_clusters = n_clusters or max(1, int(round(np.sqrt(len(pairs) / 2))))
+    log_print(f"📦 {len(pairs)} deret, {n_clusters} cluster", logfile)
+    labels, representatives = cluster_series(pairs, n_clusters)
+
+    # --- Representatif: pencarian penuh ---
+    cluster_best = {}
+    for c, idx in sorted(representatives.items()):
+        feeder, kategori = pairs[idx]
+        size = int((labels == c).sum())
+        log_print(f"🎯 Cluster {c} ({size} deret): representatif {feeder}_{kategori}, {n_calls} trial", logfile)
+        t0 = time.perf_counter()
+        params, score, trials = search(load_tuning_data(feeder, kategori), feeder, kategori,
+                                       n_calls=n_calls, workers=workers, log_file=logfile, db_path=db_path)
+        save_result(conn, feeder, kategori, METHOD_NAME, params, score, len(trials),
+                    time.perf_counter() - t0, cluster=c, role="representative")
+        # 3 konfigurasi terbaik cluster (trial gagal dibuang) jadi titik awal warm start
+        top = sorted((t for t in trials if np.isfinite(t[1])), key=lambda t: t[1])[:3]
+        cluster_best[c] = [p for p, _ in top]
+        log_print(f"🏆 Cluster {c}: RMSE={score:.6f}, params={list(params)}", logfile)
+
+    # --- Deret lain: warm start, budget kecil ---
+    rep_idx = set(representatives.values())
+    tasks = [(f, k, cluster_best[labels[i]], max(warm_calls, len(cluster_best[labels[i]])), db_path)
+             for i, (f, k) in enumerate(pairs) if i not in rep_idx]
+    log_print(f"🔥 Warm start {len(tasks)} deret ({warm_calls} trial/deret, {workers} worker)", logfile)
+
+    cluster_of = {(f, k): int(labels[i]) for i, (f, k) in enumerate(pairs)}
+    if workers > 1 and tasks:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        ctx = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                   initializer=_init_worker, initargs=(threads,))
+        results = pool.map(_warm_worker, tasks)
+    else:
+        pool = None
+        results = map(_warm_worker, tasks)
+    failed = 0
+    try:
+        for i, (feeder, kategori, params, score, n, secs, error) in enumerate(results, start=1):
+            if error is not None:
+                failed += 1
+                log_print(f"❌ [{i}/{len(tasks)}] {feeder}_{kategori}: {error}", logfile)
+                continue
+            save_result(conn, feeder, kategori, METHOD_NAME, params, score, n, secs,
+                        cluster=cluster_of[(feeder, kategori)], role="warm")
+            log_print(f"✅ [{i}/{len(tasks)}] {feeder}_{kategori}: RMSE={score:.6f} ({secs:.1f} detik)", logfile)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    conn.close()
+    m, s = divmod(time.time() - start, 60)
+    log_print(f"🎉 Tuning armada selesai: {len(pairs) - failed} deret, {failed} gagal", logfile)
+    log_print(f"🗄️  Hasil: {db_path}", logfile)
+    log_print(f"🕒 Total waktu: {int(m)} menit {int(s)} detik", logfile)
+    logfile.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🎛️ Tuning hyperparameter seluruh armada penyulang")
+    parser.add_argument("--clusters", type=int, default=None,
+                        help="Jumlah cluster (default sqrt(jumlah deret / 2))")
+    parser.add_argument("--n-calls", type=int, default=20, help="Trial untuk representatif cluster (default 20)")
+    parser.add_argument("--warm-calls", type=int, default=5, help="Trial untuk deret lain (default 5)")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses paralel (default 1)")
+    parser.add_argument("--db", default=DB_PATH, help="Lokasi tabel hasil SQLite")
+    args = parser.parse_args()
+
+    main(args.clusters, args.n_calls, args.warm_calls, args.workers, args.db)
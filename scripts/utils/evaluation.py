@@ -0,0 +1,81 @@
+# evaluation.py
+# --------------------------------------------------
+# Evaluasi model bersama (train.py, compare.py):
+# - Holdout: ekor deret (sampel terakhir, urut waktu) per feeder/kategori.
+#   Ukurannya ditetapkan preprocess.py saat rebuild dan dicatat di manifest
+#   (kategori_info[k]["holdout"]); saat append ukurannya tetap, ekornya
+#   ikut bergeser ke data terbaru. Model dievaluasi setelah dilatih tanpa
+#   holdout; model yang disimpan train.py lalu di-refit pada seluruh deret
+#   (REFIT_FULL, env LOADPRO_REFIT_FULL=0 untuk menyimpan model tanpa
+#   holdout apa adanya) agar forecast H+1 ikut belajar dari data terbaru.
+# - Metrik MAE/RMSE/MAPE banyak feeder sekaligus dengan NumPy dari array
+#   prediksi yang ditumpuk (n_series, n), bukan sklearn per feeder.
+# --------------------------------------------------
+
+import os
+import numpy as np
+
+from utils.load_dataset import load_dataset, load_manifest
+
+HOLDOUT_SAMPLES = 30      # sampel terakhir yang ditahan untuk evaluasi
+MAX_HOLDOUT_FRAC = 0.2    # holdout maksimal 20% sampel
+REFIT_FULL = os.environ.get("LOADPRO_REFIT_FULL", "1") != "0"  # model final dilatih ulang di seluruh deret
+
+
+def holdout_size(n_samples, size=HOLDOUT_SAMPLES):
+    """Ukuran holdout untuk deret dengan n_samples window (minimal 1)."""
+    return max(1, min(size, int(n_samples * MAX_HOLDOUT_FRAC)))
+
+
+def recorded_holdout(feeder, kategori, n_samples):
+    """Ukuran holdout dari manifest; default holdout_size() bila belum tercatat."""
+    entry = load_manifest().get("feeders", {}).get(feeder) or {}
+    size = entry.get("kategori", {}).get(kategori, {}).get("holdout")
+    return min(int(size), n_samples - 1) if size else holdout_size(n_samples)
+
+
+def split_holdout(X, y, size):
+    """(X_train, y_train, X_holdout, y_holdout), holdout = `size` sampel terakhir."""
+    cut = len(X) - size
+    return X[:cut], y[:cut], X[cut:], y[cut:]
+
+
+def load_split(feeder, kategori):
+    """Dataset feeder/kategori yang sudah dipisah train / holdout."""
+    X, y = load_dataset(feeder, kategori)
+    return split_holdout(X, y, recorded_holdout(feeder, kategori, len(X)))
+
+
+def load_holdout(feeder, kategori):
+    """Hanya (X_holdout, y_holdout) -- cukup untuk tahap compare."""
+    return load_split(feeder, kategori)[2:]
+
+
+def stack(arrays):
+    """List array 1-D (panjang boleh beda) -> matriks (n_series, max_len), sisa diisi NaN."""
+    arrays = [np.asarray(a, dtype=np.float64).reshape(-1) for a in arrays]
+    out = np.full((len(arrays), max((len(a) for a in arrays), default=0)), np.nan)
+    for i, a in enumerate(arrays):
+        out[i, :len(a)] = a
+    return out
+
+
+def metrics(y_true, y_pred):
+    """MAE, RMSE, MAPE per baris dari matriks (n_series, n); NaN = bukan data.
+
+    Return dict {"mae", "rmse", "mape"} berisi array (n_series,).
+    MAPE hanya dihitung atas target != 0 (NaN bila tidak ada).
+    """
+    y_true = np.atleast_2d(np.asarray(y_true, dtype=np.float64))
+    y_pred = np.atleast_2d(np.asarray(y_pred, dtype=np.float64))
+    err = y_pred - y_true
+    valid = ~np.isnan(err)
+    abs_err = np.where(valid, np.abs(err), 0.0)
+    nonzero = valid & (y_true != 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = valid.sum(axis=1)
+        mae = abs_err.sum(axis=1) / n
+        rmse = np.sqrt((abs_err ** 2).sum(axis=1) / n)
+        ape = np.where(nonzero, abs_err / np.abs(np.where(nonzero, y_true, 1.0)), 0.0)
+        mape = ape.sum(axis=1) / nonzero.sum(axis=1)
+    return {"mae": mae, "rmse": rmse, "mape": mape}
@@ -0,0 +1,196 @@
+# feature_store.py
+# --------------------------------------------------
+# Feature store konsolidasi untuk seluruh feeder/kategori.
+# Menggantikan ribuan file .npz + _scaler.pkl per feeder dengan:
+#   data/store/X.npy      -> semua window (total, window, 1), uncompressed
+#   data/store/y.npy      -> semua target (total,)
+#   data/store/index.csv  -> feeder, kategori, offset, length, window,
+#                            data_min, data_max, n_samples_seen
+# X.npy & y.npy dibuka dengan mmap, sehingga membaca 1 feeder hanya
+# menyentuh slice miliknya (tanpa dekompresi seluruh file).
+#
+# Update harian (update_store): append-only. Hanya dataset feeder yang
+# berubah ditulis ke ujung X.npy/y.npy (header .npy diperbarui in-place),
+# lalu index.csv ditulis ulang dengan offset baru; slice lama menjadi
+# ruang mati. Store ditulis ulang penuh (compaction) hanya bila ruang
+# mati > separuh file, window berubah, atau store belum ada.
+# --------------------------------------------------
+
+import io
+import os
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+STORE_DIR = os.path.join('data', 'store')
+INDEX_NAME = 'index.csv'
+INDEX_COLUMNS = ['feeder', 'kategori', 'offset', 'length', 'window',
+                 'data_min', 'data_max', 'n_samples_seen']
+
+
+def scaler_from_params(data_min, data_max, n_samples_seen=None):
+    """Bangun ulang MinMaxScaler (feature_range 0-1) dari data_min_/data_max_."""
+    scaler = MinMaxScaler()
+    scaler.fit(np.array([[data_min], [data_max]], dtype=float))
+    if n_samples_seen is not None:
+        scaler.n_samples_seen_ = int(n_samples_seen)
+    return scaler
+
+
+class FeatureStore:
+    """Pembaca store (read-only, mmap)."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        index = pd.read_csv(os.path.join(store_dir, INDEX_NAME), dtype={'feeder': str, 'kategori': str},
+                            float_precision='round_trip')
+        self.index = {(r.feeder, r.kategori): r for r in index.itertuples(index=False)}
+        self.X = np.load(os.path.join(store_dir, 'X.npy'), mmap_mode='r')
+        self.y = np.load(os.path.join(store_dir, 'y.npy'), mmap_mode='r')
+
+    @property
+    def window(self):
+        return int(self.X.shape[1]) if self.X.ndim == 3 else None
+
+    @staticmethod
+    def exists(store_dir=STORE_DIR):
+        return os.path.exists(os.path.join(store_dir, INDEX_NAME))
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def keys(self):
+        return sorted(self.index)
+
+    def get(self, feeder, kategori):
+        """(X, y) sebagai view mmap; tidak ada data yang disalin."""
+        r = self.index[(feeder, kategori)]
+        sl = slice(r.offset, r.offset + r.length)
+        return self.X[sl], self.y[sl]
+
+    def params(self, feeder, kategori):
+        r = self.index[(feeder, kategori)]
+        return float(r.data_min), float(r.data_max), int(r.n_samples_seen)
+
+    def scaler(self, feeder, kategori):
+        return scaler_from_params(*self.params(feeder, kategori))
+
+
+_open_stores = {}
+
+
+def open_store(store_dir=STORE_DIR):
+    """FeatureStore ter-cache per proses; dibuka ulang bila index.csv berubah."""
+    mtime = os.stat(os.path.join(store_dir, INDEX_NAME)).st_mtime_ns
+    cached = _open_stores.get(store_dir)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, FeatureStore(store_dir))
+        _open_stores[store_dir] = cached
+    return cached[1]
+
+
+def write_store(entries, window, store_dir=STORE_DIR):
+    """Tulis store baru dari list (feeder, kategori, X, y, data_min, data_max, n_samples_seen).
+
+    File ditulis ke *.tmp lalu di-rename (index.csv paling akhir). Pembaca
+    yang sudah membuka store lama tetap memegang mmap atas file lama.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    total = sum(len(e[2]) for e in entries)
+    x_tmp = os.path.join(store_dir, 'X.npy.tmp')
+    y_tmp = os.path.join(store_dir, 'y.npy.tmp')
+    X_all = np.lib.format.open_memmap(x_tmp, mode='w+', dtype=np.float64, shape=(total, window, 1))
+    y_all = np.lib.format.open_memmap(y_tmp, mode='w+', dtype=np.float64, shape=(total,))
+
+    rows = []
+    offset = 0
+    for feeder, kategori, X, y, data_min, data_max, n_seen in entries:
+        n = len(X)
+        X_all[offset:offset + n] = X
+        y_all[offset:offset + n] = y
+        rows.append((feeder, kategori, offset, n, window, data_min, data_max, n_seen))
+        offset += n
+    X_all.flush()
+    y_all.flush()
+    del X_all, y_all
+
+    index_tmp = os.path.join(store_dir, INDEX_NAME + '.tmp')
+    pd.DataFrame(rows, columns=INDEX_COLUMNS).to_csv(index_tmp, index=False, float_format='%.17g')
+    os.replace(x_tmp, os.path.join(store_dir, 'X.npy'))
+    os.replace(y_tmp, os.path.join(store_dir, 'y.npy'))
+    os.replace(index_tmp, os.path.join(store_dir, INDEX_NAME))
+    return total
+
+
+def _grown_header(path, n_new):
+    """(byte akhir data, header baru dengan axis 0 + n_new) untuk file .npy.
+
+    None bila header baru tidak muat di ruang header lama (append tidak bisa in-place).
+    """
+    fmt = np.lib.format
+    with open(path, 'rb') as f:
+        version = fmt.read_magic(f)
+        read_header = fmt.read_array_header_1_0 if version == (1, 0) else fmt.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        data_start = f.tell()
+    header = io.BytesIO()
+    write_header = fmt.write_array_header_1_0 if version == (1, 0) else fmt.write_array_header_2_0
+    write_header(header, {'descr': fmt.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                          'shape': (shape[0] + n_new,) + shape[1:]})
+    if fortran_order or header.tell() != data_start:
+        return None
+    return data_start + int(np.prod(shape)) * dtype.itemsize, header.getvalue()
+
+
+def _append_npy(path, data_end, header, arrays):
+    """Tulis arrays di data_end (sisa append yang gagal dipotong), lalu header baru."""
+    with open(path, 'r+b') as f:
+        f.seek(data_end)
+        for a in arrays:
+            np.ascontiguousarray(a, dtype=np.float64).tofile(f)
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        f.write(header)
+
+
+def update_store(changed, keep, window, store_dir=STORE_DIR):
+    """Perbarui store tanpa menulis ulang dataset yang tidak berubah.
+
+    changed: list (feeder, kategori, X, y, data_min, data_max, n_samples_seen)
+             dataset baru / berubah -> di-append ke ujung X.npy & y.npy
+    keep   : list (feeder, kategori) yang slice lamanya tetap dipakai
+    Key lama yang tidak ada di changed/keep dibuang dari index.
+    Return (jumlah sampel aktif, True bila store ditulis ulang penuh).
+    """
+    old = FeatureStore(store_dir) if FeatureStore.exists(store_dir) else None
+    n_new = sum(len(e[2]) for e in changed)
+    live = n_new + (sum(int(old.index[k].length) for k in keep) if old is not None else 0)
+    headers = None
+    if old is not None and old.window in (None, window) and 2 * live > len(old.y) + n_new:
+        headers = (_grown_header(os.path.join(store_dir, 'X.npy'), n_new),
+                   _grown_header(os.path.join(store_dir, 'y.npy'), n_new))
+
+    if headers is None or None in headers:
+        # Compaction: store baru berisi dataset aktif saja
+        entries = [(f, k, *old.get(f, k), *old.params(f, k)) for f, k in keep] if old is not None else []
+        entries = sorted(entries + list(changed), key=lambda e: (e[0], e[1]))
+        return write_store(entries, window, store_dir), True
+
+    rows = [(f, k, int(r.offset), int(r.length), window, r.data_min, r.data_max, int(r.n_samples_seen))
+            for f, k in keep for r in [old.index[(f, k)]]]
+    offset = len(old.y)
+    for feeder, kategori, X, y, data_min, data_max, n_seen in changed:
+        rows.append((feeder, kategori, offset, len(X), window, data_min, data_max, n_seen))
+        offset += len(X)
+    del old  # lepas mmap sebelum file diperpanjang
+    (x_end, x_header), (y_end, y_header) = headers
+    _append_npy(os.path.join(store_dir, 'X.npy'), x_end, x_header, [e[2] for e in changed])
+    _append_npy(os.path.join(store_dir, 'y.npy'), y_end, y_header, [e[3] for e in changed])
+
+    index_tmp = os.path.join(store_dir, INDEX_NAME + '.tmp')
+    rows.sort(key=lambda r: (r[0], r[1]))
+    pd.DataFrame(rows, columns=INDEX_COLUMNS).to_csv(index_tmp, index=False, float_format='%.17g')
+    os.replace(index_tmp, os.path.join(store_dir, INDEX_NAME))
+    return live, False
@@ -0,0 +1,181 @@
+# forecast_archive.py
+# --------------------------------------------------
+# Arsip histori prediksi H+1, append-only, dipartisi per tanggal forecast:
+#
+# results/archive/date=YYYY-MM-DD/forecasts.csv
+#   Penyulang, Kategori, Tanggal, Forecast (A), Actual (A), Model,
+#   Model_Version, Run
+#
+# - predict_next_all.py mengarsipkan tiap run (archive_run); forecast
+#   ulang tanggal yang sama dari run lain = baris baru (Run berbeda)
+# - Actual (A) diisi belakangan (backfill_actuals) setelah data mentah
+#   tanggal tsb masuk preprocessing (last_date di manifest >= Tanggal)
+# - Query memilih partisi dari nama folder dulu, hanya file dalam
+#   rentang tanggal yang dibaca ("semua feeder tanggal D" = 1 file,
+#   "1 feeder 90 hari terakhir" = 90 file kecil, bukan seluruh arsip)
+# --------------------------------------------------
+
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from utils.evaluation import metrics, stack
+from utils.load_dataset import last_date
+
+ARCHIVE_DIR = os.path.join("results", "archive")
+PARTITION_FILE = "forecasts.csv"
+COLUMNS = ["Penyulang", "Kategori", "Tanggal", "Forecast (A)", "Actual (A)",
+           "Model", "Model_Version", "Run"]
+KEY = ["Penyulang", "Kategori", "Tanggal"]
+
+
+def partition_path(date, archive_dir=ARCHIVE_DIR):
+    """Path partisi tanggal (str 'YYYY-MM-DD' atau date/datetime)."""
+    if not isinstance(date, str):
+        date = date.strftime("%Y-%m-%d")
+    return os.path.join(archive_dir, f"date={date}", PARTITION_FILE)
+
+
+def list_dates(archive_dir=ARCHIVE_DIR):
+    """Tanggal partisi yang ada ('YYYY-MM-DD'), terurut."""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(d[len("date="):] for d in os.listdir(archive_dir)
+                  if d.startswith("date=") and os.path.exists(os.path.join(archive_dir, d, PARTITION_FILE)))
+
+
+def model_version(model_path):
+    """Versi model = waktu modifikasi file .keras (YYYYMMDD_HHMMSS), None bila tidak ada."""
+    if not os.path.exists(model_path):
+        return None
+    return datetime.fromtimestamp(os.stat(model_path).st_mtime).strftime("%Y%m%d_%H%M%S")
+
+
+def archive_run(df, archive_dir=ARCHIVE_DIR):
+    """Append tabel run (utils/next_results.py) ke partisi tanggalnya; return jumlah baris.
+
+    Kolom Model_Version dipakai bila ada; Actual (A) dikosongkan.
+    """
+    out = pd.DataFrame({
+        "Penyulang": df["Penyulang"].values,
+        "Kategori": df["Kategori"].values,
+        "Tanggal": df["Tanggal"].values,
+        "Forecast (A)": df["Beban (A)"].values,
+        "Actual (A)": np.nan,
+        "Model": df["Model"].values,
+        "Model_Version": df["Model_Version"].values if "Model_Version" in df else None,
+        "Run": df["Run"].astype(str).values,
+    })
+    for date, part in out.groupby("Tanggal", sort=True):
+        path = partition_path(date, archive_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    return len(out)
+
+
+def read_partition(date, archive_dir=ARCHIVE_DIR):
+    path = partition_path(date, archive_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.read_csv(path, dtype={"Run": str, "Model_Version": str})
+
+
+def query(start=None, end=None, feeder=None, kategori=None, latest=True, archive_dir=ARCHIVE_DIR):
+    """Baris arsip dalam rentang tanggal [start, end] (inklusif, 'YYYY-MM-DD').
+
+    Partisi di luar rentang tidak dibaca. latest=True: hanya forecast
+    dari run terakhir per (Penyulang, Kategori, Tanggal).
+    """
+    dates = [d for d in list_dates(archive_dir)
+             if (start is None or d >= str(start)) and (end is None or d <= str(end))]
+    parts = []
+    for date in dates:
+        part = read_partition(date, archive_dir)
+        if feeder is not None:
+            part = part[part["Penyulang"] == feeder]
+        if kategori is not None:
+            part = part[part["Kategori"] == kategori]
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    df = pd.concat(parts, ignore_index=True)
+    if latest:
+        df = df.sort_values("Run", kind="stable").drop_duplicates(KEY, keep="last")
+    return df.sort_values(KEY).reset_index(drop=True)
+
+
+def for_date(date, archive_dir=ARCHIVE_DIR):
+    """Semua feeder untuk 1 tanggal forecast (1 partisi)."""
+    return query(date, date, archive_dir=archive_dir)
+
+
+def feeder_history(feeder, days=90, kategori=None, end=None, archive_dir=ARCHIVE_DIR):
+    """1 feeder selama `days` hari terakhir s.d. `end` (default: partisi terbaru)."""
+    if end is None:
+        dates = list_dates(archive_dir)
+        if not dates:
+            return pd.DataFrame(columns=COLUMNS)
+        end = dates[-1]
+    start = (datetime.strptime(str(end), "%Y-%m-%d") - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    return query(start, end, feeder=feeder, kategori=kategori, archive_dir=archive_dir)
+
+
+def read_actuals(feeder, raw_dir=os.path.join("data", "raw")):
+    """{(kategori, 'YYYY-MM-DD'): beban} dari CSV mentah (baris 'fail'/0/NaN diabaikan)."""
+    df = pd.read_csv(os.path.join(raw_dir, f"{feeder}.csv"), usecols=["Tanggal", "Waktu", "Beban"])
+    beban = pd.to_numeric(df["Beban"], errors="coerce")
+    tanggal = pd.to_datetime(df["Tanggal"], format="%m/%d/%Y", errors="coerce").dt.strftime("%Y-%m-%d")
+    ok = beban.notna() & (beban != 0) & tanggal.notna()
+    return dict(zip(zip(df["Waktu"][ok], tanggal[ok]), beban[ok]))
+
+
+def backfill_actuals(days=30, archive_dir=ARCHIVE_DIR, raw_dir=os.path.join("data", "raw")):
+    """Isi Actual (A) yang masih kosong bila data tanggal tsb sudah ada di manifest.
+
+    Hanya `days` partisi terbaru yang diperiksa; hanya partisi yang berubah
+    yang ditulis ulang, dan hanya CSV mentah feeder yang bersangkutan yang
+    dibaca (1x per feeder). Return jumlah baris yang terisi.
+    """
+    actuals = {}
+    filled = 0
+    for date in list_dates(archive_dir)[-days:]:
+        part = read_partition(date, archive_dir)
+        missing = part["Actual (A)"].isna()
+        if not missing.any():
+            continue
+        known = np.array([(last_date(f, k) or datetime.min).strftime("%Y-%m-%d") >= date
+                          for f, k in zip(part["Penyulang"], part["Kategori"])], dtype=bool)
+        todo = missing.values & known
+        if not todo.any():
+            continue
+        values = []
+        for feeder, kategori in zip(part["Penyulang"][todo], part["Kategori"][todo]):
+            if feeder not in actuals:
+                try:
+                    actuals[feeder] = read_actuals(feeder, raw_dir)
+                except (OSError, ValueError):
+                    actuals[feeder] = {}
+            values.append(actuals[feeder].get((kategori, date), np.nan))
+        part.loc[todo, "Actual (A)"] = values
+        n = int(np.isfinite(values).sum())
+        if n:
+            part.to_csv(partition_path(date, archive_dir), index=False)
+            filled += n
+    return filled
+
+
+def accuracy(df):
+    """MAE / RMSE / MAPE forecast vs actual per (Penyulang, Kategori) atas baris ber-Actual."""
+    df = df.dropna(subset=["Actual (A)"])
+    groups = list(df.groupby(["Penyulang", "Kategori"], sort=True))
+    if not groups:
+        return pd.DataFrame(columns=["Penyulang", "Kategori", "n", "mae", "rmse", "mape"])
+    score = metrics(stack([g["Actual (A)"] for _, g in groups]),
+                    stack([g["Forecast (A)"] for _, g in groups]))
+    return pd.DataFrame({
+        "Penyulang": [f for (f, _), _ in groups],
+        "Kategori": [k for (_, k), _ in groups],
+        "n": [len(g) for _, g in groups],
+        **score,
+    })
@@ -0,0 +1,64 @@
+# global_model.py
+# --------------------------------------------------
+# Helper model global multi-feeder (lihat scripts/train_global.py).
+# 1 model untuk semua pasangan feeder/kategori; identitas deret
+# diberikan lewat input integer `series_id` (embedding).
+# Artefak:
+#   models/global/global.keras       -> model
+#   models/global/global_index.json  -> {"window": w, "series": [feeder_kategori, ...]}
+#                                       posisi di list = series_id
+# --------------------------------------------------
+
+import os
+import json
+import numpy as np
+
+from utils.model_cache import get_model
+
+GLOBAL_DIR = os.path.join('models', 'global')
+MODEL_PATH = os.path.join(GLOBAL_DIR, 'global.keras')
+INDEX_PATH = os.path.join(GLOBAL_DIR, 'global_index.json')
+
+_index_cache = (None, None)
+
+
+def series_key(feeder, kategori):
+    return f"{feeder}_{kategori}"
+
+
+def global_available():
+    return os.path.exists(MODEL_PATH) and os.path.exists(INDEX_PATH)
+
+
+def save_index(keys, window):
+    os.makedirs(GLOBAL_DIR, exist_ok=True)
+    with open(INDEX_PATH, "w") as f:
+        json.dump({"window": window, "series": list(keys)}, f, indent=1)
+
+
+def load_index():
+    """{feeder_kategori: series_id} dari global_index.json (ter-cache per mtime)."""
+    global _index_cache
+    mtime = os.stat(INDEX_PATH).st_mtime_ns
+    if _index_cache[0] != mtime:
+        with open(INDEX_PATH) as f:
+            index = json.load(f)
+        _index_cache = (mtime, {key: i for i, key in enumerate(index["series"])})
+    return _index_cache[1]
+
+
+def load_global():
+    """(model, index) model global, lewat cache model bersama (utils/model_cache.py)."""
+    return get_model(MODEL_PATH), load_index()
+
+
+def series_id(index, feeder, kategori):
+    key = series_key(feeder, kategori)
+    if key not in index:
+        raise KeyError(f"{key} tidak ada di model global (latih ulang train_global.py)")
+    return index[key]
+
+
+def global_inputs(X, sid):
+    """Input model global untuk window X milik 1 deret."""
+    return [np.asarray(X), np.full(len(X), sid, dtype=np.int32)]
@@ -0,0 +1,108 @@
+# load_dataset.py
+# --------------------------------------------------
+# Satu pintu akses dataset hasil preprocessing, apa pun format
+# penyimpanannya (dicatat preprocess.py di data/metadata/manifest.json):
+# - npz   : data/npz/{feeder}_{kategori}.npz + data/metadata/*_scaler.pkl
+# - store : feature store konsolidasi di data/store/ (mmap)
+# - npy   : data/npy/{feeder}_{kategori}.npy (deret 1-D, mmap) +
+#           data/metadata/*_scaler.pkl; X = view strided saat dibaca
+# Waktu baca dicatat di utils/profiling.py (load_dataset, load_scaler).
+# --------------------------------------------------
+
+import os
+import json
+import joblib
+import numpy as np
+from datetime import datetime
+
+from utils import profiling
+from utils.feature_store import STORE_DIR, open_store
+from utils.windowing import DEFAULT_WINDOW, make_windows
+
+NPZ_DIR = os.path.join('data', 'npz')
+NPY_DIR = os.path.join('data', 'npy')
+META_DIR = os.path.join('data', 'metadata')
+MANIFEST_PATH = os.path.join(META_DIR, 'manifest.json')
+
+_manifest_cache = (None, {})
+
+
+def load_manifest():
+    """Manifest preprocessing (ter-cache, dibaca ulang bila file berubah)."""
+    global _manifest_cache
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    if _manifest_cache[0] != mtime:
+        with open(MANIFEST_PATH) as f:
+            _manifest_cache = (mtime, json.load(f))
+    return _manifest_cache[1]
+
+
+def storage_format():
+    return load_manifest().get("format", "npz")
+
+
+def window_size():
+    return load_manifest().get("window") or DEFAULT_WINDOW
+
+
+def list_datasets():
+    """Daftar (feeder, kategori) yang tersedia, terurut."""
+    if storage_format() == "store":
+        return open_store(STORE_DIR).keys()
+    data_dir, ext = (NPY_DIR, '.npy') if storage_format() == "npy" else (NPZ_DIR, '.npz')
+    if not os.path.isdir(data_dir):
+        return []
+    names = sorted(f[:-len(ext)] for f in os.listdir(data_dir) if f.endswith(ext))
+    return [tuple(name.rsplit('_', 1)) for name in names]
+
+
+def has_dataset(feeder, kategori):
+    if storage_format() == "store":
+        return (feeder, kategori) in open_store(STORE_DIR)
+    basename = f"{feeder}_{kategori}"
+    data_path = (os.path.join(NPY_DIR, f"{basename}.npy") if storage_format() == "npy"
+                 else os.path.join(NPZ_DIR, f"{basename}.npz"))
+    return (os.path.exists(data_path)
+            and os.path.exists(os.path.join(META_DIR, f"{basename}_scaler.pkl")))
+
+
+def load_dataset(feeder, kategori):
+    """Kembalikan (X, y) untuk 1 feeder/kategori."""
+    with profiling.timer("load_dataset"):
+        if storage_format() == "store":
+            return open_store(STORE_DIR).get(feeder, kategori)
+        if storage_format() == "npy":
+            return make_windows(load_series(feeder, kategori), window_size())
+        with np.load(os.path.join(NPZ_DIR, f"{feeder}_{kategori}.npz")) as data:
+            return data['X'], data['y']
+
+
+def load_series(feeder, kategori):
+    """Deret 1-D hasil scaling untuk format apa pun.
+
+    npy: dibaca langsung (mmap, read-only). npz/store: disusun ulang dari
+    window tersimpan, series = X[0] + y (window saling tumpang-tindih).
+    """
+    if storage_format() == "npy":
+        return np.load(os.path.join(NPY_DIR, f"{feeder}_{kategori}.npy"), mmap_mode='r')
+    X, y = load_dataset(feeder, kategori)
+    if len(X) == 0:
+        return np.asarray(y)
+    return np.concatenate([X[0, :, 0], y])
+
+
+def load_scaler(feeder, kategori):
+    """MinMaxScaler yang dipakai saat preprocessing feeder/kategori ini."""
+    with profiling.timer("load_scaler"):
+        if storage_format() == "store":
+            return open_store(STORE_DIR).scaler(feeder, kategori)
+        return joblib.load(os.path.join(META_DIR, f"{feeder}_{kategori}_scaler.pkl"))
+
+
+def last_date(feeder, kategori):
+    """Tanggal data terakhir (datetime) yang dicatat manifest, atau None bila belum ada."""
+    entry = load_manifest().get("feeders", {}).get(feeder) or {}
+    date = entry.get("kategori", {}).get(kategori, {}).get("last_date")
+    return datetime.strptime(date, '%Y-%m-%d') if date else None
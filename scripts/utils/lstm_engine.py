@@ -0,0 +1,250 @@
+# lstm_engine.py
+# --------------------------------------------------
+# Inference LSTM + Dense murni NumPy (tanpa TensorFlow) untuk model
+# models/single/*.keras (Sequential: LSTM(units) -> Dense).
+#
+# - Bobot dibaca langsung dari arsip .keras (config.json + model.weights.h5)
+#   lalu dikumpulkan ke 1 weight pack: models/pack/single.npz
+#   Wx (M, D, 4U), Wh (M, U, 4U), b (M, 4U), Wd (M, U, K), bd (M, K)
+#   Pack dibangun ulang inkremental: hanya model yang mtime/size-nya
+#   berubah yang dibaca ulang dari .keras.
+# - Units berbeda (model hasil tuning) di-pad nol sampai U terbesar per gate;
+#   unit nol tetap h = c = 0 sehingga hasilnya identik.
+# - Urutan gate Keras: i, f, c, o; recurrent_activation sigmoid, activation tanh.
+# - forward(): semua feeder sekaligus, 1 batched matmul per timestep
+#   (baris ke-n memakai bobot model rows[n]).
+# - Waktu forward / build pack dicatat di utils/profiling.py
+#   (predict_engine, build_pack).
+# --------------------------------------------------
+
+import io
+import os
+import json
+import zipfile
+import numpy as np
+
+from utils import profiling
+
+MODEL_DIR = os.path.join('models', 'single')
+PACK_PATH = os.path.join('models', 'pack', 'single.npz')
+GATES = 4  # i, f, c, o
+CHUNK = 1024
+
+_pack_cache = {}
+
+
+class UnsupportedModel(ValueError):
+    """Arsitektur .keras di luar LSTM -> Dense standar (pakai Keras)."""
+
+
+def read_keras(path):
+    """Bobot LSTM + Dense dari arsip .keras tanpa membangun graph TensorFlow."""
+    import h5py
+
+    with zipfile.ZipFile(path) as zf:
+        config = json.loads(zf.read("config.json"))
+        weights = zf.read("model.weights.h5")
+
+    layers = [l for l in config["config"]["layers"] if l["class_name"] != "InputLayer"]
+    if config["class_name"] != "Sequential" or [l["class_name"] for l in layers] != ["LSTM", "Dense"]:
+        raise UnsupportedModel(f"arsitektur {config['class_name']} {[l['class_name'] for l in layers]}")
+    lstm, dense = layers[0]["config"], layers[1]["config"]
+    expected = {"activation": "tanh", "recurrent_activation": "sigmoid", "use_bias": True,
+                "return_sequences": False, "go_backwards": False, "stateful": False}
+    for key, value in expected.items():
+        if lstm.get(key, value) != value:
+            raise UnsupportedModel(f"LSTM {key}={lstm.get(key)}")
+    if dense.get("activation") != "linear":
+        raise UnsupportedModel(f"Dense activation={dense.get('activation')}")
+
+    with h5py.File(io.BytesIO(weights), "r") as h5:
+        cell = h5["layers/lstm/cell/vars"]
+        out = h5["layers/dense/vars"]
+        return {
+            "kernel": cell["0"][()],                                   # (D, 4u)
+            "recurrent": cell["1"][()],                                # (u, 4u)
+            "bias": cell["2"][()],                                     # (4u,)
+            "dense_w": out["0"][()],                                   # (u, K)
+            "dense_b": out["1"][()] if dense.get("use_bias", True) else np.zeros(dense["units"]),
+        }
+
+
+def _pad_gates(w, units, max_units):
+    """(..., 4u) -> (..., 4U): tiap blok gate di-pad nol sendiri-sendiri."""
+    blocks = w.reshape(w.shape[:-1] + (GATES, units))
+    pad = [(0, 0)] * (blocks.ndim - 1) + [(0, max_units - units)]
+    return np.pad(blocks, pad).reshape(w.shape[:-1] + (GATES * max_units,))
+
+
+class WeightPack:
+    """Bobot M model dalam array bertumpuk + index nama model -> baris."""
+
+    ARRAYS = ("units", "Wx", "Wh", "b", "Wd", "bd")
+
+    def __init__(self, keys, signatures, arrays):
+        self.keys = list(keys)
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        self.signatures = np.asarray(signatures, dtype=np.int64).reshape(-1, 2)
+        self.units, self.Wx, self.Wh, self.b, self.Wd, self.bd = (arrays[k] for k in self.ARRAYS)
+
+    @classmethod
+    def from_weights(cls, keys, signatures, weights):
+        units = [w["recurrent"].shape[0] for w in weights]
+        U = max(units, default=0)
+        D = max((w["kernel"].shape[0] for w in weights), default=1)
+        K = max((w["dense_w"].shape[1] for w in weights), default=1)
+        M = len(weights)
+        arrays = {"units": np.array(units, dtype=np.int64), "Wx": np.zeros((M, D, GATES * U), np.float32), "Wh": np.zeros((M, U, GATES * U), np.float32),
+                  "b": np.zeros((M, GATES * U), np.float32), "Wd": np.zeros((M, U, K), np.float32),
+                  "bd": np.zeros((M, K), np.float32)}
+        for m, (w, u) in enumerate(zip(weights, units)):
+            d, k = w["kernel"].shape[0], w["dense_w"].shape[1]
+            arrays["Wx"][m, :d] = _pad_gates(w["kernel"], u, U)
+            arrays["Wh"][m, :u] = _pad_gates(w["recurrent"], u, U)
+            arrays["b"][m] = _pad_gates(w["bias"], u, U)
+            arrays["Wd"][m, :u, :k] = w["dense_w"]
+            arrays["bd"][m, :k] = w["dense_b"]
+        return cls(keys, signatures, arrays)
+
+    def weights(self, i, padded=True):
+        """Bobot model ke-i dalam format read_keras() (padded=False: ukuran asli)."""
+        w = {"kernel": self.Wx[i], "recurrent": self.Wh[i], "bias": self.b[i],
+             "dense_w": self.Wd[i], "dense_b": self.bd[i]}
+        if padded:
+            return w
+        u, U = int(self.units[i]), self.Wh.shape[1]
+        unpad = lambda a: a.reshape(a.shape[:-1] + (GATES, U))[..., :u].reshape(a.shape[:-1] + (GATES * u,))
+        return {"kernel": unpad(w["kernel"]), "recurrent": unpad(w["recurrent"][:u]), "bias": unpad(w["bias"]),
+                "dense_w": w["dense_w"][:u], "dense_b": w["dense_b"]}
+
+    def rows(self, keys):
+        """Indeks baris untuk list nama model (KeyError bila tidak ada di pack)."""
+        return np.array([self.index[k] for k in keys], dtype=np.int64)
+
+    def save(self, path=PACK_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, keys=np.array(self.keys, dtype=str), signatures=self.signatures,
+                 **{k: getattr(self, k) for k in self.ARRAYS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=PACK_PATH):
+        with np.load(path) as data:
+            return cls(data["keys"].tolist(), data["signatures"], {k: data[k] for k in cls.ARRAYS})
+
+    def forward(self, rows, X):
+        """Prediksi (n, K) untuk X (n, T, D); baris ke-n memakai model rows[n]."""
+        with profiling.timer("predict_engine"):
+            return self._forward(rows, X)
+
+    def _forward(self, rows, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        if len(rows) == 1 and len(X) > 1:
+            rows = np.repeat(rows, len(X))
+        if len(X) and np.all(rows == rows[0]):
+            return _forward_one(self.weights(rows[0]), X)
+        out = np.empty((len(X), self.Wd.shape[2]), np.float32)
+        for s in range(0, len(X), CHUNK):
+            r = rows[s:s + CHUNK]
+            out[s:s + CHUNK] = _forward_many(self.Wx[r], self.Wh[r], self.b[r], self.Wd[r], self.bd[r], X[s:s + CHUNK])
+        return out
+
+    def predict(self, key, X):
+        """Semua window X dengan 1 model -> (n,)."""
+        return self.forward([self.index[key]], X)[:, 0]
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _step(z, c):
+    """1 langkah sel LSTM dari pre-aktivasi z (n, 4U), gate i, f, c, o."""
+    i, f, g, o = np.split(z, GATES, axis=1)
+    c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+    return _sigmoid(o) * np.tanh(c), c
+
+
+def _forward_one(w, X):
+    """1 model, banyak window: matmul biasa."""
+    n, T, D = X.shape
+    U = w["recurrent"].shape[0]
+    h = np.zeros((n, U), np.float32)
+    c = np.zeros((n, U), np.float32)
+    xz = X @ w["kernel"][:D] + w["bias"]  # (n, T, 4U), input semua timestep sekaligus
+    for t in range(T):
+        h, c = _step(xz[:, t] + h @ w["recurrent"], c)
+    return h @ w["dense_w"] + w["dense_b"]
+
+
+def _forward_many(Wx, Wh, b, Wd, bd, X):
+    """Tiap baris model berbeda: batched matmul dengan bobot yang sudah di-gather."""
+    n, T, D = X.shape
+    U = Wh.shape[1]
+    h = np.zeros((n, U), np.float32)
+    c = np.zeros((n, U), np.float32)
+    xz = np.matmul(X, Wx[:, :D]) + b[:, None, :]  # (n, T, 4U)
+    for t in range(T):
+        h, c = _step(xz[:, t] + np.matmul(h[:, None, :], Wh)[:, 0], c)
+    return np.matmul(h[:, None, :], Wd)[:, 0] + bd
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def build_pack(model_dir=MODEL_DIR, pack_path=PACK_PATH, log=None):
+    """Pack semua .keras di model_dir; model yang tidak berubah diambil dari pack lama.
+
+    Model dengan arsitektur lain dilewati (tidak masuk pack).
+    """
+    files = sorted(f for f in os.listdir(model_dir) if f.endswith(".keras")) if os.path.isdir(model_dir) else []
+    try:
+        old = WeightPack.load(pack_path) if os.path.exists(pack_path) else None
+    except (KeyError, ValueError, OSError):
+        old = None  # pack lama rusak / format lama -> bangun ulang penuh
+    keys, sigs, weights, changed = [], [], [], 0
+    for f in files:
+        key = f[:-len(".keras")]
+        sig = _signature(os.path.join(model_dir, f))
+        i = old.index.get(key) if old is not None else None
+        if i is not None and tuple(old.signatures[i]) == sig:
+            w = old.weights(i, padded=False)
+        else:
+            try:
+                w = read_keras(os.path.join(model_dir, f))
+            except (UnsupportedModel, KeyError, OSError) as e:
+                if log:
+                    log(f"⚠️  {f} tidak bisa masuk weight pack: {e}")
+                continue
+            changed += 1
+        keys.append(key)
+        sigs.append(sig)
+        weights.append(w)
+    if old is not None and not changed and keys == old.keys:
+        return old
+    pack = WeightPack.from_weights(keys, sigs, weights)
+    pack.save(pack_path)
+    return pack
+
+
+def load_pack(model_dir=MODEL_DIR, pack_path=PACK_PATH, log=None):
+    """Weight pack terbaru (ter-cache per proses, dibangun ulang bila ada .keras yang berubah)."""
+    state = _dir_state(model_dir)
+    cached = _pack_cache.get(pack_path)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    with profiling.timer("build_pack"):
+        pack = build_pack(model_dir, pack_path, log)
+    _pack_cache[pack_path] = (state, pack)
+    return pack
+
+
+def _dir_state(model_dir):
+    if not os.path.isdir(model_dir):
+        return ()
+    return tuple((f, *_signature(os.path.join(model_dir, f)))
+                 for f in sorted(os.listdir(model_dir)) if f.endswith(".keras"))
@@ -0,0 +1,144 @@
+# model_cache.py
+# --------------------------------------------------
+# Cache model Keras per proses (LRU), dipakai bersama oleh
+# compare.py, predict.py, predict_next.py, validator.py dan model global.
+# - Kunci: path absolut + mtime_ns + size -> file yang ditimpa otomatis
+#   dimuat ulang
+# - Batas memori: LOADPRO_MODEL_CACHE_MB (default 1024 MB) atau
+#   loadpro.py --model-cache-mb, dan LOADPRO_MODEL_CACHE_MAX (default
+#   4096 model); model yang paling lama tidak dipakai dikeluarkan lebih dulu
+# - Estimasi memori per model = bobot + MODEL_OVERHEAD_MB. Bobot LSTM(50)
+#   hanya ~40 KB, tetapi model Keras yang dimuat + fungsi predict yang
+#   sudah di-trace terukur ~5 MB RSS per model (TF 2.15, CPU).
+# - Tradeoff: tahap compare/predict/predict_next memindai semua model
+#   berurutan. Bila fleet tidak muat di cache, LRU mengeluarkan tiap
+#   model sebelum tahap berikutnya memakainya lagi -> 0% hit lintas
+#   tahap (hanya batas memori yang terjaga). Default 1024 MB ~ 200
+#   model; untuk fleet ~2000 model (1000 penyulang x siang/malam)
+#   perlu ~10 GB (--model-cache-mb 10240) agar model dimuat 1x per run.
+# - Statistik: hit, miss, eviction, total waktu load (juga dicatat ke
+#   utils/profiling.py: load_model, model_cache_hit/miss)
+# --------------------------------------------------
+
+import os
+import time
+from collections import OrderedDict
+
+from utils import profiling
+
+DEFAULT_MAX_MB = float(os.environ.get("LOADPRO_MODEL_CACHE_MB", 1024))
+DEFAULT_MAX_MODELS = int(os.environ.get("LOADPRO_MODEL_CACHE_MAX", 4096))
+MODEL_OVERHEAD_MB = 5.0  # graph, layer & fungsi predict ter-trace per model (terukur, lihat header)
+
+
+def model_nbytes(model):
+    """Estimasi memori model = total ukuran bobot + overhead per model."""
+    return sum(w.numpy().nbytes for w in model.weights) + int(MODEL_OVERHEAD_MB * 1024 * 1024)
+
+
+class ModelCache:
+    def __init__(self, max_mb=DEFAULT_MAX_MB, max_models=DEFAULT_MAX_MODELS):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_models = max_models
+        self._models = OrderedDict()  # path -> (signature, model, nbytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.0
+
+    @staticmethod
+    def _signature(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path):
+        """Model dari cache, atau load_model() bila belum ada / file berubah."""
+        key = os.path.abspath(path)
+        sig = self._signature(key)
+        cached = self._models.get(key)
+        if cached is not None and cached[0] == sig:
+            self._models.move_to_end(key)
+            self.hits += 1
+            profiling.count("model_cache_hit")
+            return cached[1]
+
+        load_model = profiling.tf_import().keras.models.load_model
+        self.misses += 1
+        profiling.count("model_cache_miss")
+        self.discard(key)
+        start = time.perf_counter()
+        with profiling.timer("load_model"):
+            model = load_model(key)
+        self.load_time += time.perf_counter() - start
+
+        size = model_nbytes(model)
+        self._models[key] = (sig, model, size)
+        self.nbytes += size
+        self._evict()
+        return model
+
+    def _evict(self):
+        while len(self._models) > 1 and (len(self._models) > self.max_models
+                                         or self.nbytes > self.max_bytes):
+            _, (_, _, size) = self._models.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def discard(self, path):
+        cached = self._models.pop(os.path.abspath(path), None)
+        if cached is not None:
+            self.nbytes -= cached[2]
+
+    def move(self, src, dst):
+        """os.replace(src, dst) dan pindahkan entri cache (mtime & size tetap sama)."""
+        src, dst = os.path.abspath(src), os.path.abspath(dst)
+        os.replace(src, dst)
+        self.discard(dst)
+        cached = self._models.pop(src, None)
+        if cached is not None:
+            self._models[dst] = cached
+
+    def remove(self, path):
+        """os.remove(path) dan buang entrinya dari cache."""
+        os.remove(path)
+        self.discard(path)
+
+    def clear(self):
+        self._models.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        return {
+            "models": len(self._models),
+            "mb": self.nbytes / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "load_time": self.load_time,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"🗃️  Model cache: {s['hits']} hit, {s['misses']} miss, {s['evictions']} eviction, "
+                f"load {s['load_time']:.1f} detik, {s['models']} model ({s['mb']:.1f} MB)")
+
+
+_cache = ModelCache()
+
+
+def get_cache():
+    return _cache
+
+
+def configure(max_mb=None, max_models=None):
+    """Ubah batas cache bersama (model berlebih langsung dikeluarkan)."""
+    if max_mb is not None:
+        _cache.max_bytes = int(max_mb * 1024 * 1024)
+    if max_models is not None:
+        _cache.max_models = max_models
+    _cache._evict()
+
+
+def get_model(path):
+    return _cache.get(path)
@@ -0,0 +1,98 @@
+# next_results.py
+# --------------------------------------------------
+# Tabel hasil prediksi H+1 per run (pengganti 1 file .txt per penyulang
+# yang di-parse ulang oleh summary.py).
+#
+# results/predict_next/run_{run_id}.csv
+#   Run, Penyulang, Kategori, Tanggal (ISO), Beban (A), Model
+#   [+ Beban H+2 (A) .. Beban H+N (A) bila --horizon N]
+#   1 baris per feeder/kategori; predict_next_all --in-process menulis
+#   sekaligus, mode subprocess tiap predict_next.py meng-append 1 baris.
+# run_id = timestamp YYYYMMDD_HHMMSS -> run terbaru = nama terbesar.
+# Teks deskriptif next_{feeder}_{kategori}.txt opsional (render_txt).
+# --------------------------------------------------
+
+import os
+import argparse
+import pandas as pd
+from datetime import datetime, timedelta
+
+RESULT_DIR = os.path.join("results", "predict_next")
+COLUMNS = ["Run", "Penyulang", "Kategori", "Tanggal", "Beban (A)", "Model"]
+
+
+def horizon_column(step):
+    """Kolom beban langkah ke-step (H+1 = "Beban (A)")."""
+    return "Beban (A)" if step == 1 else f"Beban H+{step} (A)"
+
+
+def horizon_arg(value):
+    """Tipe argparse --horizon: bilangan bulat >= 1."""
+    horizon = int(value)
+    if horizon < 1:
+        raise argparse.ArgumentTypeError(f"horizon harus >= 1, bukan {value}")
+    return horizon
+
+
+def horizon_columns(df):
+    """Kolom H+2.. yang ada di df, terurut per langkah."""
+    steps = sorted(int(c[len("Beban H+"):-len(" (A)")]) for c in df.columns
+                   if c.startswith("Beban H+") and c.endswith(" (A)"))
+    return [horizon_column(h) for h in steps]
+
+
+def new_run_id():
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def run_path(run_id, result_dir=RESULT_DIR):
+    return os.path.join(result_dir, f"run_{run_id}.csv")
+
+
+def append_run(df, run_id, result_dir=RESULT_DIR):
+    """Tambahkan baris hasil (kolom COLUMNS tanpa Run [+ horizon]) ke tabel run_id; return path."""
+    os.makedirs(result_dir, exist_ok=True)
+    path = run_path(run_id, result_dir)
+    df = df.assign(Run=run_id)[COLUMNS + horizon_columns(df)]
+    df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    return path
+
+
+def list_runs(result_dir=RESULT_DIR):
+    """run_id yang tersedia, terurut dari yang terlama."""
+    if not os.path.isdir(result_dir):
+        return []
+    return sorted(f[len("run_"):-len(".csv")] for f in os.listdir(result_dir)
+                  if f.startswith("run_") and f.endswith(".csv"))
+
+
+def load_run(run_id=None, result_dir=RESULT_DIR):
+    """Tabel 1 run (default: terbaru) dalam 1 kali baca; DataFrame kosong bila belum ada."""
+    if run_id is None:
+        runs = list_runs(result_dir)
+        if not runs:
+            return pd.DataFrame(columns=COLUMNS)
+        run_id = runs[-1]
+    return pd.read_csv(run_path(run_id, result_dir), dtype={"Run": str})
+
+
+def render_txt(df, result_dir=RESULT_DIR):
+    """Versi teks deskriptif: 1 file next_{feeder}_{kategori}.txt per baris."""
+    os.makedirs(result_dir, exist_ok=True)
+    paths = []
+    steps = horizon_columns(df)
+    for feeder, kategori, tanggal, beban, *ahead in zip(df["Penyulang"], df["Kategori"],
+                                                        df["Tanggal"], df["Beban (A)"], *(df[c] for c in steps)):
+        date = datetime.strptime(tanggal, "%Y-%m-%d")
+        path = os.path.join(result_dir, f"next_{feeder}_{kategori}.txt")
+        with open(path, "w") as f:
+            f.write(f"📈 Hasil Prediksi Beban H+1\n")
+            f.write(f"Penyulang : {feeder}\n")
+            f.write(f"Kategori : {kategori}\n")
+            f.write(f"Tanggal  : {date.strftime('%A, %d %B %Y')}\n")
+            f.write(f"Beban    : {beban:.2f} A\n")
+            for c, value in zip(steps, ahead):
+                h = int(c[len("Beban H+"):-len(" (A)")])
+                f.write(f"H+{h:<7}: {value:.2f} A ({(date + timedelta(days=h - 1)).strftime('%d %B %Y')})\n")
+        paths.append(path)
+    return paths
@@ -0,0 +1,278 @@
+# profiling.py
+# --------------------------------------------------
+# Instrumentasi ringan per proses: timer & counter per tahap dan per feeder.
+# - timer(op): durasi operasi (tf_import, load_dataset, load_model, fit,
+#   predict, ...) dicatat ke (tahap aktif, op, feeder aktif):
+#   count, total, min, max
+# - stage(name) / feeder(key): context yang menandai tahap pipeline /
+#   feeder aktif (contextvars) dan mencatat durasi totalnya (op "total");
+#   @feeder_scope untuk fungsi fn(feeder, kategori, ...)
+# - count(name, n): counter (cache hit/miss, jumlah window, ...)
+# - process_start: waktu sejak proses dibuat s/d instrumentasi aktif
+#   (Linux /proc: start interpreter + import sebelum instrumentasi)
+#
+# Aktif bila LOADPRO_PROFILE di-set (folder output, atau 1 ->
+# logs/profile/{timestamp}); nilainya diteruskan ke proses anak
+# (subprocess, worker pool spawn) sehingga semua report 1 run ada di
+# 1 folder. Nonaktif: timer() = nullcontext, tanpa overhead pencatatan.
+# Report per proses saat exit: {script}_{pid}.json + .csv;
+# merge_reports() menggabungkan semua .csv 1 run -> run_report.csv.
+# LOADPRO_PROFILE_FEEDER=feeder_kategori: cProfile hanya selama feeder
+# tsb aktif -> {script}_{pid}_{feeder}.prof (python -m pstats).
+# --------------------------------------------------
+
+import os
+import sys
+import csv
+import json
+import time
+import atexit
+import functools
+import cProfile
+import contextvars
+import multiprocessing
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+PROFILE_ROOT = os.path.join("logs", "profile")
+COLUMNS = ["script", "pid", "kind", "stage", "operation", "feeder", "count", "total_s", "min_s", "max_s"]
+
+_stage = contextvars.ContextVar("loadpro_stage", default=None)
+_feeder = contextvars.ContextVar("loadpro_feeder", default="")
+_timers = {}    # (stage, op, feeder) -> [count, total, min, max]; stage None = nama script
+_counters = {}  # (stage, name, feeder) -> n
+_out_dir = None
+_profile_feeder = None
+_profiler = None
+_profiling = False
+_NULL = nullcontext()
+_started = datetime.now()
+_t0 = time.perf_counter()
+
+
+def script_name():
+    """Nama script utama (sys.argv[0]); proses worker pool diberi akhiran _worker.
+
+    Worker spawn mewarisi sys.argv induknya; status worker baru diketahui
+    setelah bootstrap multiprocessing, jadi nama dicari saat dibutuhkan.
+    """
+    name = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv else ""))[0]
+    if not name or name.startswith("-"):
+        name = "python"
+    return f"{name}_worker" if multiprocessing.parent_process() is not None else name
+
+
+def _process_age():
+    """Detik sejak proses dibuat (None di luar Linux)."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def enabled():
+    return _out_dir is not None
+
+
+def enable(out_dir=None, profile_feeder=None):
+    """Aktifkan instrumentasi (juga untuk proses anak lewat environment); return folder report."""
+    global _out_dir, _profile_feeder
+    if out_dir in (None, "", "1"):
+        out_dir = os.path.join(PROFILE_ROOT, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.environ["LOADPRO_PROFILE"] = out_dir
+    if profile_feeder:
+        os.environ["LOADPRO_PROFILE_FEEDER"] = profile_feeder
+    _profile_feeder = os.environ.get("LOADPRO_PROFILE_FEEDER") or None
+    if _out_dir is None:
+        atexit.register(write_report)
+        age = _process_age()
+        if age is not None:
+            _record((None, "process_start", ""), age)
+    _out_dir = out_dir
+    return out_dir
+
+
+def _key(op):
+    return _stage.get(), op, _feeder.get()
+
+
+def _record(key, seconds):
+    t = _timers.get(key)
+    if t is None:
+        _timers[key] = [1, seconds, seconds, seconds]
+    else:
+        t[0] += 1
+        t[1] += seconds
+        t[2] = min(t[2], seconds)
+        t[3] = max(t[3], seconds)
+
+
+class _Timer:
+    __slots__ = ("key", "t0")
+
+    def __init__(self, op):
+        self.key = _key(op)
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.key, time.perf_counter() - self.t0)
+
+
+def timer(op):
+    """Context manager: durasi op dicatat ke tahap & feeder yang sedang aktif."""
+    return _Timer(op) if _out_dir is not None else _NULL
+
+
+def count(name, n=1):
+    if _out_dir is not None:
+        key = _key(name)
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def tf_import():
+    """import tensorflow; pertama kali di proses ini dicatat sebagai tf_import."""
+    if "tensorflow" not in sys.modules:
+        with timer("tf_import"):
+            import tensorflow
+    return sys.modules["tensorflow"]
+
+
+@contextmanager
+def stage(name):
+    """Tandai tahap pipeline aktif (loadpro.py); durasi total dicatat sebagai (name, total)."""
+    token = _stage.set(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _out_dir is not None:
+            _record(_key("total"), time.perf_counter() - t0)
+        _stage.reset(token)
+
+
+@contextmanager
+def feeder(key):
+    """Tandai feeder aktif (feeder_kategori); cProfile bila key == LOADPRO_PROFILE_FEEDER."""
+    global _profiler, _profiling
+    if _out_dir is None:
+        yield
+        return
+    token = _feeder.set(key)
+    profile = key == _profile_feeder and not _profiling
+    if profile:
+        _profiler = _profiler or cProfile.Profile()
+        _profiling = True
+        _profiler.enable()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(_key("total"), time.perf_counter() - t0)
+        if profile:
+            _profiler.disable()
+            _profiling = False
+        _feeder.reset(token)
+
+
+def feeder_scope(fn):
+    """Decorator fn(feeder, kategori, ...): seluruh panggilan di dalam feeder("{feeder}_{kategori}")."""
+    @functools.wraps(fn)
+    def wrapper(feeder_name, kategori, *args, **kwargs):
+        with feeder(f"{feeder_name}_{kategori}"):
+            return fn(feeder_name, kategori, *args, **kwargs)
+    return wrapper
+
+
+# --- Report ---
+def rows():
+    """Baris report proses ini (kolom COLUMNS)."""
+    out = []
+    script = script_name()
+    base = {"script": script, "pid": os.getpid()}
+    for (stage_name, op, key), (n, total, lo, hi) in _timers.items():
+        out.append({**base, "kind": "timer", "stage": stage_name or script, "operation": op, "feeder": key,
+                    "count": n, "total_s": round(total, 6), "min_s": round(lo, 6), "max_s": round(hi, 6)})
+    for (stage_name, name, key), n in _counters.items():
+        out.append({**base, "kind": "counter", "stage": stage_name or script, "operation": name, "feeder": key,
+                    "count": n, "total_s": "", "min_s": "", "max_s": ""})
+    return sorted(out, key=lambda r: (r["kind"] == "counter", r["stage"], r["operation"], r["feeder"]))
+
+
+def _totals(rows_, field):
+    """{field: {operation: total_s}} dijumlah lintas kunci lain."""
+    out = {}
+    for r in rows_:
+        if r["kind"] == "timer" and r[field]:
+            group = out.setdefault(r[field], {})
+            group[r["operation"]] = round(group.get(r["operation"], 0.0) + r["total_s"], 6)
+    return out
+
+
+def report():
+    rows_ = rows()
+    return {
+        "script": script_name(),
+        "pid": os.getpid(),
+        "argv": sys.argv,
+        "started": _started.isoformat(timespec="seconds"),
+        "wall_s": round(time.perf_counter() - _t0, 6),
+        "by_stage": _totals(rows_, "stage"),
+        "by_feeder": _totals(rows_, "feeder"),
+        "rows": rows_,
+    }
+
+
+def write_report(out_dir=None):
+    """Tulis {script}_{pid}.json + .csv (+ .prof) ke folder report; return path .json."""
+    out_dir = out_dir or _out_dir
+    if out_dir is None:
+        return None
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = os.path.join(out_dir, f"{script_name()}_{os.getpid()}")
+    data = report()
+    if _profiler is not None:
+        data["cprofile"] = f"{prefix}_{_profile_feeder}.prof"
+        _profiler.dump_stats(data["cprofile"])
+    with open(prefix + ".json", "w") as f:
+        json.dump(data, f, indent=1)
+    with open(prefix + ".csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(data["rows"])
+    return prefix + ".json"
+
+
+def merge_reports(out_dir=None):
+    """Gabungkan semua {script}_{pid}.csv 1 run -> run_report.csv; return list baris timer."""
+    out_dir = out_dir or _out_dir
+    merged = []
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith(".csv") and name != "run_report.csv":
+            with open(os.path.join(out_dir, name), newline="") as f:
+                merged.extend(csv.DictReader(f))
+    with open(os.path.join(out_dir, "run_report.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(merged)
+    return [r for r in merged if r["kind"] == "timer"]
+
+
+def top(timer_rows, n=10):
+    """n operasi (selain total) dengan total waktu terbesar, dijumlah lintas feeder & proses."""
+    totals = {}
+    for r in timer_rows:
+        if r["operation"] != "total":
+            key = (r["stage"], r["operation"])
+            totals[key] = totals.get(key, 0.0) + float(r["total_s"])
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+if os.environ.get("LOADPRO_PROFILE"):
+    enable(os.environ["LOADPRO_PROFILE"])
@@ -0,0 +1,68 @@
+# serving.py
+# --------------------------------------------------
+# Jalur predict Keras tanpa loop model.predict:
+# - serving_fn(model): tf.function dengan input_signature tetap
+#   (None, window, fitur) per input model -> ukuran batch berapa pun
+#   memakai 1 graph yang sama (tidak retrace), dipanggil langsung atas tensor
+# - XLA opsional: LOADPRO_XLA=1 (jit_compile)
+# Waktu panggilan dicatat di utils/profiling.py (predict).
+# Fungsi ter-cache per objek model (weakref), ikut hilang bila model
+# dikeluarkan dari cache model.
+# --------------------------------------------------
+
+import os
+import weakref
+import numpy as np
+
+from utils import profiling
+
+USE_XLA = os.environ.get("LOADPRO_XLA", "0") == "1"
+MAX_BATCH = 65536  # batch sangat besar dipecah agar memori aktivasi terbatas
+
+_serving = weakref.WeakKeyDictionary()
+
+
+def input_signature(model):
+    """TensorSpec per input model dengan dimensi batch None."""
+    tf = profiling.tf_import()
+    return [tf.TensorSpec((None,) + tuple(t.shape[1:]), t.dtype, name=f"input_{i}")
+            for i, t in enumerate(model.inputs)]
+
+
+def serving_fn(model, jit=None):
+    """tf.function model(x, training=False) dengan signature tetap (ter-cache)."""
+    tf = profiling.tf_import()
+    jit = USE_XLA if jit is None else jit
+    fns = _serving.setdefault(model, {})
+    if jit not in fns:
+        spec = input_signature(model)
+        ref = weakref.ref(model)  # closure tidak boleh menahan model (kunci weakref)
+        if len(spec) == 1:
+            fn = tf.function(lambda x: ref()(x, training=False), input_signature=spec, jit_compile=jit)
+        else:
+            fn = tf.function(lambda *xs: ref()(list(xs), training=False), input_signature=spec, jit_compile=jit)
+        fns[jit] = fn
+    return fns[jit]
+
+
+def _as_inputs(fn, X):
+    """Array / list array -> list tensor sesuai dtype signature."""
+    tf = profiling.tf_import()
+    X = X if isinstance(X, (list, tuple)) else [X]
+    return [tf.convert_to_tensor(np.asarray(x), dtype=spec.dtype) for x, spec in zip(X, fn.input_signature)]
+
+
+def call(fn, X):
+    """Panggil fungsi serving atas X (dipecah per MAX_BATCH) -> numpy."""
+    with profiling.timer("predict"):
+        inputs = _as_inputs(fn, X)
+        n = int(inputs[0].shape[0])
+        if n <= MAX_BATCH:
+            return fn(*inputs).numpy()
+        return np.concatenate([fn(*[x[s:s + MAX_BATCH] for x in inputs]).numpy()
+                               for s in range(0, n, MAX_BATCH)])
+
+
+def predict(model, X, jit=None):
+    """Pengganti model.predict(X): 1 graph tetap per model, tanpa loop predict Keras."""
+    return call(serving_fn(model, jit), X)
@@ -0,0 +1,89 @@
+# windowing.py
+# --------------------------------------------------
+# Pembentukan sliding window (X, y) dari deret 1-D hasil scaling.
+# X dibentuk sebagai view strided (tanpa copy per window):
+#   X[i] = series[i : i + window]
+#   y[i] = series[i + window]
+# SeriesWindows: window ukuran apa pun dari 1 deret, view ter-cache
+# per ukuran (dipakai tuning window_size).
+# check_parity(): regression check make_windows() vs loop lama
+# (validator.py --check, bench_window.py).
+# --------------------------------------------------
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_WINDOW = 5
+
+
+def make_windows(series, window=DEFAULT_WINDOW):
+    """Kembalikan (X, y) dengan shape (n - window, window, 1) dan (n - window,).
+
+    X adalah view read-only atas `series`; panggil np.ascontiguousarray(X)
+    bila butuh salinan yang bisa ditulis.
+    """
+    series = np.asarray(series).reshape(-1)
+    if window < 1:
+        raise ValueError(f"window harus >= 1, bukan {window}")
+    if len(series) <= window:
+        return np.empty((0, window, 1), dtype=series.dtype), np.empty((0,), dtype=series.dtype)
+
+    X = sliding_window_view(series[:-1], window)[:, :, np.newaxis]
+    y = series[window:]
+    return X, y
+
+
+class SeriesWindows:
+    """(X, y) untuk sembarang ukuran window dari 1 deret 1-D, di-cache per ukuran."""
+
+    def __init__(self, series):
+        self.series = np.asarray(series, dtype=float).reshape(-1)
+        self._views = {}
+
+    def __len__(self):
+        return len(self.series)
+
+    def get(self, window):
+        if window not in self._views:
+            self._views[window] = make_windows(self.series, window)
+        return self._views[window]
+
+
+# --- Regression check ---
+PARITY_LENGTHS = (0, 1, 4, 5, 6, 10, 11, 50, 731)
+PARITY_WINDOWS = (1, 2, 3, 5, 7, 10, 30)
+
+
+def legacy_windows(scaled, window):
+    """Implementasi lama preprocess_file (sebelum v1.8), acuan check_parity()."""
+    X, y = [], []
+    for i in range(window, len(scaled)):
+        X.append(scaled[i - window:i])
+        y.append(scaled[i][0])
+    return np.array(X), np.array(y)
+
+
+def check_parity(seed=42):
+    """Bandingkan make_windows() dengan loop lama; return list selisih (kosong = identik).
+
+    Deret yang tidak lebih panjang dari window harus menghasilkan 0 window
+    dengan shape X (0, window, 1); input 1-D dan (n, 1) harus sama.
+    """
+    rng = np.random.default_rng(seed)
+    problems = []
+    for n in PARITY_LENGTHS:
+        scaled = rng.random((n, 1))
+        for window in PARITY_WINDOWS:
+            X_old, y_old = legacy_windows(scaled, window)
+            X_new, y_new = make_windows(scaled, window)
+            X_1d, y_1d = make_windows(scaled[:, 0], window)
+            if n <= window:
+                ok = X_new.shape == (0, window, 1) and y_new.shape == (0,) and len(X_old) == 0
+            else:
+                ok = (X_new.shape == X_old.shape and y_new.shape == y_old.shape
+                      and np.array_equal(X_new, X_old) and np.array_equal(y_new, y_old))
+            ok = ok and np.array_equal(X_1d, X_new) and np.array_equal(y_1d, y_new)
+            if not ok:
+                problems.append(f"n={n}, window={window}: X {X_new.shape} vs {X_old.shape}, "
+                                f"y {y_new.shape} vs {y_old.shape}")
+    return problems
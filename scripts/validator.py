@@ -1,19 +1,36 @@
 """
-validator.py v1.1
+validator.py v1.5
 
 Deskripsi:
 -----------
 Script ini digunakan untuk melakukan validasi hasil preprocessing data pada proyek LOADPRO.
 Validator akan:
-- Mengecek seluruh file .npz hasil preprocessing di folder data/npz/
+- Mengecek seluruh dataset hasil preprocessing (data/npz/ atau feature store data/store/)
 - Membaca dan menampilkan bentuk (shape) array X dan y, serta contoh data pertama
-- Mencoba memuat file scaler (.pkl) yang sesuai dari data/metadata/
+- Mencoba memuat scaler yang sesuai (data/metadata/*.pkl atau parameter di store)
 - Mencoba memuat model .keras dari models/single/ dan menampilkan info arsitektur
+  (lewat cache model bersama utils/model_cache.py)
 - Menyimpan hasil validasi dalam format log teks (.log) dan tabel HTML (.html) di logs/validator/
 
+v1.4:
+- Bisa dipanggil: main(fast, workers, model_dir), tidak lagi jalan saat import
+- --workers N: pengecekan dibagi ke process pool
+- --fast: tanpa TensorFlow. Dataset .npz cukup dibaca header + sampel
+  pertama tiap member (zipfile), model dari config.json + shape bobot
+  di arsip .keras (graph tidak dibangun)
+- .log dan .html ditulis per baris selama pengecekan berjalan
+
+v1.5:
+- Self-check kode tanpa dataset/model di awal tiap validasi: parity
+  make_windows() vs loop windowing lama (utils/windowing.check_parity)
+- --check: hanya self-check (exit code 1 bila gagal), bisa dijalankan
+  di checkout baru
+
 Penggunaan:
 -----------
     python scripts/validator.py
+    python scripts/validator.py --fast --workers 4
+    python scripts/validator.py --check
 
 Output:
 -------
@@ -24,119 +41,255 @@ Author: Zaky Pradikto
 """
 
 import os
-os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # Paksa CPU
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'   # Hapus warning TensorFlow
-import numpy as np
-import joblib
+import io
+import json
+import html
+import zipfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import pandas as pd
-from tensorflow.keras.models import load_model
-
-# Konfigurasi folder
-base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-npz_dir = os.path.join(base_dir, 'data', 'npz')
-meta_dir = os.path.join(base_dir, 'data', 'metadata')
-model_dir = os.path.join(base_dir, 'models', 'single')
-log_dir = os.path.join(base_dir, 'logs', 'validator')
-os.makedirs(log_dir, exist_ok=True)
-
-# Waktu untuk penamaan file log
-now_str = datetime.now().strftime("%Y%m%d_%H%M")
-log_path = os.path.join(log_dir, f"{now_str}_validator.log")
-html_path = os.path.join(log_dir, f"{now_str}_validator.html")
-
-# Validasi .npz + .pkl
-npz_files = [f for f in os.listdir(npz_dir) if f.endswith('.npz')]
-log_lines = []
-table_rows = []
-log_lines.append(f"🔍 Menemukan {len(npz_files)} file .npz untuk divalidasi...\n")
-
-for file in sorted(npz_files):
-    feeder = file.replace('.npz', '')
-    npz_path = os.path.join(npz_dir, file)
-    pkl_path = os.path.join(meta_dir, feeder + "_scaler.pkl")
-
-    entry = {
-        "File": file,
-        "X shape": "",
-        "y shape": "",
-        "X[0]": "",
-        "y[0]": "",
-        "Scaler Min": "",
-        "Scaler Max": "",
-        "Status": "✅ Success"
-    }
-
-    log_lines.append(f"📁 {file}")
+import numpy as np
+
+from utils.load_dataset import NPZ_DIR, list_datasets, load_dataset, load_scaler, storage_format
+
+DATASET_COLUMNS = ["File", "X shape", "y shape", "X[0]", "y[0]", "Scaler Min", "Scaler Max", "Status"]
+MODEL_COLUMNS = ["Model File", "Layers", "Input", "Output", "Params", "Status"]
+
+
+# --- Dataset ---
+def npz_head(path):
+    """{nama: (shape, elemen pertama)} tiap array di .npz tanpa memuat isi penuh.
+
+    Hanya header .npy dan byte sampel pertama yang didekompresi.
+    """
+    out = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            with zf.open(name) as f:
+                version = np.lib.format.read_magic(f)
+                read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                               else np.lib.format.read_array_header_2_0)
+                shape, fortran, dtype = read_header(f)
+                count = int(np.prod(shape[1:])) if len(shape) > 1 else 1
+                first = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype) if shape and shape[0] else None
+            out[name[:-len(".npy")] if name.endswith(".npy") else name] = (shape, first)
+    return out
+
+
+def dataset_head(feeder, kategori, fast):
+    """(X shape, y shape, X[0], y[0])."""
+    if fast and storage_format() == "npz":
+        head = npz_head(os.path.join(NPZ_DIR, f"{feeder}_{kategori}.npz"))
+        (x_shape, x0), (y_shape, y0) = head["X"], head["y"]
+        return x_shape, y_shape, x0, y0[0]
+    # npy / store: mmap, hanya sampel pertama yang disentuh
+    X, y = load_dataset(feeder, kategori)
+    return X.shape, y.shape, np.asarray(X[0]), y[0]
+
+
+def check_dataset(task):
+    feeder, kategori, fast = task
+    file = f"{feeder}_{kategori}"
+    entry = dict.fromkeys(DATASET_COLUMNS, "")
+    entry["File"] = file
+    entry["Status"] = "✅ Success"
+    lines = [f"📁 {file}"]
 
     try:
-        data = np.load(npz_path)
-        X, y = data['X'], data['y']
-        entry["X shape"] = str(X.shape)
-        entry["y shape"] = str(y.shape)
-        entry["X[0]"] = ', '.join([f"{v:.3f}" for v in X[0].flatten()])
-        entry["y[0]"] = f"{y[0]:.3f}"
-        log_lines.append(f"   ✅ Loaded .npz | X shape: {X.shape}, y shape: {y.shape}")
-        log_lines.append(f"   🔹 X[0]: {entry['X[0]']}")
-        log_lines.append(f"   🔹 y[0]: {entry['y[0]']}")
+        x_shape, y_shape, x0, y0 = dataset_head(feeder, kategori, fast)
+        entry["X shape"] = str(x_shape)
+        entry["y shape"] = str(y_shape)
+        entry["X[0]"] = ', '.join([f"{v:.3f}" for v in x0.flatten()])
+        entry["y[0]"] = f"{y0:.3f}"
+        lines.append(f"   ✅ Loaded dataset | X shape: {x_shape}, y shape: {y_shape}")
+        lines.append(f"   🔹 X[0]: {entry['X[0]']}")
+        lines.append(f"   🔹 y[0]: {entry['y[0]']}")
     except Exception as e:
-        entry["Status"] = f"❌ NPZ Error: {str(e)}"
-        log_lines.append(f"   ❌ Gagal load .npz: {str(e)}")
-        table_rows.append(entry)
-        log_lines.append("-" * 60)
-        continue
-
-    if os.path.exists(pkl_path):
-        try:
-            scaler = joblib.load(pkl_path)
-            entry["Scaler Min"] = ', '.join([str(x) for x in scaler.data_min_])
-            entry["Scaler Max"] = ', '.join([str(x) for x in scaler.data_max_])
-            log_lines.append(f"   🧪 Scaler loaded:")
-            log_lines.append(f"     - Min: {entry['Scaler Min']}")
-            log_lines.append(f"     - Max: {entry['Scaler Max']}")
-        except Exception as e:
-            entry["Status"] = f"❌ PKL Error: {str(e)}"
-            log_lines.append(f"   ❌ Gagal load .pkl: {str(e)}")
-    else:
+        entry["Status"] = f"❌ Dataset Error: {str(e)}"
+        lines.append(f"   ❌ Gagal load dataset: {str(e)}")
+        lines.append("-" * 60)
+        return entry, lines
+
+    try:
+        scaler = load_scaler(feeder, kategori)
+        entry["Scaler Min"] = ', '.join([str(x) for x in scaler.data_min_])
+        entry["Scaler Max"] = ', '.join([str(x) for x in scaler.data_max_])
+        lines.append(f"   🧪 Scaler loaded:")
+        lines.append(f"     - Min: {entry['Scaler Min']}")
+        lines.append(f"     - Max: {entry['Scaler Max']}")
+    except FileNotFoundError:
         entry["Status"] = "⚠️ No Scaler"
-        log_lines.append("   ⚠️ Scaler .pkl tidak ditemukan.")
+        lines.append("   ⚠️ Scaler .pkl tidak ditemukan.")
+    except Exception as e:
+        entry["Status"] = f"❌ Scaler Error: {str(e)}"
+        lines.append(f"   ❌ Gagal load scaler: {str(e)}")
+
+    lines.append("-" * 60)
+    return entry, lines
+
+
+# --- Model ---
+def keras_head(path):
+    """(layers, input_shape, output_shape, params) dari arsip .keras tanpa TensorFlow.
+
+    Arsitektur dari config.json; jumlah parameter = total ukuran bobot di
+    model.weights.h5 (grup layers/, tanpa state optimizer).
+    """
+    import h5py
+
+    with zipfile.ZipFile(path) as zf:
+        config = json.loads(zf.read("config.json"))
+        weights = zf.read("model.weights.h5")
+
+    layers = config["config"]["layers"]
+    inputs = [l for l in layers if l["class_name"] == "InputLayer"]
+    layers = [l for l in layers if l["class_name"] != "InputLayer"]
+    shapes = [tuple(l["config"]["batch_input_shape"]) for l in inputs] or \
+             [tuple(l["config"]["batch_input_shape"]) for l in layers[:1] if "batch_input_shape" in l["config"]]
+    input_shape = shapes[0] if len(shapes) == 1 else shapes
+    last = layers[-1]
+    output_shape = (None, last["config"]["units"]) if last["class_name"] == "Dense" else "?"
+
+    sizes = []
+    with h5py.File(io.BytesIO(weights), "r") as h5:
+        h5["layers"].visititems(lambda name, obj: sizes.append(obj.size) if isinstance(obj, h5py.Dataset) else None)
+    return len(layers), input_shape, output_shape, int(sum(sizes))
+
 
-    log_lines.append("-" * 60)
-    table_rows.append(entry)
+def model_head(path, fast):
+    if fast:
+        return keras_head(path)
+    from utils.model_cache import get_model
+    model = get_model(path)
+    return len(model.layers), model.input_shape, model.output_shape, model.count_params()
 
-# Validasi .keras
-keras_rows = []
-keras_files = [f for f in os.listdir(model_dir) if f.endswith('.keras')]
-log_lines.append(f"\n📦 Menemukan {len(keras_files)} model .keras untuk dicek:\n")
 
-for f in sorted(keras_files):
-    path = os.path.join(model_dir, f)
+def check_model(task):
+    path, fast = task
+    f = os.path.basename(path)
     row = {"Model File": f, "Layers": "", "Input": "", "Output": "", "Params": "", "Status": "✅ Success"}
-    log_lines.append(f"📦 {f}")
+    lines = [f"📦 {f}"]
     try:
-        model = load_model(path)
-        row["Layers"] = str(len(model.layers))
-        row["Input"] = str(model.input_shape)
-        row["Output"] = str(model.output_shape)
-        row["Params"] = str(model.count_params())
-        log_lines.append(f"   ✅ Loaded model: {model.count_params()} params")
-        log_lines.append(f"   📐 Input: {model.input_shape}, Output: {model.output_shape}, Layers: {len(model.layers)}")
+        n_layers, input_shape, output_shape, params = model_head(path, fast)
+        row["Layers"] = str(n_layers)
+        row["Input"] = str(input_shape)
+        row["Output"] = str(output_shape)
+        row["Params"] = str(params)
+        lines.append(f"   ✅ Loaded model: {params} params")
+        lines.append(f"   📐 Input: {input_shape}, Output: {output_shape}, Layers: {n_layers}")
     except Exception as e:
         row["Status"] = f"❌ Load Error: {str(e)}"
-        log_lines.append(f"   ❌ Gagal load model: {str(e)}")
-    log_lines.append("-" * 60)
-    keras_rows.append(row)
-
-# Simpan .log
-with open(log_path, "w") as f:
-    f.write('\n'.join(log_lines))
-
-# Simpan .html dua tabel
-html_out = "<h2>Validasi Preprocessing (.npz + .pkl)</h2>" + pd.DataFrame(table_rows).to_html(index=False)
-html_out += "<br><h2>Validasi Model (.keras)</h2>" + pd.DataFrame(keras_rows).to_html(index=False)
-with open(html_path, "w") as f:
-    f.write(html_out)
-
-print("✅ Validasi selesai.")
-print("📄 Log:", log_path)
-print("🌐 HTML:", html_path)
+        lines.append(f"   ❌ Gagal load model: {str(e)}")
+    lines.append("-" * 60)
+    return row, lines
+
+
+# --- Self-check kode (tanpa dataset/model) ---
+def self_check():
+    """(jumlah pemeriksaan gagal, baris log)."""
+    from utils.windowing import check_parity
+    problems = check_parity()
+    lines = ["🧪 Parity make_windows vs loop windowing lama (termasuk deret <= window):"]
+    lines += [f"   ❌ {p}" for p in problems] or ["   ✅ Identik (shape & nilai)"]
+    return len(problems), lines
+
+
+# --- Laporan HTML (ditulis per baris) ---
+def html_table_start(f, title, columns):
+    f.write(f"<h2>{html.escape(title)}</h2>\n<table border=\"1\" class=\"dataframe\">\n<thead><tr>")
+    f.write("".join(f"<th>{html.escape(c)}</th>" for c in columns))
+    f.write("</tr></thead>\n<tbody>\n")
+
+
+def html_row(f, row, columns):
+    f.write("<tr>" + "".join(f"<td>{html.escape(str(row[c]))}</td>" for c in columns) + "</tr>\n")
+
+
+def html_table_end(f):
+    f.write("</tbody>\n</table>\n")
+
+
+# --- Worker pool (--workers) ---
+def _init_worker(threads):
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+    if threads is not None:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def main(fast=False, workers=1, model_dir=os.path.join('models', 'single'), check_only=False):
+    failed, check_lines = self_check()
+    if check_only:
+        print('\n'.join(check_lines))
+        return failed
+
+    log_dir = os.path.join('logs', 'validator')
+    os.makedirs(log_dir, exist_ok=True)
+
+    # Waktu untuk penamaan file log
+    now_str = datetime.now().strftime("%Y%m%d_%H%M")
+    log_path = os.path.join(log_dir, f"{now_str}_validator.log")
+    html_path = os.path.join(log_dir, f"{now_str}_validator.html")
+
+    datasets = list_datasets()
+    keras_files = sorted(f for f in os.listdir(model_dir) if f.endswith('.keras')) if os.path.isdir(model_dir) else []
+
+    pool = None
+    if workers > 1:
+        # Mode penuh: tiap worker memuat TensorFlow, thread dibagi rata
+        threads = None if fast else max(1, (os.cpu_count() or 1) // workers)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(threads,))
+    run = (lambda fn, tasks: pool.map(fn, tasks, chunksize=16)) if pool else map
+
+    try:
+        with open(log_path, "w") as log, open(html_path, "w") as report:
+            log.write('\n'.join(check_lines) + '\n\n')
+            # Validasi dataset + scaler
+            log.write(f"🔍 Menemukan {len(datasets)} dataset untuk divalidasi...\n\n")
+            html_table_start(report, "Validasi Preprocessing (dataset + scaler)", DATASET_COLUMNS)
+            for entry, lines in run(check_dataset, [(f, k, fast) for f, k in datasets]):
+                log.write('\n'.join(lines) + '\n')
+                html_row(report, entry, DATASET_COLUMNS)
+                failed += not entry["Status"].startswith("✅")
+            html_table_end(report)
+
+            # Validasi .keras
+            log.write(f"\n📦 Menemukan {len(keras_files)} model .keras untuk dicek:\n\n")
+            report.write("<br>")
+            html_table_start(report, "Validasi Model (.keras)", MODEL_COLUMNS)
+            for row, lines in run(check_model, [(os.path.join(model_dir, f), fast) for f in keras_files]):
+                log.write('\n'.join(lines) + '\n')
+                html_row(report, row, MODEL_COLUMNS)
+                failed += not row["Status"].startswith("✅")
+            html_table_end(report)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"✅ Validasi selesai: {len(datasets)} dataset, {len(keras_files)} model, {failed} bermasalah.")
+    print("📄 Log:", log_path)
+    print("🌐 HTML:", html_path)
+    return failed
+
+
+if __name__ == "__main__":
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # Paksa CPU
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'   # Hapus warning TensorFlow
+    parser = argparse.ArgumentParser(description="🩺 Validasi dataset, scaler dan model .keras")
+    parser.add_argument('--fast', action='store_true',
+                        help='Tanpa TensorFlow: header .npz & metadata .keras saja')
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah proses paralel (default 1)')
+    parser.add_argument('--model-dir', default=os.path.join('models', 'single'), help='Folder model .keras')
+    parser.add_argument('--check', action='store_true',
+                        help='Hanya self-check kode (parity windowing), tanpa dataset/model')
+    args = parser.parse_args()
+
+    # Root project sebagai cwd (utils.load_dataset memakai path relatif)
+    os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    failed = main(args.fast, args.workers, args.model_dir, args.check)
+    if args.check and failed:
+        raise SystemExit(1)